@@ -3,10 +3,12 @@ from django.contrib.admin import DateFieldListFilter
 from django.utils.translation import gettext_lazy as _
 
 from dictionary.models import Entry, Comment
+from dictionary.utils.admin import RecountEntriesMixin
 
 
 @admin.register(Entry)
-class EntryAdmin(admin.ModelAdmin):
+class EntryAdmin(RecountEntriesMixin, admin.ModelAdmin):
+    entry_lookup = "pk"
     search_fields = ("id", "author__username", "topic__title")
     autocomplete_fields = ("topic",)
     list_display = ("id", "topic", "author", "vote_rate")
@@ -10,12 +10,17 @@ class ImageAdmin(admin.ModelAdmin):
     list_display = ("slug", "author", "date_created", "file", "is_deleted")
     list_filter = (("date_created", DateFieldListFilter), "is_deleted")
     ordering = ("-date_created",)
-    readonly_fields = ("author", "file", "date_created")
+    readonly_fields = ("author", "file", "width", "height", "format", "date_created")
     list_editable = ("is_deleted",)
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
         return queryset.select_related("author")
 
+    def delete_queryset(self, request, queryset):
+        # Bulk deletion skips Image.delete, which removes the files and invalidates resolve_image.
+        for image in queryset:
+            image.delete()
+
     def has_add_permission(self, request, obj=None):
         return False
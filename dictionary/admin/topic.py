@@ -5,11 +5,12 @@ from django.utils.translation import gettext_lazy as _
 
 from dictionary.admin.views.topic import TopicMove
 from dictionary.models import Topic, Wish
-from dictionary.utils.admin import intermediate
+from dictionary.utils.admin import RecountEntriesMixin, intermediate
 
 
 @admin.register(Topic)
-class TopicAdmin(admin.ModelAdmin):
+class TopicAdmin(RecountEntriesMixin, admin.ModelAdmin):
+    entry_lookup = "topic"
     fieldsets = (
         (None, {"fields": ("title", "category", "mirrors")}),
         (
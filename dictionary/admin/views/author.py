@@ -19,8 +19,7 @@ class SuspendUser(IntermediateActionView):
     from 'time_choices' and also provides some information. For each suspended user,
     a LogEntry object is created. get_queryset is not modified so it is possible
     to select already suspended users, but latest submission will be taken into
-    account. Note that composing a message to each banned user is an expensive action,
-    large inputs (> 100) may take time (~7 sec for 800 users).
+    account. Each banned user is informed with a message, these are composed in bulk.
     """
 
     permission_required = ("dictionary.suspend_user", "dictionary.change_author")
@@ -55,17 +54,16 @@ class SuspendUser(IntermediateActionView):
         message_for_log = f"Suspended until {suspended_until}, information: {action_information}"
 
         log_list = []  # Reserve list that hold instances for bulk creation
-        generic_superuser = get_generic_superuser()
 
         # Set new suspended_until and append instances to reserved lists
         for user in user_list_raw:
             user.suspended_until = suspended_until
             log_list.append(logentry_instance(message_for_log, request.user, Author, user))
-            Message.objects.compose(generic_superuser, user, message_for_user)
 
         # Bulk creation/updates
         Author.objects.bulk_update(user_list_raw, ["suspended_until"])  # Update Author, does not call save()
         logentry_bulk_create(log_list)  # Log user suspension for admin history
+        Message.objects.compose_many(get_generic_superuser(), user_list_raw, message_for_user)
 
         count = len(user_list_raw)
         notifications.success(
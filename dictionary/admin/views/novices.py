@@ -19,13 +19,15 @@ class NoviceList(PermissionRequiredMixin, ListView):
     permission_required = "dictionary.can_activate_user"
 
     def get_queryset(self):
-        return Author.in_novice_list.get_ordered(100)
+        pks = list(Author.in_novice_list.get_ranking())[:100]
+        novices = Author.objects.in_bulk(pks)
+        return [novices[pk] for pk in pks if pk in novices]
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         context.update(admin.site.each_context(self.request))
         context["title"] = _("Novice review list")
-        context["novice_count"] = Author.in_novice_list.get_ordered().count()
+        context["novice_count"] = len(Author.in_novice_list.get_ranking())
         return context
 
 
@@ -45,12 +47,12 @@ class NoviceLookup(PermissionRequiredMixin, ListView):
 
     def dispatch(self, request, *args, **kwargs):
         self.novice = get_object_or_404(Author, username=self.kwargs.get("username"))
-        novices = Author.in_novice_list.get_ordered()
+        position = Author.in_novice_list.get_position(self.novice)
 
-        if not novices.filter(pk=self.novice.pk).exists():
+        if position is None:
             notifications.error(self.request, _("The user is not on the novice list."))
             self.novice = None
-        elif self.novice not in novices[:100]:
+        elif position > 100:
             self.novice = None
             notifications.error(self.request, _("The user is not at the top of the novice list."))
 
@@ -88,6 +90,7 @@ class NoviceLookup(PermissionRequiredMixin, ListView):
         user.application_status = Author.Status.APPROVED
         user.is_novice = False
         user.save()
+        Author.in_novice_list.invalidate_ranking()
 
         # Log admin info
         admin_info_msg = _("Authorship of the user '%(username)s' was approved.") % {"username": user.username}
@@ -109,6 +112,8 @@ class NoviceLookup(PermissionRequiredMixin, ListView):
         # Alter the user status & delete entries
         user = self.novice
         Entry.objects_published.filter(author=user).delete()  # does not trigger model's delete()
+        user.invalidate_entry_counts()
+        Author.recount_published_entries(Author.objects.filter(pk=user.pk))
         user.application_status = Author.Status.ON_HOLD
         user.application_date = None
         user.save()
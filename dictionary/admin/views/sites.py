@@ -1,12 +1,14 @@
 from django.contrib import admin, messages as notifications
-from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.contrib.auth.mixins import PermissionRequiredMixin, UserPassesTestMixin
 from django.contrib.sites.models import Site
-from django.core.cache import cache
 from django.shortcuts import redirect, reverse
 from django.utils.translation import gettext as _
 from django.views.generic import TemplateView
 
 from dictionary.utils.admin import log_admin
+from dictionary.utils.cache import cache
+
+from dictionary_graph.metrics import registry
 
 
 class ClearCache(PermissionRequiredMixin, TemplateView):
@@ -30,3 +32,19 @@ class ClearCache(PermissionRequiredMixin, TemplateView):
         log_admin(f"Cleared cache. /cache_key: {key}/", request.user, Site, request.site)
         notifications.warning(request, message)
         return redirect(reverse("admin:index"))
+
+
+class GraphMetrics(UserPassesTestMixin, TemplateView):
+    """Summary of the GraphQL metrics collected by the process that serves the request."""
+
+    template_name = "admin/sites/graph_metrics.html"
+
+    def test_func(self):
+        return self.request.user.is_superuser
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(admin.site.each_context(self.request))
+        context["title"] = _("GraphQL metrics")
+        context["rows"] = registry.summary()
+        return context
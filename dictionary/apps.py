@@ -177,6 +177,13 @@ class DictionaryConfig(AppConfig):
     them to use the default.
     """
 
+    LEFT_FRAME_FRAGMENT_TIMEOUT = 30
+    """
+    ADVANCED: Rendered left frames of visitors are cached (per category, tab,
+    page etc.) and shared among all visitors for this many seconds. Set to 0
+    to disable.
+    """
+
     REFRESH_TIMEOUT = 0.1337
     """
     ADVANCED: For 'today', set the timeout for refresh interval. (This also sets
@@ -366,8 +373,10 @@ class DictionaryConfig(AppConfig):
 
     COMPRESS_IMAGES = False
     """
-    Set True to enable image compression according to subsequent settings while uploading.
-    Notice: GIFs are not supported, they will lose animations.
+    Set True to enable image compression according to subsequent settings. Uploads
+    are stored as is, compressed variants (display sized and WebP) are generated in
+    the background and served instead of the original. Animated images are not
+    compressed, so as to keep the animations.
     """
 
     COMPRESS_THRESHOLD = 2621440  # 2.5MB
@@ -381,11 +390,57 @@ class DictionaryConfig(AppConfig):
     (Integer from 1 to 95.)
     """
 
+    IMAGE_THUMBNAIL_SIZE = 320
+    """
+    Maximum width and height (in pixels) of image thumbnails, which are generated
+    for every upload.
+    """
+
+    IMAGE_DISPLAY_SIZE = 1920
+    """
+    Maximum width and height (in pixels) of compressed image variants.
+    """
+
     XSENDFILE_HEADER_NAME = "X-Accel-Redirect"
     """
     Nginx only. Apache counterpart is 'X-Sendfile' which requires mod_xsendfile.
     """
 
+    BACKUP_COMPRESS = False
+    """
+    Set True to gzip backup files of users (they will be served as .json.gz).
+    """
+
+    TERMINATION_CHUNK_SIZE = 500
+    """
+    Terminated accounts are processed in chunks of this many entries (or
+    conversations), progress is recorded after each chunk.
+    """
+
+    TERMINATION_LOCK_TIMEOUT = 600
+    """
+    An account termination is leased to the run processing it for this many
+    seconds (extended after each chunk), so that overlapping runs skip it.
+    """
+
+    TASK_LOCK_TIMEOUT = 300
+    """
+    Periodic tasks hold a lock while running, so that runs don't overlap. The
+    lock expires after this many seconds if the worker dies (while the task is
+    running, it gets extended periodically). See dictionary.utils.tasks.exclusive
+    """
+
+    RETENTION_BATCH_SIZE = 1000
+    """
+    Expired objects (images, reports, verifications) are deleted in batches of
+    this size by periodic tasks, see dictionary.utils.retention.
+    """
+
+    RETENTION_FILE_WORKERS = 8
+    """
+    Number of threads that remove the files of expired objects from the storage.
+    """
+
     MESSAGE_PURGE_THRESHOLD = 300  # 5 minutes
     """
     After this many seconds, the message will be deleted for the sender
@@ -397,3 +452,42 @@ class DictionaryConfig(AppConfig):
 
     NOVICE_ENTRY_INTERVAL = 0
     """Same with above, but for novices."""
+
+    ENTRY_STATS_TIMEOUT = 3600
+    """
+    Entry statistics of authors (displayed in profile pages) are cached and
+    updated as entries get published or deleted. Periodical counts (month,
+    week and day) are recalculated after this many seconds.
+    """
+
+    TOPIC_FOLLOWING_FANOUT_LIMIT = 1000
+    """
+    Unread entry counts of followed topics are kept up to date as entries get
+    published. For topics that have more followers than this number, the counts
+    are calculated when the followers request them instead. (Follower counts
+    are cached for an hour while checking this.)
+    """
+
+    SESSION_WRITE_THROUGH = False
+    """
+    Only applies to "dictionary.backends.sessions.redis" session engine. When
+    set to True, sessions of authenticated users are also copied to database
+    (PairedSession) in the background, for auditing purposes.
+    """
+
+    GRAPH_RESPONSE_TIMEOUTS = {"topics": 30, "autocomplete": 300, "favoriters": 60}
+    """
+    ADVANCED: Responses of read-only GraphQL operations that consist of these
+    fields are cached for given seconds. Responses of guests are shared, the
+    ones of authenticated users are cached per user. Set to 0 to disable.
+    """
+
+    GRAPH_SLOW_OPERATION_THRESHOLD = None
+    """
+    GraphQL operations that take longer than this many seconds are logged
+    (as warnings of 'dictionary_graph.metrics' logger) with their variables.
+    Set to None to disable.
+    """
+
+    GRAPH_REDACTED_VARIABLES = ("body", "content", "hint", "password", "email")
+    """Values of these variables are redacted in the logs of slow operations."""
@@ -1,5 +1,6 @@
 from django.contrib.sessions.backends.cached_db import SessionStore as DjangoCachedDBStore
 
+from dictionary.utils.cache import cache
 
 from .db import SessionStore as DictionarySessionStore
 
@@ -14,3 +15,7 @@ class SessionStore(DictionarySessionStore, DjangoCachedDBStore):
     """
 
     cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = cache  # So that the session can be fetched along with other keys, see RequestCacheMiddleware
@@ -1,4 +1,4 @@
-from django.contrib.auth import get_user_model
+from django.contrib.auth import SESSION_KEY, get_user_model
 from django.contrib.sessions.backends.db import SessionStore as DBStore
 from django.contrib.sessions.base_session import AbstractBaseSession
 from django.db import models
@@ -25,9 +25,8 @@ class SessionStore(DBStore):
         obj = super().create_model_instance(data)
 
         try:
-            user_id = int(data.get('_auth_user_id'))
-            user = User.objects.get(pk=user_id)
-        except (ValueError, TypeError, User.DoesNotExist):
-            user = None
-        obj.user = user
+            # The user is not fetched, the id is enough to save the session.
+            obj.user_id = int(data.get(SESSION_KEY))
+        except (ValueError, TypeError):
+            obj.user_id = None
         return obj
@@ -0,0 +1,68 @@
+from django.conf import settings as django_settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.cache import SessionStore as DjangoCacheStore
+
+from django_redis import get_redis_connection
+
+from dictionary.conf import settings
+from dictionary.utils.cache import cache
+
+
+KEY_PREFIX = "dictionary.redis_session"
+INDEX_KEY_PREFIX = "dictionary.session_index"
+
+
+def get_index_key(user_id):
+    return cache.make_key(f"{INDEX_KEY_PREFIX}{user_id}")
+
+
+def get_indexed_sessions(user_id):
+    """Session keys of given user. Might include the keys of sessions that already ended."""
+    return [key.decode() for key in get_redis_connection().smembers(get_index_key(user_id))]
+
+
+def flush_indexed_sessions(user_id):
+    """Delete all sessions of given user, along with the index."""
+    if session_keys := get_indexed_sessions(user_id):
+        cache.delete_many([KEY_PREFIX + key for key in session_keys])
+
+    get_redis_connection().delete(get_index_key(user_id))
+
+
+class SessionStore(DjangoCacheStore):
+    """
+    Keeps sessions in Redis only (requires django-redis). Session keys of
+    authenticated users are indexed per user, so that all sessions of a user
+    can be deleted at once (see flush_all_sessions). Sessions of guests (used
+    for anonymous votes) are kept as plain cache entries.
+
+    Set SESSION_WRITE_THROUGH to copy the sessions to PairedSession.
+    """
+
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = cache
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()  # Calls save again with must_create=True
+
+        super().save(must_create=must_create)
+
+        if (user_id := self.get(SESSION_KEY)) is None:
+            return
+
+        with get_redis_connection().pipeline() as pipe:
+            index_key = get_index_key(user_id)
+            pipe.sadd(index_key, self.session_key)
+            pipe.expire(index_key, django_settings.SESSION_COOKIE_AGE)
+            pipe.execute()
+
+        if settings.SESSION_WRITE_THROUGH:
+            from dictionary.tasks import write_paired_session  # Circular import
+
+            write_paired_session.delay(
+                self.session_key, self.encode(self._get_session()), self.get_expiry_age(), int(user_id)
+            )
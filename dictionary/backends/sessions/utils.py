@@ -1,19 +1,23 @@
 from django.conf import settings
-from django.core.cache import cache
+
+from dictionary.utils.cache import cache
 
 from .cached_db import KEY_PREFIX, __name__ as cached_db_name
 from .db import PairedSession
+from .redis import __name__ as redis_name, flush_indexed_sessions
 
 
 def flush_all_sessions(user):
     """Invalidate ALL sessions of a user."""
 
+    if settings.SESSION_ENGINE == redis_name:
+        flush_indexed_sessions(user.pk)
+        return
+
     sessions = PairedSession.objects.filter(user=user)
-    cached = settings.SESSION_ENGINE == cached_db_name
 
-    for session in sessions:
-        if cached:
-            cache_key = KEY_PREFIX + session.session_key  # Determined in DjangoCachedDBStore
-            cache.delete(cache_key)
+    if settings.SESSION_ENGINE == cached_db_name:
+        session_keys = sessions.values_list("session_key", flat=True)
+        cache.delete_many([KEY_PREFIX + key for key in session_keys])  # Determined in DjangoCachedDBStore
 
-        session.delete()
+    sessions.delete()
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.utils.translation import gettext as _
+
+from dictionary.models import ConversationArchive
+
+# Moves the messages of conversation archives created before chunks into chunks.
+
+
+class Command(BaseCommand):
+    @property
+    def help(self):
+        return _("Moves the messages of legacy conversation archives into chunks")
+
+    def handle(self, *args, **options):
+        archives = ConversationArchive.objects.exclude(messages="").only("pk", "messages")
+        count = sum(archive.convert_legacy() for archive in archives.iterator())
+        self.stdout.write(_("Converted %d archives") % count)
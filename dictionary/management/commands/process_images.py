@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.utils.translation import gettext as _
+
+from dictionary.models import Image
+
+# Generates variants of the images that were not processed yet, e.g. the ones uploaded before variants were added.
+
+
+class Command(BaseCommand):
+    @property
+    def help(self):
+        return _("Processes the images that don't have variants yet")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sync", action="store_true", help=_("Process in this process, instead of the workers"))
+
+    def handle(self, *args, **options):
+        images = Image.objects.filter(thumbnail="").order_by("pk")
+        count = 0
+
+        for image in images.iterator():
+            if options["sync"]:
+                image.process()
+            else:
+                image.process_async()
+
+            count += 1
+
+        message = _("Processed %d images") if options["sync"] else _("Queued %d images")
+        self.stdout.write(message % count)
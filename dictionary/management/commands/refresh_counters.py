@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils.translation import gettext as _
+
+from dictionary.models import Author, Conversation
+
+# Recalculates denormalized counters and summaries, e.g. to fill them for existing rows after an upgrade.
+
+
+class Command(BaseCommand):
+    targets = {
+        "conversations": (Conversation, Conversation.refresh_summaries),
+        "unread_messages": (Author, Author.recount_unread_messages),
+        "published_entries": (Author, Author.recount_published_entries),
+    }
+
+    @property
+    def choices(self):
+        return ", ".join(self.targets)
+
+    @property
+    def help(self):
+        return _("Recalculates denormalized counters and summaries")
+
+    def add_arguments(self, parser):
+        parser.add_argument("targets", nargs="*", help=_("Counters to recalculate (%s), all by default") % self.choices)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if unknown := set(options["targets"]) - set(self.targets):
+            raise CommandError(
+                _("Unknown targets: %(unknown)s. Choices are: %(choices)s")
+                % {"unknown": ", ".join(unknown), "choices": self.choices}
+            )
+
+        # The order matters, unread message counts are calculated from conversations.
+        targets = [target for target in self.targets if target in options["targets"] or not options["targets"]]
+
+        for target in targets:
+            model, refresh = self.targets[target]
+            last = model.objects.aggregate(last=Max("pk"))["last"] or 0
+            batch_size = options["batch_size"]
+
+            # Primary key ranges, so that each transaction locks a limited number of rows.
+            for start in range(0, last, batch_size):
+                with transaction.atomic():
+                    refresh(model.objects.filter(pk__gt=start, pk__lte=start + batch_size))
+
+            self.stdout.write(_("Recalculated: %s") % target)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+import dictionary.tasks  # noqa, registers the tasks
+
+from dictionary.utils.tasks import get_task_stats
+
+# Shows statistics of the (periodic) tasks that are decorated with 'exclusive'.
+
+
+class Command(BaseCommand):
+    @property
+    def help(self):
+        return _("Shows last run and duration statistics of periodic tasks")
+
+    def handle(self, *args, **options):
+        columns = ("task", "runs", "failed", "skipped", "last run", "status", "duration", "mean", "p50", "p95")
+        rows = [columns]
+
+        for stats in get_task_stats():
+            last_run = stats.get("last_run")
+            rows.append(
+                (
+                    stats["name"].rsplit(".", 1)[-1],
+                    str(stats["runs"]),
+                    str(stats.get("failed", 0)),
+                    str(stats.get("skipped", 0)),
+                    timezone.localtime(last_run).strftime("%Y-%m-%d %H:%M:%S") if last_run else "-",
+                    stats.get("last_status", "-"),
+                    self.seconds(stats.get("last_duration")),
+                    self.seconds(stats.get("mean")),
+                    self.seconds(stats.get("p50"), bound=True),
+                    self.seconds(stats.get("p95"), bound=True),
+                )
+            )
+
+        widths = [max(len(row[index]) for row in rows) for index in range(len(columns))]
+
+        for row in rows:
+            self.stdout.write("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+    @staticmethod
+    def seconds(value, bound=False):
+        if value is None:
+            return "-"
+
+        # Quantiles are upper bounds of histogram buckets.
+        return f"<={value}s" if bound else f"{value:.2f}s"
@@ -0,0 +1,70 @@
+import logging
+
+from django.conf import settings as django_settings
+
+from dictionary.backends.sessions.cached_db import KEY_PREFIX, __name__ as cached_db_name
+from dictionary.utils import get_generic_superuser
+from dictionary.utils.cache import activate, cache, deactivate
+from dictionary.utils.context_processors import header_categories
+from dictionary.utils.serializers import LeftFrame
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestCacheMiddleware:
+    """
+    Activates the request scoped cache (see dictionary.utils.cache). Keys that
+    are read in (almost) every request are fetched with a single call, at the
+    beginning of the request and once the user is known. Writes are sent when
+    the response is ready. Needs to be placed before SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_cache = activate()
+
+        try:
+            request_cache.prefetch(self.get_static_keys(request))
+            response = self.get_response(request)
+        except BaseException:
+            # Don't let a failing flush replace the original exception.
+            try:
+                deactivate()
+            except Exception:  # noqa, any error of the cache backend
+                logger.exception("Could not send the deferred cache writes.")
+            raise
+
+        deactivate()
+
+        request.cache_round_trips = request_cache.round_trips
+        logger.debug("%s %s: %d cache round trips", request.method, request.path, request_cache.round_trips)
+
+        if django_settings.DEBUG:
+            response["X-Cache-Round-Trips"] = request_cache.round_trips
+
+        return response
+
+    def process_view(self, request, *args, **kwargs):
+        # The user is known at this point.
+        if request.user.is_authenticated:
+            cache.prefetch(self.get_user_keys(request.user))
+
+    def get_static_keys(self, request):
+        keys = [
+            header_categories.make_key(),
+            get_generic_superuser.make_key(),
+            LeftFrame._get_available_exclusions.make_key(),
+        ]
+        session_key = request.COOKIES.get(django_settings.SESSION_COOKIE_NAME)
+
+        if session_key and django_settings.SESSION_ENGINE == cached_db_name:
+            keys.append(KEY_PREFIX + session_key)
+
+        return keys
+
+    @staticmethod
+    def get_user_keys(user):
+        return [user._entry_stats_key, user._relations_version_key]
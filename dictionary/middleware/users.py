@@ -26,6 +26,7 @@ class NoviceActivityMiddleware:
                 Author.objects.filter(id=request.user.id).update(
                     last_activity=timezone.now(), queue_priority=F("queue_priority") + 1
                 )
+                Author.in_novice_list.invalidate_ranking()
         # Code to be executed for each request before
         # the view (and later middleware) are called.
         response = self.get_response(request)
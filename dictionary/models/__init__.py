@@ -5,7 +5,7 @@ from .entry import Comment, Entry
 from .flatpages import ExternalURL, MetaFlatPage
 from .images import Image
 from .m2m import DownvotedEntries, EntryFavorites, TopicFollowing, UpvotedEntries
-from .messaging import Conversation, ConversationArchive, Message
+from .messaging import Conversation, ConversationArchive, ConversationArchiveChunk, Message
 from .reporting import GeneralReport
 from .topic import Topic, Wish
 
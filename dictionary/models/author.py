@@ -1,20 +1,21 @@
+import gzip
+import itertools
+import json
 import math
+import os
 import random
+import time
 
 from contextlib import suppress
 from decimal import Decimal
-from functools import wraps
 
 from django.apps import apps
 from django.contrib.auth.models import AbstractUser, UserManager
 from django.contrib.auth.validators import UnicodeUsernameValidator
-from django.core.cache import cache
-from django.core.exceptions import ObjectDoesNotExist
-from django.core.files.base import ContentFile
 from django.core.validators import MinLengthValidator
-from django.db import models
-from django.db.models import BooleanField, Case, Count, F, OuterRef, Q, Sum, When
-from django.db.models.functions import Coalesce
+from django.db import models, transaction
+from django.db.models import BooleanField, Case, Count, F, Max, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce, Greatest
 from django.shortcuts import reverse
 from django.template import defaultfilters
 from django.utils import timezone
@@ -29,33 +30,13 @@ from dictionary.models.entry import Entry
 from dictionary.models.m2m import DownvotedEntries, UpvotedEntries
 from dictionary.models.managers.author import AccountTerminationQueueManager, AuthorManagerAccessible, InNoviceList
 from dictionary.utils import get_generic_superuser, parse_date_or_none, time_threshold
+from dictionary.utils.cache import cache
 from dictionary.utils.db import SubQueryCount
-from dictionary.utils.decorators import cached_context
+from dictionary.utils.decorators import memoize
 from dictionary.utils.serializers import ArchiveSerializer
 from dictionary.utils.validators import validate_username_partial
 
 
-def usercache(initial_func=None, *, timeout=86400):
-    """
-    Caches model method, uses model instance in cache key.
-    Basically a wrapper around cached_context.
-    """
-
-    def inner(method):
-        @wraps(method)
-        def wrapped(self, *args, **kwargs):
-            return cached_context(prefix="usercache_" + method.__name__, vary_on_user=True, timeout=timeout)(
-                lambda user=None: method(self, *args, **kwargs)
-            )(user=self)
-
-        return wrapped
-
-    if initial_func:
-        return inner(initial_func)
-
-    return inner
-
-
 class AuthorNickValidator(UnicodeUsernameValidator):
     regex = r"^[a-z0-9]+(\ [a-z0-9]+)*$"
     message = _("unlike what you sent, an appropriate nickname would only consist of letters, numbers and spaces.")
@@ -177,6 +158,10 @@ class Author(AbstractUser):
 
     # Other
     karma = models.DecimalField(default=Decimal(0), max_digits=7, decimal_places=2, verbose_name=_("Karma points"))
+    unread_message_count = models.PositiveIntegerField(default=0, editable=False)  # See Conversation.unread_count
+    # See shift_entry_stats. Bulk deletions and reassignments (admin, terminations) recount it; any other drift
+    # (e.g. raw queries) is corrected by the "refresh_counters published_entries" command, which also fills it.
+    published_entry_count = models.PositiveIntegerField(default=0, editable=False)
     badges = models.ManyToManyField("Badge", blank=True, verbose_name=_("Badges"))
 
     announcement_read = models.DateTimeField(auto_now_add=True)
@@ -186,6 +171,8 @@ class Author(AbstractUser):
     objects_accessible = AuthorManagerAccessible()
     in_novice_list = InNoviceList()
 
+    COUNTER_FIELDS = ("unread_message_count", "published_entry_count")
+
     class Meta:
         permissions = (
             ("can_activate_user", _("Can access to the novice list")),
@@ -210,6 +197,15 @@ class Author(AbstractUser):
 
         if created:
             self.following_categories.add(*Category.objects.filter(is_default=True))
+        elif self.is_novice:
+            Author.in_novice_list.invalidate_ranking()
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # pylint: disable=too-many-arguments
+        # Counters are only changed by atomic updates (shift_unread_message_count, shift_entry_stats),
+        # don't overwrite them with the values of a possibly stale instance. Inserts still set them.
+        values = [value for value in values if value[0].name not in self.COUNTER_FIELDS]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
 
     def delete(self, *args, **kwargs):
         # Archive conversations of target users.
@@ -225,16 +221,64 @@ class Author(AbstractUser):
     def get_absolute_url(self):
         return reverse("user-profile", kwargs={"slug": self.slug})
 
+    @cached_property
+    def relations(self):
+        """
+        Id sets of the users blocked by this user, the users who blocked this user and
+        the users followed by this user. These are used in filters all over the site,
+        so they are cached; the cache key has a version which gets bumped when these
+        relationships change (see dictionary.signals.m2m).
+        """
+        version = cache.get_or_set(self._relations_version_key, time.time_ns, None)
+        relations = cache.get(self._relations_key, version=version)
+
+        if relations is None:
+            relations = {
+                "blocked": frozenset(self.blocked.values_list("pk", flat=True)),
+                "blocked_by": frozenset(self.blocked_by.values_list("pk", flat=True)),
+                "following": frozenset(self.following.values_list("pk", flat=True)),
+            }
+            cache.set(self._relations_key, relations, 86400, version=version)
+
+        return relations
+
+    @property
+    def _relations_key(self):
+        return f"usercache_relations_usr{self.pk}"
+
+    @property
+    def _relations_version_key(self):
+        return f"usercache_relations_version_usr{self.pk}"
+
+    @property
+    def blocked_ids(self):
+        return self.relations["blocked"]
+
+    @property
+    def blocked_by_ids(self):
+        return self.relations["blocked_by"]
+
+    @property
+    def following_ids(self):
+        return self.relations["following"]
+
+    def invalidate_relations(self):
+        with suppress(ValueError):
+            cache.incr(self._relations_version_key)  # ValueError: There is no version yet, so nothing to invalidate.
+        self.__dict__.pop("relations", None)
+
     def get_following_topics_with_receipt(self):
         """Get user's following topics with read receipts."""
         new_entries = (
             Entry.objects.filter(topic=OuterRef("pk"), date_created__gte=OuterRef("topicfollowing__read_at"))
-            .exclude(Q(author=self) | Q(author__in=self.blocked.all()))
+            .exclude(Q(author=self) | Q(author__in=self.blocked_ids))
             .only("id")
         )
 
+        # Unread counts are maintained by TopicFollowing.objects.notify_followers, NULL
+        # counts belong to crowded topics which are not fanned out, so count them here.
         return self.following_topics.annotate(
-            count=SubQueryCount(new_entries),
+            count=Coalesce(F("topicfollowing__unread_count"), SubQueryCount(new_entries)),
             last_read_at=F("topicfollowing__read_at"),
             is_read=Case(When(Q(count__gt=0), then=False), default=True, output_field=BooleanField()),
         )
@@ -246,41 +290,56 @@ class Author(AbstractUser):
             .count()
         )
 
-    @usercache
+    @memoize(timeout=86400)
     def get_best_entries(self):
         return tuple(self.entry_set(manager="objects_published").filter(vote_rate__gt=0).order_by("-vote_rate")[:50])
 
-    def has_exceeded_vote_limit(self, against=None):
-        """Check vote limits. This is done before the vote is registered."""
+    def get_vote_counts(self, against=()):
+        """
+        Vote counts used in vote limits. Returns the number of votes given in the
+        last 24 hours, and a dict of author id -> [total, last 24 hours] votes
+        given to the entries of the authors with given ids.
+        """
 
         # Notice: couldn't filter on unions, so both models are explicitly written.
-        h24 = {"date_created__gte": time_threshold(hours=24)}  # Filter objects that has been created in last 24 hours.
+        h24 = Q(date_created__gte=time_threshold(hours=24))  # Filter objects that has been created in last 24 hours.
+        daily_vote_count, counts_against = 0, {pk: [0, 0] for pk in against}
 
-        upvoted = UpvotedEntries.objects.filter(author=self)
-        downvoted = DownvotedEntries.objects.filter(author=self)
+        for model in (UpvotedEntries, DownvotedEntries):
+            votes = model.objects.filter(author=self)
+            daily_vote_count += votes.filter(h24).count()
 
-        daily_vote_count = upvoted.filter(**h24).count() + downvoted.filter(**h24).count()
+            if not against:
+                continue
 
-        if daily_vote_count >= settings.DAILY_VOTE_LIMIT:
-            return True, gettext("you have used up all the vote claims you have today. try again later.")
+            for row in (
+                votes.filter(entry__author__in=against)
+                .values("entry__author")
+                .annotate(total=Count("pk"), daily=Count("pk", filter=h24))
+            ):
+                counts_against[row["entry__author"]][0] += row["total"]
+                counts_against[row["entry__author"]][1] += row["daily"]
 
-        if against:
-            upvoted_against = upvoted.filter(entry__author=against).count()
-            downvoted_against = downvoted.filter(entry__author=against).count()
-            total_votes_against = upvoted_against + downvoted_against
+        return daily_vote_count, counts_against
 
-            if total_votes_against >= settings.TOTAL_VOTE_LIMIT_PER_USER:
-                return True, gettext("sorry, you have been haunting this person for a long time.")
+    @staticmethod
+    def check_vote_limit(daily_vote_count, total_votes_against=0, daily_votes_against=0):
+        if daily_vote_count >= settings.DAILY_VOTE_LIMIT:
+            return True, gettext("you have used up all the vote claims you have today. try again later.")
 
-            daily_upvoted_against = upvoted.filter(entry__author=against, **h24).count()
-            daily_downvoted_against = downvoted.filter(entry__author=against, **h24).count()
-            daily_votes_against = daily_upvoted_against + daily_downvoted_against
+        if total_votes_against >= settings.TOTAL_VOTE_LIMIT_PER_USER:
+            return True, gettext("sorry, you have been haunting this person for a long time.")
 
-            if daily_votes_against >= settings.DAILY_VOTE_LIMIT_PER_USER:
-                return True, gettext("this person has taken enough of your votes today, maybe try other users?")
+        if daily_votes_against >= settings.DAILY_VOTE_LIMIT_PER_USER:
+            return True, gettext("this person has taken enough of your votes today, maybe try other users?")
 
         return False, None
 
+    def has_exceeded_vote_limit(self, against=None):
+        """Check vote limits. This is done before the vote is registered."""
+        daily_vote_count, counts_against = self.get_vote_counts([against.pk] if against else ())
+        return self.check_vote_limit(daily_vote_count, *counts_against.get(getattr(against, "pk", None), ()))
+
     def can_send_message(self, recipient=None):
         if self == recipient:
             return False
@@ -294,14 +353,40 @@ class Author(AbstractUser):
             or (self.is_novice and recipient.message_preference == Author.MessagePref.AUTHOR_ONLY)
             or (
                 recipient.message_preference == Author.MessagePref.FOLLOWING_ONLY
-                and not recipient.following.filter(pk=self.pk).exists()
+                and self.pk not in recipient.following_ids
             )
-            or (recipient.blocked.filter(pk=self.pk).exists() or self.blocked.filter(pk=recipient.pk).exists())
+            or (self.pk in recipient.blocked_ids or recipient.pk in self.blocked_ids)
         ):
             return False
 
         return True
 
+    def filter_message_recipients(self, recipients):
+        """Bulk version of can_send_message, returns the recipients that may receive a message from this user."""
+        recipients = list({recipient.pk: recipient for recipient in recipients if recipient.pk != self.pk}.values())
+
+        if self.username == settings.GENERIC_SUPERUSER_USERNAME:
+            return recipients
+
+        excluded = (
+            Q(is_frozen=True)
+            | Q(is_private=True)
+            | Q(is_active=False)
+            | Q(message_preference=Author.MessagePref.DISABLED)
+            | Q(pk__in=self.blocked_ids | self.blocked_by_ids)
+            | (Q(message_preference=Author.MessagePref.FOLLOWING_ONLY) & ~Q(pk__in=self.followers.values("pk")))
+        )
+
+        if self.is_novice:
+            excluded |= Q(message_preference=Author.MessagePref.AUTHOR_ONLY)
+
+        allowed = set(
+            Author.objects.filter(pk__in=[recipient.pk for recipient in recipients])
+            .exclude(excluded)
+            .values_list("pk", flat=True)
+        )
+        return [recipient for recipient in recipients if recipient.pk in allowed]
+
     @property
     def entry_publishable_status(self):
         """:return None if can publish new entries, else return apt error message."""
@@ -364,39 +449,122 @@ class Author(AbstractUser):
         """Eligible users will be able to influence other users' karma points by voting."""
         return not (self.is_novice or self.is_suspended or self.karma <= settings.KARMA_BOUNDARY_LOWER)
 
+    def get_entry_stats(self):
+        """Aggregate the entry statistics that are displayed in the profile page in one query."""
+        published = self.entry_set(manager="objects_published")
+
+        def counter(**timedelta_kwargs):
+            return Count("pk", filter=Q(date_created__gte=time_threshold(**timedelta_kwargs)))
+
+        stats = published.aggregate(
+            total=Count("pk"),
+            month=counter(days=30),
+            week=counter(days=7),
+            day=counter(days=1),
+            latest=Max("date_created"),
+        )
+        stats["computed_at"] = timezone.now()
+        return stats
+
+    @property
+    def _entry_stats_key(self):
+        return f"usercache_entry_stats_usr{self.pk}"
+
+    @cached_property
+    def entry_stats(self):
+        """
+        Entry statistics of the user, kept in one cache record. The record is
+        updated incrementally as entries get published or deleted. Counts for
+        month, week and day might drift until the record expires, which is at
+        most ENTRY_STATS_TIMEOUT seconds after it was computed.
+        """
+        stats = cache.get(self._entry_stats_key)
+
+        if stats is None:
+            stats = self.get_entry_stats()
+            cache.set(self._entry_stats_key, stats, settings.ENTRY_STATS_TIMEOUT)
+
+        return stats
+
     @cached_property
-    @usercache
     def entry_count(self):
-        return self.entry_set(manager="objects_published").count()
+        return self.entry_stats["total"]
 
     @cached_property
-    @usercache
     def entry_count_month(self):
-        return self.get_entry_count_by_threshold(days=30)
+        return self.entry_stats["month"]
 
     @cached_property
-    @usercache
     def entry_count_week(self):
-        return self.get_entry_count_by_threshold(days=7)
+        return self.entry_stats["week"]
 
     @cached_property
-    @usercache
     def entry_count_day(self):
-        return self.get_entry_count_by_threshold(days=1)
+        return self.entry_stats["day"]
 
     @cached_property
-    @usercache
     def last_entry_date(self):
-        with suppress(ObjectDoesNotExist):
-            return self.entry_set(manager="objects_published").latest("date_created").date_created
+        return self.entry_stats["latest"]
+
+    def _forget_entry_stats(self):
+        for name in (
+            "entry_stats",
+            "entry_count",
+            "entry_count_month",
+            "entry_count_week",
+            "entry_count_day",
+            "last_entry_date",
+        ):
+            self.__dict__.pop(name, None)
 
-        return None
+    def shift_entry_stats(self, entry, step):
+        """
+        Update cached entry statistics incrementally, instead of recalculating
+        them. Call with step=1 after an entry gets published and with step=-1
+        after a published entry gets deleted. Also shifts published_entry_count.
+        """
+        Author.objects.filter(pk=self.pk).update(published_entry_count=Greatest(F("published_entry_count") + step, 0))
+        self.published_entry_count = max(self.published_entry_count + step, 0)
+        self._forget_entry_stats()
+        stats = cache.get(self._entry_stats_key)
+
+        if stats is None:
+            return
+
+        stats = dict(stats)  # The record might be shared within the request, see dictionary.utils.cache
+        date_created = entry.date_created
+
+        if step < 0 and stats["latest"] is not None and date_created >= stats["latest"]:
+            # Can't know the date of the previous entry, it will be recalculated on the next read.
+            self.invalidate_entry_counts()
+            return
+
+        stats["total"] = max(stats["total"] + step, 0)
+
+        for name, timedelta_kwargs in (("month", {"days": 30}), ("week", {"days": 7}), ("day", {"days": 1})):
+            if date_created >= time_threshold(**timedelta_kwargs):
+                stats[name] = max(stats[name] + step, 0)
+
+        if step > 0 and (stats["latest"] is None or date_created > stats["latest"]):
+            stats["latest"] = date_created
+
+        # Don't extend the lifetime of the record, so that the counts of the periods get refreshed regularly.
+        remaining = settings.ENTRY_STATS_TIMEOUT - (timezone.now() - stats["computed_at"]).total_seconds()
+
+        if remaining > 1:
+            cache.set(self._entry_stats_key, stats, int(remaining))
+        else:
+            self.invalidate_entry_counts()
 
     def invalidate_entry_counts(self):
-        names = ("entry_count", "entry_count_month", "entry_count_week", "entry_count_day", "last_entry_date")
-        for name in names:
-            key = f"usercache_{name}_context__<lambda>_usr{self.pk}"
-            cache.delete(key)
+        self._forget_entry_stats()
+        cache.delete(self._entry_stats_key)
+
+    @staticmethod
+    def recount_published_entries(authors):
+        """Recalculate published_entry_count of given authors (queryset), e.g. after bulk deletions."""
+        entries = Entry.objects_published.filter(author=OuterRef("pk")).values("pk")
+        authors.update(published_entry_count=SubQueryCount(entries))
 
     @property
     def followers(self):
@@ -428,22 +596,27 @@ class Author(AbstractUser):
     def is_hidden(self):
         return self.is_frozen or (not self.is_active) or self.is_private
 
-    @cached_property
-    def unread_message_count(self):
-        return self.conversations.aggregate(
-            count=Count("messages", filter=Q(messages__recipient=self, messages__read_at__isnull=True))
-        )["count"]
+    @staticmethod
+    def recount_unread_messages(authors):
+        """Recalculate unread_message_count of given authors (queryset) from their conversations."""
+        conversations = settings.get_model("Conversation").objects.filter(holder=OuterRef("pk"))
+        total = conversations.order_by().values("holder").annotate(total=Sum("unread_count")).values("total")
+        authors.update(unread_message_count=Coalesce(Subquery(total), 0))
+
+    def shift_unread_message_count(self, delta):
+        if not delta:
+            return
+
+        Author.objects.filter(pk=self.pk).update(unread_message_count=Greatest(F("unread_message_count") + delta, 0))
+        self.unread_message_count = max(self.unread_message_count + delta, 0)
 
     @cached_property
-    @usercache(timeout=60)
     def unread_topic_count(self):
         """
         Find counts for unread topics and announcements (displayed in header when apt).
 
-        This query seems to be too expensive to be called in every request. So it is called
-        every <timeout> seconds. In following topic list, the cache gets invalidated each
-        request, making that page fresh every time. Actions which might change this data
-        also invalidates this cache. e.g. reading an unread topic/announcement.
+        Unread entry counts of followed topics are stored in TopicFollowing, so this
+        is a plain sum over them, except for crowded topics (see notify_followers).
         """
 
         unread_announcements = (
@@ -463,8 +636,8 @@ class Author(AbstractUser):
         }
 
     def invalidate_unread_topic_count(self):
-        """Invalidates cache of unread_topic_count, set by cached_context."""
-        return cache.delete(f"usercache_unread_topic_count_context__<lambda>_usr{self.pk}")
+        """Resets unread_topic_count of this instance, so that it gets calculated again."""
+        self.__dict__.pop("unread_topic_count", None)
 
     @cached_property
     def novice_queue(self):
@@ -474,24 +647,7 @@ class Author(AbstractUser):
             # with no activity in last one day.
             return None
 
-        def interqueue(user):
-            active_siblings = Author.in_novice_list.annotate_activity(
-                Author.in_novice_list.exclude(pk=user.pk).filter(queue_priority=user.queue_priority)
-            ).filter(is_active_today=True)
-
-            if active_siblings.exists():
-                return active_siblings.filter(application_date__lt=user.application_date).count() + 1
-            return 1
-
-        equal_and_superior = Author.in_novice_list.exclude(pk=self.pk).filter(queue_priority__gte=self.queue_priority)
-
-        if equal_and_superior.exists():
-            superior = equal_and_superior.filter(queue_priority__gt=self.queue_priority)
-
-            if superior_count := superior.count():
-                return superior_count + interqueue(self)
-            return interqueue(self)
-        return 1
+        return Author.in_novice_list.get_position(self)
 
 
 class Memento(models.Model):
@@ -528,6 +684,10 @@ class AccountTerminationQueue(models.Model):
     termination_date = models.DateTimeField(null=True, editable=False)
     date_created = models.DateTimeField(auto_now_add=True)
 
+    # Processing details, see process()
+    locked_until = models.DateTimeField(null=True, editable=False)
+    progress = models.TextField(default="{}", editable=False)  # json text
+
     objects = AccountTerminationQueueManager()
 
     def __str__(self):
@@ -550,6 +710,109 @@ class AccountTerminationQueue(models.Model):
         self.author.save()
         super().delete(*args, **kwargs)
 
+    @property
+    def is_legacy(self):
+        return self.state == self.State.LEGACY and not self.author.is_novice
+
+    def process(self, private_user):
+        """
+        Terminate the account in steps, so that no step holds locks for long:
+        entries are migrated to private_user (or deleted) and conversations
+        targeting the user are archived in chunks, then the user is deleted.
+        Progress is recorded after each chunk, so an interrupted termination
+        resumes where it left off.
+
+        The termination is leased to the caller (see locked_until) and the
+        lease is extended after each chunk, so that overlapping runs skip it.
+        Returns False if the lease couldn't be acquired or got lost.
+        """
+
+        if not self._acquire():
+            return False
+
+        self._progress = json.loads(self.progress)
+
+        if "stage" not in self._progress and not self._checkpoint(stage="entries", entry=0):
+            return False
+
+        if self._progress["stage"] == "entries":
+            if not self._process_entries(private_user) or not self._checkpoint(stage="conversations", conversation=0):
+                return False
+
+        if not self._archive_conversations():
+            return False
+
+        self.author.delete()
+        return True
+
+    def _acquire(self):
+        now = timezone.now()
+        locked_until = now + timezone.timedelta(seconds=settings.TERMINATION_LOCK_TIMEOUT)
+        acquired = (
+            type(self)
+            .objects.filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now), pk=self.pk)
+            .update(locked_until=locked_until)
+        )
+
+        if acquired:
+            self.locked_until = locked_until
+
+        return bool(acquired)
+
+    def _checkpoint(self, **progress):
+        """Record progress and extend the lease, unless it was taken over by another run in the meantime."""
+        self._progress.update(progress)
+        self.progress = json.dumps(self._progress)
+        locked_until = timezone.now() + timezone.timedelta(seconds=settings.TERMINATION_LOCK_TIMEOUT)
+
+        leased = type(self).objects.filter(pk=self.pk, locked_until=self.locked_until)
+
+        if not leased.update(progress=self.progress, locked_until=locked_until):
+            return False
+
+        self.locked_until = locked_until
+        return True
+
+    def _process_entries(self, private_user):
+        # Drafts of legacy accounts are deleted along with the user.
+        entries = self.author.entry_set(manager="objects_published" if self.is_legacy else "objects_all").order_by("pk")
+        cursor, size = self._progress["entry"], settings.TERMINATION_CHUNK_SIZE
+
+        while pks := list(entries.filter(pk__gt=cursor).values_list("pk", flat=True)[:size]):
+            chunk = entries.filter(pk__gt=cursor, pk__lte=pks[-1])
+
+            if self.is_legacy:
+                chunk.update(author=private_user)
+            else:
+                chunk.delete()
+
+            cursor = pks[-1]
+
+            if not self._checkpoint(entry=cursor):
+                return False
+
+        if self.is_legacy:
+            # Reassigned in bulk, see recount_published_entries.
+            Author.recount_published_entries(Author.objects.filter(pk=private_user.pk))
+
+        return True
+
+    def _archive_conversations(self):
+        conversations = self.author.targeted_conversations.select_related("holder", "target").order_by("pk")
+        cursor = self._progress["conversation"]
+
+        while chunk := list(conversations.filter(pk__gt=cursor)[: settings.TERMINATION_CHUNK_SIZE]):
+            cursor = chunk[-1].pk  # Archived conversations get deleted (their pk is set to None).
+
+            with transaction.atomic():
+                for conversation in chunk:
+                    conversation.archive()
+
+            if not self._checkpoint(conversation=cursor):
+                return False
+
+        return True
+
 
 class Badge(models.Model):
     name = models.CharField(max_length=36, verbose_name=_("Name"))
@@ -572,32 +835,61 @@ class Badge(models.Model):
 
 def user_directory_backup(instance, _filename):
     date_str = defaultfilters.date(timezone.localtime(timezone.now()), "Y-m-d")
-    return f"backup/{instance.author.pk}/backup-{date_str}.json"
+    extension = "json.gz" if instance.is_compressed else "json"
+    return f"backup/{instance.author.pk}/backup-{date_str}.{extension}"
+
+
+BACKUP_CHUNK_SIZE = 500
 
 
 class BackUp(models.Model):
+    """
+    Backup file of the published entries and archived conversations of an author.
+    The file is written as it is processed, segment by segment (a batch of entries
+    or a chunk of an archive), so memory usage doesn't depend on the size of the
+    account. Progress is recorded after each segment; if processing gets
+    interrupted, calling process() again continues from the last segment.
+    """
+
     author = models.ForeignKey("Author", on_delete=models.CASCADE)
     file = models.FileField(upload_to=user_directory_backup)
     is_ready = models.BooleanField(default=False)
+    is_compressed = models.BooleanField(default=False)
+    progress = models.TextField(default="{}")  # json text
     date_created = models.DateTimeField(auto_now_add=True)
 
     def process(self):
         if self.is_ready:
             return
 
-        serializer = ArchiveSerializer()
-        entries = self.author.entry_set(manager="objects_published").select_related("topic")
-        conversations = self.author.conversationarchive_set.all()
+        if not self.file:
+            self.is_compressed = settings.BACKUP_COMPRESS
+            name = self.file.field.generate_filename(self, "backup")
+            self.file.name = self.file.storage.get_available_name(name)
+            self.save(update_fields=["file", "is_compressed"])
 
-        entries_text = serializer.serialize(entries, fields=("topic__title", "content", "date_created", "date_edited"))
-        conversations_text = (
-            "[%s]"
-            % "".join('{"target": "%s", "messages": %s},' % (item.target, item.messages) for item in conversations)[:-1]
-        )  # Formatting already-serialized data ([:-1] removes the trailing comma).
+        path = self.file.path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._progress = json.loads(self.progress)
+
+        with open(path, "r+b" if os.path.exists(path) else "wb") as stream:
+            # Discard whatever was written after the last recorded segment.
+            stream.seek(self._progress.get("written", 0))
+            stream.truncate()
+
+            if "stage" not in self._progress:
+                self._write(stream, '{"entries": [', stage="entries", entry=0, entries=0)
+
+            if self._progress["stage"] == "entries":
+                self._write_entries(stream)
+                self._write(stream, '], "conversations": [', stage="conversations", archive=0, offset=None, archives=0)
+
+            if self._progress["stage"] == "conversations":
+                self._write_conversations(stream)
+                self._write(stream, "]}", stage="done")
 
-        content = '{"entries": %s, "conversations": %s}' % (entries_text, conversations_text)
         self.is_ready = True
-        self.file.save("backup", ContentFile(content.encode("utf-8")), save=True)
+        self.save(update_fields=["is_ready"])
 
         settings.get_model("Message").objects.compose(
             get_generic_superuser(),
@@ -608,6 +900,57 @@ class BackUp(models.Model):
             ),
         )
 
+    def _write(self, stream, text, **progress):
+        data = text.encode("utf-8")
+
+        if self.is_compressed:
+            data = gzip.compress(data)  # Concatenated gzip members make up a valid gzip file.
+
+        stream.write(data)
+        stream.flush()
+        os.fsync(stream.fileno())
+
+        self._progress.update(progress, written=stream.tell())
+        self.progress = json.dumps(self._progress)
+        BackUp.objects.filter(pk=self.pk).update(progress=self.progress)
+
+    def _write_entries(self, stream):
+        serializer = ArchiveSerializer()
+        entries = (
+            self.author.entry_set(manager="objects_published")
+            .filter(pk__gt=self._progress["entry"])
+            .select_related("topic")
+            .order_by("pk")
+            .iterator(chunk_size=BACKUP_CHUNK_SIZE)
+        )
+
+        while batch := list(itertools.islice(entries, BACKUP_CHUNK_SIZE)):
+            text = serializer.serialize(batch, fields=("topic__title", "content", "date_created", "date_edited"))
+            count = self._progress["entries"]
+            self._write(stream, ("," if count else "") + text[1:-1], entry=batch[-1].pk, entries=count + len(batch))
+
+    def _write_conversations(self, stream):
+        archives = self.author.conversationarchive_set.filter(pk__gte=self._progress["archive"]).order_by("pk")
+
+        for archive in archives.iterator():
+            if archive.pk == self._progress["archive"]:
+                if self._progress["offset"] is None:
+                    continue  # Already written.
+            else:
+                if archive.messages:
+                    archive.convert_legacy()
+
+                count = self._progress["archives"]
+                header = '{"target": %s, "messages": [' % json.dumps(archive.target)
+                self._write(stream, ("," if count else "") + header, archive=archive.pk, offset=0, archives=count + 1)
+
+            # Chunks are already serialized as JSON lines.
+            for chunk in archive.chunks.filter(offset__gte=self._progress["offset"]).iterator():
+                text = ("," if chunk.offset else "") + chunk.messages.replace("\n", ",")
+                self._write(stream, text, offset=chunk.offset + chunk.count)
+
+            self._write(stream, "]}", offset=None)
+
     def process_async(self):
         from dictionary.tasks import process_backup  # noqa
 
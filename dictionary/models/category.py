@@ -1,4 +1,3 @@
-from django.core.cache import cache
 from django.db import models
 from django.db.models import Sum, UniqueConstraint
 from django.db.models.functions import Coalesce
@@ -49,7 +48,9 @@ class Category(models.Model):
         self.slug = uuslug(self.name, instance=self)
 
         # Deletes cache of context processor that holds list of categories.
-        cache.delete("default_context__header_categories")
+        from dictionary.utils.context_processors import header_categories  # Circular import
+
+        header_categories.invalidate()
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -6,6 +6,7 @@ from django.shortcuts import reverse
 from django.utils import timezone
 from django.utils.translation import gettext, gettext_lazy as _
 
+from dictionary.models.m2m import TopicFollowing
 from dictionary.models.managers.entry import EntryManager, EntryManagerAll, EntryManagerOnlyPublished
 from dictionary.models.messaging import Message
 from dictionary.utils import get_generic_privateuser, get_generic_superuser, smart_lower
@@ -34,15 +35,25 @@ class Entry(models.Model):
     def __str__(self):
         return f"{self.id}#{self.author}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the draft status as loaded, so that publishing a draft can be detected on save.
+        instance._loaded_is_draft = dict(zip(field_names, values)).get("is_draft")
+        return instance
+
     def save(self, *args, **kwargs):
         created = self.pk is None
         self.content = smart_lower(self.content)
-
-        if created:
-            self.author.invalidate_entry_counts()
+        published = not self.is_draft and (created or getattr(self, "_loaded_is_draft", None) is True)
 
         super().save(*args, **kwargs)
 
+        if published:
+            self._loaded_is_draft = False
+            self.author.shift_entry_stats(self, 1)
+            TopicFollowing.objects.notify_followers(self)
+
         # Check if the user has written 10 entries, If so make them available for novice lookup
         if self.author.is_novice and self.author.application_status == "OH" and self.author.entry_count >= 10:
             self.author.application_status = "PN"
@@ -68,13 +79,19 @@ class Entry(models.Model):
 
     def delete(self, *args, **kwargs):
         if self.comments.exists():
+            if not self.is_draft:
+                self.author.shift_entry_stats(self, -1)
+
             self.author = get_generic_privateuser()
             self.save()
             return
 
-        self.author.invalidate_entry_counts()
         super().delete(*args, **kwargs)
 
+        if not self.is_draft:
+            self.author.shift_entry_stats(self, -1)
+            TopicFollowing.objects.notify_followers(self, step=-1)
+
         if self.author.is_novice and self.author.application_status == "PN" and self.author.entry_count < 10:
             # If the entry count drops less than 10, remove user from novice lookup.
             # This does not trigger if bulk deletion made on admin panel (users can
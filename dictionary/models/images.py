@@ -1,38 +1,97 @@
+import mimetypes
 import secrets
 import string
 import uuid
 
-from django.db import models
+from functools import partial
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, models, transaction
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+from PIL import Image as PIL_Image, ImageOps, features
+
+from dictionary.conf import settings
+from dictionary.utils.decorators import memoize
+
+
+SLUG_ATTEMPTS = 5
+
 
 def user_directory_path(instance, filename):
     ext = filename.split(".")[-1]
     return f"images/{instance.author.pk}/{uuid.uuid4().hex}.{ext}"
 
 
+def variant_directory_path(instance, filename):
+    return f"images/{instance.author_id}/variants/{filename}"
+
+
 def image_slug():
     """
-    Assigns a slug to an image. (Tries again recursively if the slug is taken.)
+    Assigns a slug to an image. (Collisions are handled while saving, see Image.save)
+    """
+
+    return "".join(secrets.choice(string.ascii_lowercase + string.digits) for _i in range(8))
+
+
+@memoize(timeout=86400, cache_none=False)
+def resolve_image(slug):
+    """
+    Details of the image with given slug and its files, as needed to serve
+    them (see ImageDetailBase). Invalidated as the image gets saved. ETags are
+    computed the way Nginx does, so that they match when served via X-Accel.
+    Unknown slugs are not cached, so that probing them doesn't fill the cache.
     """
 
-    slug = "".join(secrets.choice(string.ascii_lowercase + string.digits) for _i in range(8))
+    image = Image.objects.filter(slug=slug).first()
+
+    if image is None:
+        return None
+
+    files = {}
+
+    for field in ("file", *Image.VARIANTS):
+        if not (file := getattr(image, field)):
+            continue
+
+        try:
+            last_modified = int(file.storage.get_modified_time(file.name).timestamp())
+            etag = f'"{last_modified:x}-{file.storage.size(file.name):x}"'
+        except (OSError, NotImplementedError):
+            last_modified = int(image.date_created.timestamp())
+            etag = f'"{uuid.uuid5(uuid.NAMESPACE_URL, file.name).hex}"'
+
+        files[field] = {
+            "name": file.name,
+            "url": file.url,
+            "content_type": Image.get_content_type(file),
+            "last_modified": last_modified,
+            "etag": etag,
+        }
 
-    try:
-        Image.objects.get(slug=slug)
-        return image_slug()
-    except Image.DoesNotExist:
-        return slug
+    return {"is_deleted": image.is_deleted, "is_processed": bool(image.thumbnail), "files": files}
 
 
 class Image(models.Model):
+    VARIANTS = ("thumbnail", "display", "webp")
+
     author = models.ForeignKey("Author", null=True, on_delete=models.SET_NULL, verbose_name=_("Author"))
     file = models.ImageField(upload_to=user_directory_path, verbose_name=_("File"))
     slug = models.SlugField(default=image_slug, unique=True, editable=False)
     is_deleted = models.BooleanField(default=False, verbose_name=_("Unpublished"))
     date_created = models.DateTimeField(auto_now_add=True, verbose_name=_("Date created"))
 
+    # Filled by process() after the upload.
+    width = models.PositiveIntegerField(null=True, editable=False, verbose_name=_("Width"))
+    height = models.PositiveIntegerField(null=True, editable=False, verbose_name=_("Height"))
+    format = models.CharField(max_length=16, blank=True, editable=False, verbose_name=_("Format"))
+    thumbnail = models.ImageField(upload_to=variant_directory_path, blank=True, editable=False)
+    display = models.ImageField(upload_to=variant_directory_path, blank=True, editable=False)
+    webp = models.ImageField(upload_to=variant_directory_path, blank=True, editable=False)
+
     class Meta:
         verbose_name = _("image")
         verbose_name_plural = _("images")
@@ -40,9 +99,108 @@ class Image(models.Model):
     def __str__(self):
         return str(self.slug)
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self._insert(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+
+        # Otherwise a concurrent request could cache the old row again, before the change is committed.
+        transaction.on_commit(partial(resolve_image.invalidate, self.slug))
+
+    def _insert(self, *args, **kwargs):
+        # Rely on the unique constraint instead of querying for each slug beforehand.
+        for attempt in range(SLUG_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                break
+            except IntegrityError:
+                if attempt == SLUG_ATTEMPTS - 1 or not Image.objects.filter(slug=self.slug).exists():
+                    raise
+
+                self.slug = image_slug()
+
     def delete(self, *args, **kwargs):
         super().delete()
+        transaction.on_commit(partial(resolve_image.invalidate, self.slug))
         self.file.delete(save=False)
 
+        for variant in self.VARIANTS:
+            getattr(self, variant).delete(save=False)
+
     def get_absolute_url(self):
         return reverse("image-detail", kwargs={"slug": self.slug})
+
+    def process(self):
+        """
+        Record dimensions and format of the uploaded file and generate its
+        variants: a thumbnail, a display sized copy if the file is too large
+        (see COMPRESS_IMAGES) and a WebP copy of the latter if supported.
+        Animated images only get a thumbnail, so as to keep the animations.
+        """
+
+        with self.file.open("rb") as file:
+            original = PIL_Image.open(file)
+            original.load()
+
+        image = ImageOps.exif_transpose(original)
+        self.format, (self.width, self.height) = original.format or "", image.size
+        animated = getattr(original, "is_animated", False)
+        name = uuid.uuid4().hex
+
+        self._save_variant("thumbnail", f"{name}_thumbnail", image, settings.IMAGE_THUMBNAIL_SIZE)
+
+        if (
+            settings.COMPRESS_IMAGES
+            and not animated
+            and (self.file.size > settings.COMPRESS_THRESHOLD or max(image.size) > settings.IMAGE_DISPLAY_SIZE)
+        ):
+            self._save_variant("display", f"{name}_display", image, settings.IMAGE_DISPLAY_SIZE)
+
+        if settings.COMPRESS_IMAGES and not animated and features.check("webp"):
+            self._save_variant("webp", f"{name}_display", image, settings.IMAGE_DISPLAY_SIZE, image_format="WEBP")
+
+        self.save(update_fields=["width", "height", "format", *self.VARIANTS])
+
+    def _save_variant(self, variant, name, image, size, image_format=None):
+        image_format = image_format or self.format or "PNG"
+
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        copy, buffer = image.copy(), BytesIO()
+        copy.thumbnail((size, size))
+        copy.save(buffer, image_format, quality=settings.COMPRESS_QUALITY)
+
+        extension = mimetypes.guess_extension(PIL_Image.MIME.get(image_format, "")) or ""
+        getattr(self, variant).save(f"{name}{extension}", ContentFile(buffer.getvalue()), save=False)
+
+    @classmethod
+    def select_variant(cls, available, accept="", variant=None):
+        """
+        Select the file to be served among available ones. Requested variant is
+        used if exists, otherwise the display sized copy is preferred, in WebP
+        format if the client accepts it.
+        """
+
+        if variant in cls.VARIANTS and variant in available:
+            return variant
+
+        if "webp" in available and "image/webp" in accept:
+            return "webp"
+
+        return "display" if "display" in available else "file"
+
+    def get_variant(self, accept="", variant=None):
+        available = [field for field in self.VARIANTS if getattr(self, field)]
+        return getattr(self, self.select_variant(available, accept, variant))
+
+    @staticmethod
+    def get_content_type(file):
+        return mimetypes.guess_type(file.name)[0] or "application/octet-stream"
+
+    def process_async(self):
+        from dictionary.tasks import process_image  # noqa
+
+        transaction.on_commit(lambda: process_image.delay(self.pk))
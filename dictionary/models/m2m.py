@@ -1,12 +1,20 @@
 from django.db import models
 
+from dictionary.models.managers.m2m import TopicFollowingManager
+
 
 class TopicFollowing(models.Model):
     topic = models.ForeignKey("Topic", on_delete=models.CASCADE)
     author = models.ForeignKey("Author", on_delete=models.CASCADE)
     read_at = models.DateTimeField(auto_now_add=True)
+    unread_count = models.PositiveIntegerField(null=True, default=0)
     date_created = models.DateTimeField(auto_now_add=True)
 
+    objects = TopicFollowingManager()
+
+    class Meta:
+        indexes = [models.Index(fields=["author", "unread_count"])]
+
 
 class EntryFavorites(models.Model):
     author = models.ForeignKey("Author", on_delete=models.CASCADE)
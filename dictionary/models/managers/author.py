@@ -2,10 +2,12 @@ import logging
 
 from django.contrib.auth.models import UserManager
 from django.db import models
-from django.db.models import BooleanField, Case, Q, When
+from django.db.models import BooleanField, Case, F, Q, Window, When
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 
 from dictionary.utils import get_generic_privateuser, time_threshold
+from dictionary.utils.cache import cache
 
 
 logger = logging.getLogger(__name__)
@@ -35,6 +37,41 @@ class InNoviceList(AuthorManagerAccessible):
             return qs[:limit]
         return qs
 
+    ranking_key = "novice_ranking"
+    ranking_timeout = 3600  # Refreshed by a periodic task before that, see tasks.py
+
+    def get_ranking(self):
+        """
+        Return a dict of user pk -> queue position for all users in novice list,
+        in queue order. The ranking is computed with a single query and cached
+        until the queue changes, so reading it is cheap.
+        """
+        ranking = cache.get(self.ranking_key)
+
+        if ranking is None:
+            ranking = self.refresh_ranking()
+
+        return ranking
+
+    def refresh_ranking(self):
+        ordering = [F("queue_priority").desc(), F("is_active_today").desc(), F("application_date").asc()]
+        positions = (
+            self.annotate_activity(self.filter(last_activity__isnull=False))
+            .annotate(position=Window(expression=RowNumber(), order_by=ordering))
+            .order_by("position")
+            .values_list("pk", "position")
+        )
+        ranking = dict(positions)
+        cache.set(self.ranking_key, ranking, self.ranking_timeout)
+        return ranking
+
+    def invalidate_ranking(self):
+        cache.delete(self.ranking_key)
+
+    def get_position(self, user):
+        """Queue position of given user, None if the user is not in novice list."""
+        return self.get_ranking().get(user.pk)
+
     @staticmethod
     def annotate_activity(queryset):
         return queryset.annotate(
@@ -47,29 +84,21 @@ class InNoviceList(AuthorManagerAccessible):
 
 
 class AccountTerminationQueueManager(models.Manager):
-    _private_user = None
-
     def get_terminated(self):
         return self.exclude(state="FZ").filter(termination_date__lt=timezone.now())
 
-    @staticmethod
-    def terminate_no_trace(user):
-        logger.info("User account terminated: %s<->%d", user.username, user.pk)
-        user.delete()
-
-    def terminate_legacy(self, user):
-        if not user.is_novice:
-            # Migrate entries before deleting the user completely
-            user.entry_set(manager="objects_published").all().update(author=self._private_user)
-            logger.info("User entries migrated: %s<->%d", user.username, user.pk)
+    def commit_terminations(self):
+        """
+        Process due terminations as a work queue; terminations that are being
+        processed by another run are skipped (see AccountTerminationQueue.process).
+        """
+        private_user = get_generic_privateuser()
 
-        self.terminate_no_trace(user)
+        for termination in self.get_terminated().select_related("author").order_by("termination_date"):
+            user = termination.author
 
-    def commit_terminations(self):
-        self._private_user = get_generic_privateuser()
+            if termination.process(private_user):
+                if termination.is_legacy:
+                    logger.info("User entries migrated: %s<->%d", user.username, user.pk)
 
-        for termination in self.get_terminated().select_related("author"):
-            if termination.state == "NT":
-                self.terminate_no_trace(termination.author)
-            elif termination.state == "LE":
-                self.terminate_legacy(termination.author)
+                logger.info("User account terminated: %s<->%d", user.username, user.pk)
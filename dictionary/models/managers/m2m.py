@@ -0,0 +1,52 @@
+from django.db.models import Case, F, Manager, When
+from django.utils import timezone
+
+from dictionary.conf import settings
+from dictionary.utils.cache import cache
+
+
+class TopicFollowingManager(Manager):
+    def notify_followers(self, entry, step=1):
+        """
+        Shift unread counts of the users following the topic of given entry. Use
+        step=1 when the entry gets published and step=-1 when it gets deleted.
+
+        Topics with too many followers are not fanned out, instead their unread
+        counts are set to NULL so that they get calculated upon reading (see
+        Author.get_following_topics_with_receipt). NULL counts are kept as they
+        are read, so only the rows of new followers get updated here.
+        """
+
+        if entry.author.is_novice:
+            # Novice entries are not visible to followers.
+            return
+
+        followers = self.filter(topic_id=entry.topic_id, unread_count__isnull=False)
+
+        if self.follower_count(entry.topic_id) > settings.TOPIC_FOLLOWING_FANOUT_LIMIT:
+            followers.update(unread_count=None)
+            return
+
+        followers = followers.exclude(author_id=entry.author_id).exclude(author__blocked=entry.author_id)
+
+        if step > 0:
+            followers.update(unread_count=F("unread_count") + step)
+        else:
+            followers.filter(read_at__lte=entry.date_created, unread_count__gt=0).update(
+                unread_count=F("unread_count") + step
+            )
+
+    def follower_count(self, topic_id):
+        """Approximate follower count of given topic, only used to detect crowded topics."""
+        return cache.get_or_set(
+            f"topic_follower_count_{topic_id}", lambda: self.filter(topic_id=topic_id).count(), 3600
+        )
+
+    def mark_read(self, author, **filters):
+        """
+        Mark topics followed by given author as read, filters narrow down the
+        topics. Counts of crowded topics stay NULL (see notify_followers).
+        """
+        return self.filter(author=author, **filters).update(
+            read_at=timezone.now(), unread_count=Case(When(unread_count__isnull=True, then=None), default=0)
+        )
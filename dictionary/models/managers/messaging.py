@@ -1,7 +1,13 @@
 from contextlib import suppress
 
-from django.db import models
-from django.db.models import Count, Max, Q
+from django.db import connections, models, transaction
+from django.db.models import F, OuterRef, Q, Subquery
+
+from dictionary.conf import settings
+from dictionary.utils import smart_lower
+from dictionary.utils.db import SubQueryCount
+
+BULK_BATCH_SIZE = 500
 
 
 class MessageManager(models.Manager):
@@ -13,23 +19,107 @@ class MessageManager(models.Manager):
         message = self.create(sender=sender, recipient=recipient, body=body, has_receipt=has_receipt)
         return message
 
+    @transaction.atomic
+    def compose_many(self, sender, recipients, body):
+        """
+        Send the same message to multiple recipients, in a constant number of
+        queries. Works like compose (including deliver_message), but permissions
+        are checked, and messages, conversations and their relations are created
+        in bulk. Returns the list of created messages.
+        """
+
+        recipients = sender.filter_message_recipients(recipients)
+
+        if not recipients:
+            return []
+
+        body = smart_lower(body).strip()
+        messages = self.bulk_create(
+            [
+                self.model(
+                    sender=sender,
+                    recipient=recipient,
+                    body=body,
+                    has_receipt=sender.allow_receipts and recipient.allow_receipts,
+                )
+                for recipient in recipients
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+        if not connections[self.db].features.can_return_rows_from_bulk_insert:
+            # Primary keys are not set by bulk_create, fetch them back. Rows inserted in this
+            # transaction are the latest ones of this sender.
+            created = self.filter(sender=sender).order_by("-pk").values_list("recipient", "pk")[: len(messages)]
+            pks = dict(created)
+
+            for message in messages:
+                message.pk = pks[message.recipient_id]
+
+        Conversation = settings.get_model("Conversation")  # Circular import | pylint: disable=C0103
+        recipient_ids = [recipient.pk for recipient in recipients]
+        pairs = [(sender.pk, pk) for pk in recipient_ids] + [(pk, sender.pk) for pk in recipient_ids]
+
+        Conversation.objects.bulk_create(
+            [Conversation(holder_id=holder, target_id=target) for holder, target in pairs],
+            batch_size=BULK_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+        conversations = Conversation.objects.filter(
+            Q(holder=sender, target__in=recipient_ids) | Q(holder__in=recipient_ids, target=sender)
+        ).values_list("holder", "target", "pk")
+        conversations = {(holder, target): pk for holder, target, pk in conversations}
+
+        Conversation.messages.through.objects.bulk_create(
+            [
+                Conversation.messages.through(conversation_id=conversations[pair], message_id=message.pk)
+                for message in messages
+                for pair in ((sender.pk, message.recipient_id), (message.recipient_id, sender.pk))
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+        # Update denormalized fields, see deliver_message.
+        latest = Conversation.messages.through.objects.filter(conversation=OuterRef("pk")).order_by("-message__sent_at")
+        Conversation.objects.filter(pk__in=conversations.values()).update(
+            last_message=Subquery(latest.values("message")[:1]),
+            last_message_at=Subquery(latest.values("message__sent_at")[:1]),
+        )
+
+        targeted = Conversation.objects.filter(holder__in=recipient_ids, target=sender)
+        targeted.update(unread_count=F("unread_count") + 1)
+        settings.get_model("Author").objects.filter(pk__in=recipient_ids).update(
+            unread_message_count=F("unread_message_count") + 1
+        )
+        return messages
+
 
 class ConversationManager(models.Manager):
     def list_for_user(self, user, search_term=None):
-        # List conversation list for user, provide search_term to search in messages
+        """
+        List conversations of the user, provide search_term to search in messages
+        and usernames of targets. Search results are annotated with match_count
+        and match_preview (the latest matching message).
+
+        Message bodies are saved in lower case, so search_term is expected to be
+        in lower case as well. In PostgreSQL, body search uses a trigram index
+        (see dictionary.signals.messaging).
+        """
+
+        base = self.filter(holder=user)
 
         if search_term:
-            base = self.filter(
-                Q(holder=user)
-                & (Q(messages__body__icontains=search_term) | Q(messages__recipient__username__icontains=search_term)),
+            matches = self.model.messages.through.objects.filter(
+                conversation=OuterRef("pk"), message__body__contains=search_term
             )
-        else:
-            base = self.filter(holder=user)
+            base = base.annotate(
+                match_count=SubQueryCount(matches.values("pk")),
+                match_preview=Subquery(matches.order_by("-message__sent_at").values("message__body")[:1]),
+            ).filter(Q(match_count__gt=0) | Q(target__username__icontains=search_term))
 
-        return base.annotate(
-            message_sent_last=Max("messages__sent_at"),
-            unread_count=Count("messages", filter=Q(messages__recipient=user, messages__read_at__isnull=True)),
-        ).order_by("-message_sent_last")
+        # Summary fields are denormalized, see Conversation.last_message_at and Conversation.unread_count
+        return base.order_by(F("last_message_at").desc(nulls_last=True), "-pk")
 
     def with_user(self, sender, recipient):
         with suppress(self.model.DoesNotExist):
@@ -1,6 +1,7 @@
 import json
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery
 from django.db.models.constraints import UniqueConstraint
 from django.urls import reverse
 from django.utils import timezone
@@ -10,6 +11,7 @@ from uuslug import slugify
 
 from dictionary.models.managers.messaging import ConversationManager, MessageManager
 from dictionary.utils import smart_lower
+from dictionary.utils.db import SubQueryCount
 from dictionary.utils.serializers import ArchiveSerializer
 from dictionary.utils.validators import validate_user_text
 
@@ -40,12 +42,51 @@ class Message(models.Model):
         self.save()
 
 
+ARCHIVE_CHUNK_SIZE = 100
+
+
+class ArchivedMessages:
+    """
+    Lazy sequence of the messages of an archive (can be used with Paginator).
+    Slicing fetches only the chunks that contain the requested messages.
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+
+    def __len__(self):
+        return self.archive.message_count
+
+    def __iter__(self):
+        for chunk in self.archive.chunks.iterator():
+            yield from chunk.get_messages()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            index = key + len(self) if key < 0 else key
+            return self[index : index + 1][0]
+
+        start, stop, step = key.indices(len(self))
+
+        if start >= stop:
+            return []
+
+        chunks = list(self.archive.chunks.filter(offset__lt=stop, offset__gt=start - F("count")))
+        messages = [message for chunk in chunks for message in chunk.get_messages()]
+        offset = chunks[0].offset if chunks else 0
+        return messages[start - offset : stop - offset : step]
+
+
 class ConversationArchive(models.Model):
     holder = models.ForeignKey("Author", on_delete=models.CASCADE)
     target = models.CharField(max_length=35)
     slug = models.SlugField()
 
-    messages = models.TextField()  # json text
+    message_count = models.PositiveIntegerField(default=0)
+    last_message = models.TextField(default="{}")  # json text, used in previews
+
+    # json text of the archives created before chunks, emptied by convert_legacy.
+    messages = models.TextField(blank=True, default="", editable=False)
     date_created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -70,9 +111,80 @@ class ConversationArchive(models.Model):
         return reverse("conversation-archive", kwargs={"slug": self.slug})
 
     @cached_property
-    def to_json(self):
-        # JSON text to Python object
-        return {"holder": self.holder, "target": self.target, "messages": json.loads(self.messages)}
+    def preview(self):
+        if self.messages:  # Not converted yet
+            return (json.loads(self.messages) or [{}])[-1]
+
+        return json.loads(self.last_message)
+
+    @property
+    def archived_messages(self):
+        return ArchivedMessages(self)
+
+    @transaction.atomic
+    def convert_legacy(self):
+        """
+        Move the messages of an archive that was created before chunks into
+        chunks. Returns False if there was nothing to convert.
+        """
+
+        legacy = type(self).objects.select_for_update().values_list("messages", flat=True).get(pk=self.pk)
+
+        if not legacy:
+            return False
+
+        type(self).objects.filter(pk=self.pk).update(messages="")
+        self.messages = ""
+        self.append(json.loads(legacy))
+        return True
+
+    @transaction.atomic
+    def append(self, messages):
+        """
+        Append serialized messages (a list of dicts) as new chunks. Existing
+        chunks are not read, so this costs only as much as the new messages.
+        """
+
+        if not messages:
+            return
+
+        if self.messages:
+            self.convert_legacy()  # Legacy messages come first.
+
+        offset = type(self).objects.select_for_update().values_list("message_count", flat=True).get(pk=self.pk)
+        ConversationArchiveChunk.objects.bulk_create(
+            ConversationArchiveChunk(
+                archive=self,
+                offset=offset + start,
+                count=len(batch),
+                messages="\n".join(json.dumps(message) for message in batch),
+            )
+            for start in range(0, len(messages), ARCHIVE_CHUNK_SIZE)
+            if (batch := messages[start : start + ARCHIVE_CHUNK_SIZE])
+        )
+
+        self.message_count, self.last_message = offset + len(messages), json.dumps(messages[-1])
+        self.__dict__.pop("preview", None)
+        type(self).objects.filter(pk=self.pk).update(message_count=self.message_count, last_message=self.last_message)
+
+
+class ConversationArchiveChunk(models.Model):
+    """Messages of an archive are stored as JSON lines, in append-only chunks."""
+
+    archive = models.ForeignKey(ConversationArchive, on_delete=models.CASCADE, related_name="chunks")
+    offset = models.PositiveIntegerField()  # Index of the first message of the chunk, in the archive.
+    count = models.PositiveIntegerField()
+    messages = models.TextField()
+
+    class Meta:
+        constraints = [UniqueConstraint(fields=["archive", "offset"], name="unique_conversationarchivechunk")]
+        ordering = ("offset",)
+
+    def __str__(self):
+        return f"{self.__class__.__name__} #{self.pk} of {self.archive_id}"
+
+    def get_messages(self):
+        return [json.loads(line) for line in self.messages.splitlines()]
 
 
 class Conversation(models.Model):
@@ -82,10 +194,16 @@ class Conversation(models.Model):
     messages = models.ManyToManyField(Message)
     date_created = models.DateTimeField(auto_now_add=True)
 
+    # Denormalized summary of messages, so that inbox and badges don't need to aggregate over messages.
+    last_message = models.ForeignKey(Message, null=True, on_delete=models.SET_NULL, related_name="+", editable=False)
+    last_message_at = models.DateTimeField(null=True, editable=False)
+    unread_count = models.PositiveIntegerField(default=0, editable=False)
+
     objects = ConversationManager()
 
     class Meta:
         constraints = [UniqueConstraint(fields=["holder", "target"], name="unique_conversation")]
+        indexes = [models.Index(fields=["holder", "-last_message_at"])]
 
     def __str__(self):
         return f"<Conversation> holder-> {self.holder.username}, target-> {self.target.username}"
@@ -95,33 +213,58 @@ class Conversation(models.Model):
 
     def archive(self):
         serializer = ArchiveSerializer()
-        _messages = self.messages.select_related("sender", "recipient")
-
-        if not _messages.exists():
-            return self
-
         messages = serializer.serialize(
-            _messages,
+            self.messages.select_related("sender", "recipient"),
             fields=("body", "sender__username", "recipient__username", "sent_at"),
         )
 
-        try:
-            # Extend existing archive
-            existent = ConversationArchive.objects.select_related("holder").get(
-                holder=self.holder, target=self.target.username
-            )
-            previous_messages = existent.to_json["messages"]
-            previous_messages.extend(json.loads(messages))
-            existent.messages = json.dumps(previous_messages)
-            existent.save(update_fields=["messages"])
-        except ConversationArchive.DoesNotExist:
-            ConversationArchive.objects.create(holder=self.holder, target=self.target.username, messages=messages)
+        if not (messages := json.loads(messages)):
+            return self
 
+        # Extend existing archive, if any.
+        archive, _ = ConversationArchive.objects.get_or_create(holder=self.holder, target=self.target.username)
+        archive.append(messages)
         return self.delete()
 
-    @property
-    def last_message(self):
-        return self.messages.latest("sent_at")
+    @transaction.atomic
+    def mark_read(self):
+        """Mark the messages sent to holder as read."""
+        count = self.messages.filter(recipient=self.holder_id, read_at__isnull=True).update(read_at=timezone.now())
+
+        if count:
+            type(self).objects.filter(pk=self.pk).update(unread_count=0)
+            self.unread_count = 0
+            self.holder.shift_unread_message_count(-count)
+
+        return count
+
+    @transaction.atomic
+    def refresh_summary(self):
+        """Recalculate denormalized fields from messages, e.g. after some messages are removed."""
+        previous = type(self).objects.select_for_update().values_list("unread_count", flat=True).get(pk=self.pk)
+        self.last_message = self.messages.order_by("-sent_at").first()
+        self.last_message_at = getattr(self.last_message, "sent_at", None)
+        self.unread_count = self.messages.filter(recipient=self.holder_id, read_at__isnull=True).count()
+
+        type(self).objects.filter(pk=self.pk).update(
+            last_message=self.last_message, last_message_at=self.last_message_at, unread_count=self.unread_count
+        )
+        self.holder.shift_unread_message_count(self.unread_count - previous)
+
+    @staticmethod
+    def refresh_summaries(conversations):
+        """
+        Set-based refresh_summary for given conversations (queryset), e.g. to fill
+        the fields for existing rows. Unread message counts of the holders are not
+        updated, see Author.recount_unread_messages.
+        """
+        latest = Conversation.messages.through.objects.filter(conversation=OuterRef("pk")).order_by("-message__sent_at")
+        unread = Message.objects.filter(conversation=OuterRef("pk"), recipient=OuterRef("holder"), read_at__isnull=True)
+        conversations.update(
+            last_message=Subquery(latest.values("message")[:1]),
+            last_message_at=Subquery(latest.values("message__sent_at")[:1]),
+            unread_count=SubQueryCount(unread.values("pk")),
+        )
 
     @property
     def collection(self):
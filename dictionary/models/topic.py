@@ -128,29 +128,24 @@ class Topic(models.Model):
         invoked_by_entry = fulfiller_entry is not None
         wishes = self.wishes.all().select_related("author")
 
-        for wish in wishes:
-            self_fulfillment = invoked_by_entry and fulfiller_entry.author == wish.author
-
-            if self_fulfillment:
-                continue
-
-            message = (
-                gettext(
-                    "`%(title)s`, the topic you wished for, had an entry"
-                    " entered by `@%(username)s`: (see: #%(entry)d)"
-                )
-                % {
-                    "title": self.title,
-                    "username": fulfiller_entry.author.username,
-                    "entry": fulfiller_entry.pk,
-                }
-                if invoked_by_entry
-                else gettext("`%(title)s`, the topic you wished for, is now populated with some entries.")
-                % {"title": self.title}
+        message = (
+            gettext(
+                "`%(title)s`, the topic you wished for, had an entry"
+                " entered by `@%(username)s`: (see: #%(entry)d)"
             )
-
-            Message.objects.compose(get_generic_superuser(), wish.author, message)
-
+            % {
+                "title": self.title,
+                "username": fulfiller_entry.author.username,
+                "entry": fulfiller_entry.pk,
+            }
+            if invoked_by_entry
+            else gettext("`%(title)s`, the topic you wished for, is now populated with some entries.")
+            % {"title": self.title}
+        )
+
+        # Self fulfillment is not notified.
+        wishers = [wish.author for wish in wishes if not (invoked_by_entry and fulfiller_entry.author == wish.author)]
+        Message.objects.compose_many(get_generic_superuser(), wishers, message)
         return wishes.delete()
 
     def wish_collection(self):
@@ -3,5 +3,6 @@ from .m2m import (
     update_vote_rate_upvote,
     update_vote_rate_downvote,
     update_topic_disambiguation,
+    invalidate_relations,
 )
 from .messaging import deliver_message
@@ -1,5 +1,6 @@
 from functools import wraps
 
+from django.db import transaction
 from django.db.models import F
 from django.db.models.signals import m2m_changed
 from django.dispatch import receiver
@@ -62,34 +63,73 @@ def update_vote_rate_downvote(action, entries, **kwargs):
         entries.update(vote_rate=F("vote_rate") + rate)
 
 
+@receiver(m2m_changed, sender=Author.blocked.through)
+@receiver(m2m_changed, sender=Author.following.through)
+def invalidate_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    """Signal to invalidate cached relationships (blocked, blocked_by and following) of affected users."""
+
+    if action == "pre_clear":
+        # pk_set is None on clear, so collect the counterparts before the rows are gone.
+        source, target = ("to_author", "from_author") if reverse else ("from_author", "to_author")
+        instance._cleared_relations = set(sender.objects.filter(**{source: instance.pk}).values_list(target, flat=True))
+        return
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_relations", ())
+
+    instance.invalidate_relations()
+
+    for pk in pk_set:
+        Author(pk=pk).invalidate_relations()
+
+
+def mirror_group(pks):
+    """
+    Primary keys of given topics and the topics connected to them through
+    mirrors, transitively. Mirror groups are normally complete, so this takes
+    one query per level of the breadth-first search (usually two).
+    """
+
+    through, group, frontier = Topic.mirrors.through, set(pks), set(pks)
+
+    while frontier:
+        linked = through.objects.filter(from_topic__in=frontier).values_list("to_topic", flat=True)
+        frontier = set(linked) - group
+        group |= frontier
+
+    return group
+
+
 @receiver(m2m_changed, sender=Topic.mirrors.through)
 def update_topic_disambiguation(instance, action, pk_set, **kwargs):
-    """Signal to auto update all mirrors of given topic's related objects."""
+    """
+    Signal to keep the mirror groups complete, i.e. every topic in a group is
+    a mirror of all others. Adding mirrors merges the groups of the topics
+    involved; removing one dissolves the whole group. Rows of the through table
+    are bulk inserted/deleted, which doesn't send this signal again.
+    """
+
+    if action not in ("post_add", "post_remove") or not pk_set:
+        return
 
-    appended_topics = Topic.objects.filter(pk__in=pk_set)
-    current = instance.mirrors.all()
+    through = Topic.mirrors.through
 
-    if action not in ("post_add", "post_remove"):
-        return
+    with transaction.atomic():
+        group = mirror_group({instance.pk, *pk_set})
+        links = through.objects.filter(from_topic__in=group)
+
+        if action == "post_remove":
+            links.delete()
+            return
 
-    for topic in appended_topics:
-
-        related = topic.mirrors.all()
-
-        for mirror in related:
-            if mirror != instance:
-                if action == "post_add":
-                    if mirror not in current:
-                        instance.mirrors.add(mirror)
-                else:
-                    if mirror in current:
-                        instance.mirrors.remove(mirror)
-
-        for neighbor in current:
-            if neighbor != topic:
-                if neighbor not in related:
-                    if action == "post_add":
-                        topic.mirrors.add(neighbor)
-                else:
-                    if action == "post_remove":
-                        topic.mirrors.remove(neighbor)
+        existing = set(links.values_list("from_topic", "to_topic"))
+        missing = [
+            through(from_topic_id=source, to_topic_id=target)
+            for source in group
+            for target in group
+            if source != target and (source, target) not in existing
+        ]
+        through.objects.bulk_create(missing, ignore_conflicts=True)
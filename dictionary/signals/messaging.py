@@ -1,4 +1,6 @@
-from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_migrate, post_save, pre_delete
 from django.dispatch import receiver
 
 from dictionary.models.messaging import Conversation, Message
@@ -20,6 +22,11 @@ def deliver_message(instance, created, **kwargs):
     holder.messages.add(instance)
     target.messages.add(instance)
 
+    summary = {"last_message": instance, "last_message_at": instance.sent_at}
+    Conversation.objects.filter(pk=holder.pk).update(**summary)
+    Conversation.objects.filter(pk=target.pk).update(**summary, unread_count=F("unread_count") + 1)
+    instance.recipient.shift_unread_message_count(1)
+
 
 @receiver(m2m_changed, sender=Conversation.messages.through)
 def delete_orphan_messages_individual(action, pk_set, **kwargs):
@@ -27,6 +34,32 @@ def delete_orphan_messages_individual(action, pk_set, **kwargs):
         Message.objects.filter(pk__in=pk_set).delete()
 
 
+@receiver(m2m_changed, sender=Conversation.messages.through)
+def refresh_conversation_summary(instance, action, reverse, **kwargs):
+    if action == "post_remove" and not reverse:
+        instance.refresh_summary()
+
+
 @receiver(pre_delete, sender=Conversation)
 def delete_orphan_messages_bulk(instance, **kwargs):
     instance.messages.remove(*instance.messages.all())
+
+
+@receiver(post_migrate, dispatch_uid="create_message_search_index")
+def create_message_search_index(sender, using, **kwargs):
+    """
+    Trigram index for inbox search (see ConversationManager.list_for_user).
+    This is not declared in Message.Meta, since other databases don't support it.
+    """
+
+    connection = connections[using]
+
+    if sender.name != "dictionary" or connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS dictionary_message_body_trgm ON %s USING gin (body gin_trgm_ops)"
+            % connection.ops.quote_name(Message._meta.db_table)
+        )
@@ -1,7 +1,17 @@
+import gzip
+import json
+
+from bisect import bisect_left
+
 from django.contrib.flatpages.sitemaps import FlatPageSitemap
 from django.contrib.sitemaps import Sitemap
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from dictionary.conf import settings
 from dictionary.models import Announcement, Author, Category, Entry, Topic
@@ -13,6 +23,23 @@ class BaseSitemap(Sitemap):
     protocol = settings.PROTOCOL
 
 
+class KeysetSitemap(BaseSitemap):
+    """
+    Sitemap for sections with lots of items. Static files of these sections
+    (see StaticSitemapWriter) cover ranges of primary keys, so that each file
+    is selected with a keyset query instead of OFFSET pagination.
+    """
+
+    fields = ()
+
+    def keyset(self):
+        return self.items().order_by("pk").only(*self.fields)
+
+    def changed(self, since):
+        """Primary keys of the items that changed after given date, None if unknown."""
+        return None
+
+
 class AnnouncementSitemap(BaseSitemap):
     changefreq = "yearly"
     priority = 0.5
@@ -24,35 +51,45 @@ class AnnouncementSitemap(BaseSitemap):
         return obj.date_edited or obj.date_created
 
 
-class AuthorSitemap(BaseSitemap):
+class AuthorSitemap(KeysetSitemap):
     changefreq = "daily"
     priority = 0.5
     limit = 10000
+    fields = ("slug",)
 
     def items(self):
         return Author.objects_accessible.order_by("-pk")
 
 
-class EntrySitemap(BaseSitemap):
+class EntrySitemap(KeysetSitemap):
     changefreq = "weekly"
     priority = 0.4
     limit = 10000
+    fields = ("date_created", "date_edited")
 
     def items(self):
         return Entry.objects.order_by("-date_created")
 
+    def changed(self, since):
+        return Entry.objects.filter(Q(date_created__gte=since) | Q(date_edited__gte=since)).values_list("pk", flat=True)
+
     def lastmod(self, obj):
         return obj.date_edited or obj.date_created
 
 
-class TopicSitemap(BaseSitemap):
+class TopicSitemap(KeysetSitemap):
     changefreq = "daily"
     priority = 1
     limit = 10000
+    fields = ("slug", "date_created")
 
     def items(self):
         return Topic.objects_published.order_by("-date_created")
 
+    def changed(self, since):
+        # Topics get published with their first entry.
+        return Entry.objects.filter(date_created__gte=since).values_list("topic_id", flat=True)
+
     def lastmod(self, obj):
         return obj.date_created
 
@@ -105,3 +142,132 @@ sitemaps = {
     "static": StaticSitemap,
     "flatpages": FlatPageSitemap,
 }
+
+# Sections that are cheap enough to be rendered on request, the others are only served as static files.
+dynamic_sitemaps = {section: sitemap for section, sitemap in sitemaps.items() if not issubclass(sitemap, KeysetSitemap)}
+
+
+class StaticSitemapWriter:
+    """
+    Write the sitemaps above to the storage as gzipped files, along with an
+    index file (sitemap.xml) so that they can be served by the web server
+    directly. A manifest records the primary key range of each file; unless
+    a full rebuild is requested, only the files that contain items changed
+    since the last run are rewritten, along with the last file of each
+    section (to which new items get appended).
+    """
+
+    directory = "sitemaps"
+
+    def __init__(self, storage=default_storage):
+        self.storage = storage
+        self.manifest = self._read(self.path("manifest.json"))
+        self.protocol = settings.PROTOCOL
+        self.domain = BaseSitemap().get_domain()
+
+    def path(self, name):
+        return f"{self.directory}/{name}"
+
+    def write(self, full=False):
+        generated_at = timezone.now()
+        previous = self.manifest["sections"] if self.manifest else {}
+        since = None if (full or not self.manifest) else parse_datetime(self.manifest["generated_at"])
+        sections = {}
+
+        for section, sitemap_class in sitemaps.items():
+            sitemap = sitemap_class()
+            old = previous.get(section, [])
+
+            if isinstance(sitemap, KeysetSitemap):
+                pages = self._write_keyset(section, sitemap, [] if since is None else old, since, generated_at)
+            else:
+                name = f"sitemap-{section}.xml.gz"
+                self._write_page(name, sitemap, sitemap.items())
+                pages = [{"name": name, "lastmod": generated_at.isoformat()}]
+
+            for name in {page["name"] for page in old} - {page["name"] for page in pages}:
+                self.storage.delete(self.path(name))
+
+            sections[section] = pages
+
+        index = [
+            {"location": f"{self.protocol}://{self.domain}/{page['name']}", "lastmod": parse_datetime(page["lastmod"])}
+            for pages in sections.values()
+            for page in pages
+        ]
+        self._save(
+            self.path("sitemap.xml"), render_to_string("dictionary/sitemap_index.xml", {"sitemaps": index}).encode()
+        )
+        self._save(
+            self.path("manifest.json"),
+            json.dumps({"generated_at": generated_at.isoformat(), "sections": sections}).encode(),
+        )
+
+    def _write_keyset(self, section, sitemap, pages, since, generated_at):
+        pages, cursor = list(pages), 0
+
+        if pages:
+            # Rewrite the files that contain changed items, except the last one which is rewritten below anyway.
+            changed = sitemap.changed(since)
+            tail = pages.pop()
+
+            if changed is not None:
+                ends = [page["end"] for page in pages]
+                dirty = {bisect_left(ends, pk) for pk in changed.iterator()}
+
+                for index in sorted(dirty - {len(pages)}):
+                    page = pages[index]
+                    items = sitemap.keyset().filter(pk__gt=page["start"], pk__lte=page["end"])
+                    self._write_page(page["name"], sitemap, items.iterator())
+                    page["lastmod"] = generated_at.isoformat()
+
+            cursor = tail["start"]
+
+        while True:
+            items = list(sitemap.keyset().filter(pk__gt=cursor)[: sitemap.limit])
+
+            if not items:
+                break
+
+            name = f"sitemap-{section}-{len(pages) + 1}.xml.gz"
+            self._write_page(name, sitemap, items)
+            pages.append({"name": name, "start": cursor, "end": items[-1].pk, "lastmod": generated_at.isoformat()})
+            cursor = items[-1].pk
+
+        return pages
+
+    def _write_page(self, name, sitemap, items):
+        protocol, domain = sitemap.get_protocol(), self.domain
+        urlset = []
+
+        for item in items:
+            priority = self._get(sitemap, "priority", item)
+            urlset.append(
+                {
+                    "location": f"{protocol}://{domain}{sitemap.location(item)}",
+                    "lastmod": self._get(sitemap, "lastmod", item),
+                    "changefreq": self._get(sitemap, "changefreq", item),
+                    "priority": str(priority if priority is not None else ""),
+                    "alternates": [],
+                }
+            )
+
+        self._save(self.path(name), gzip.compress(render_to_string("sitemap.xml", {"urlset": urlset}).encode()))
+
+    def _save(self, path, content):
+        if self.storage.exists(path):
+            self.storage.delete(path)
+
+        self.storage.save(path, ContentFile(content))
+
+    def _read(self, path):
+        if not self.storage.exists(path):
+            return None
+
+        with self.storage.open(path) as file:
+            return json.load(file)
+
+    @staticmethod
+    def _get(sitemap, name, item):
+        attr = getattr(sitemap, name, None)
+        return attr(item) if callable(attr) else attr
@@ -1,70 +1,151 @@
 from datetime import timedelta
 
 from django.contrib.auth.models import Permission
-from django.db.models import Count, Q
+from django.db import transaction
+from django.utils import timezone
 
 from djdict import celery_app
 
 from dictionary.conf import settings
-from dictionary.models import AccountTerminationQueue, Author, BackUp, GeneralReport, Image, UserVerification
+from dictionary.models import (
+    AccountTerminationQueue,
+    Author,
+    BackUp,
+    GeneralReport,
+    Image,
+    PairedSession,
+    UserVerification,
+)
+from dictionary.models.images import resolve_image
+from dictionary.sitemaps import StaticSitemapWriter
 from dictionary.utils import time_threshold
+from dictionary.utils.cache import cache
+from dictionary.utils.retention import RetentionPolicy
+from dictionary.utils.tasks import exclusive
 
 
-@celery_app.task
+@celery_app.task(acks_late=True)  # If the worker dies, the task is delivered again and the backup is resumed.
 def process_backup(backup_id):
     BackUp.objects.get(id=backup_id).process()
 
 
+@celery_app.task
+def process_image(image_id):
+    Image.objects.get(id=image_id).process()
+
+
+@celery_app.task
+def write_paired_session(session_key, session_data, expiry_age, user_id):
+    """Copy a session kept in Redis to the database (see SESSION_WRITE_THROUGH)."""
+    PairedSession.objects.update_or_create(
+        session_key=session_key,
+        defaults={
+            "session_data": session_data,
+            "expire_date": timezone.now() + timedelta(seconds=expiry_age),
+            "user_id": user_id,
+        },
+    )
+
+
 # Periodic tasks
 
 
 @celery_app.on_after_finalize.connect
 def setup_periodic_tasks(sender, **kwargs):
     """Add and set intervals of periodic tasks."""
+    sender.add_periodic_task(timedelta(minutes=30), refresh_novice_ranking)
     sender.add_periodic_task(timedelta(hours=4), commit_user_deletions)
     sender.add_periodic_task(timedelta(hours=6), purge_images)
     sender.add_periodic_task(timedelta(hours=12), purge_verifications)
     sender.add_periodic_task(timedelta(hours=14), purge_reports)
     sender.add_periodic_task(timedelta(hours=16), grant_perm_suggestion)
+    sender.add_periodic_task(timedelta(hours=1), write_sitemaps)
+    sender.add_periodic_task(timedelta(hours=24), write_sitemaps.s(full=True))
+
+
+@celery_app.task
+@exclusive(retry=True)
+def write_sitemaps(full=False):
+    """Write static sitemap files (only the changed ones, unless full is True)."""
+    StaticSitemapWriter().write(full=full)
+
+
+class ExpiredVerifications(RetentionPolicy):
+    name = "verifications"
+
+    def get_queryset(self):
+        return UserVerification.objects.filter(expiration_date__lte=time_threshold(hours=24))
+
+
+class ExpiredReports(RetentionPolicy):
+    name = "reports"
+
+    def get_queryset(self):
+        return GeneralReport.objects.filter(is_verified=False, date_created__lte=time_threshold(hours=24))
+
+
+class ExpiredImages(RetentionPolicy):
+    name = "images"
+    file_fields = ("file", *Image.VARIANTS)
+    fields = ("slug",)
+
+    def get_queryset(self):
+        return Image.objects.filter(is_deleted=True, date_created__lte=time_threshold(hours=120))
+
+    def on_delete(self, rows):
+        keys = [resolve_image.make_key(row["slug"]) for row in rows]
+        transaction.on_commit(lambda: cache.delete_many(keys))
 
 
 @celery_app.task
+@exclusive
 def purge_verifications():
     """Delete expired verifications."""
-    UserVerification.objects.filter(expiration_date__lte=time_threshold(hours=24)).delete()
+    return ExpiredVerifications().run()
 
 
 @celery_app.task
+@exclusive
 def purge_reports():
     """Delete expired reports."""
-    GeneralReport.objects.filter(is_verified=False, date_created__lte=time_threshold(hours=24)).delete()
+    return ExpiredReports().run()
 
 
 @celery_app.task
+@exclusive
 def purge_images():
-    """Delete expired images (Not bulk deleting so as to delete actual image files)."""
-    expired = Image.objects.filter(is_deleted=True, date_created__lte=time_threshold(hours=120))
-    for image in expired:
-        image.delete()
+    """Delete expired images along with their files."""
+    return ExpiredImages().run()
+
+
+@celery_app.task
+@exclusive
+def refresh_novice_ranking():
+    """Recompute queue positions of the users in novice list."""
+    Author.in_novice_list.refresh_ranking()
 
 
 @celery_app.task
+@exclusive
 def commit_user_deletions():
     """Delete (marked) users."""
     AccountTerminationQueue.objects.commit_terminations()
 
 
 @celery_app.task
+@exclusive
 def grant_perm_suggestion():
     """Gives suitable users 'dictionary.can_suggest_categories' permission."""
 
     perm = Permission.objects.get(codename="can_suggest_categories")
+    through = Author.user_permissions.through
 
-    authors = (
-        Author.objects_accessible.exclude(Q(user_permissions__in=[perm]) | Q(is_novice=True))
-        .annotate(count=Count("entry", filter=Q(entry__is_draft=False)))
-        .filter(count__gte=settings.SUGGESTIONS_ENTRY_REQUIREMENT)
-    )
+    eligible = Author.objects_accessible.filter(
+        is_novice=False, published_entry_count__gte=settings.SUGGESTIONS_ENTRY_REQUIREMENT
+    ).exclude(user_permissions=perm)
 
-    for author in authors:
-        author.user_permissions.add(perm)
+    # Conflicts are ignored in case the permission is granted in the meantime.
+    through.objects.bulk_create(
+        [through(author_id=pk, permission=perm) for pk in eligible.values_list("pk", flat=True)],
+        ignore_conflicts=True,
+    )
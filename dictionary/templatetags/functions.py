@@ -36,7 +36,7 @@ def check_follow_status(user, topic):
 
 @register.simple_tag
 def check_follow_user(user, target):
-    return user.following.filter(pk=target.pk).exists()
+    return target.pk in user.following_ids
 
 
 @register.simple_tag
@@ -0,0 +1,15 @@
+import tempfile
+
+from django.test import override_settings
+
+
+class TemporaryMediaMixin:
+    """Stores the files saved in tests in a temporary directory, which is removed afterwards."""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media = override_settings(MEDIA_ROOT=directory.name)
+        media.enable()
+        self.addCleanup(media.disable)
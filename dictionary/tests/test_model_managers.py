@@ -1,8 +1,15 @@
+from unittest.mock import patch
+
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
 from django.http import Http404
+from django.shortcuts import reverse
 from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
 
 from dictionary.conf import settings
-from dictionary.models import Author, Entry, Conversation, Message, Topic
+from dictionary.models import AccountTerminationQueue, Author, Entry, Conversation, Message, Topic, TopicFollowing
+from dictionary.utils import time_threshold
 
 
 class EntryModelManagersTests(TestCase):
@@ -115,6 +122,7 @@ class ConversationModelManagersTest(TestCase):
         self.assertEqual(2, conversation_list_4.count())
         self.assertIn(self.conversation_4_5, conversation_list_4)
         self.assertIn(self.conversation_4_6, conversation_list_4)
+        self.assertEqual([(c.match_count, c.match_preview) for c in conversation_list_4], [(1, "filiz")] * 2)
 
         # Search by author nick
         conversation_list_2 = Conversation.objects.list_for_user(self.author_2, search_term="a3")
@@ -125,6 +133,27 @@ class ConversationModelManagersTest(TestCase):
         conversation_list_3 = Conversation.objects.list_for_user(self.author_3, search_term="avakado")
         self.assertEqual(0, conversation_list_3.count())
 
+    def test_compose_many(self):
+        author_5, author_6 = Author.objects.filter(username__in=("a5", "a6")).order_by("username")
+        author_6.blocked.add(self.author_4)
+        frozen = Author.objects.create(username="frozen", email="9", is_active=True, is_frozen=True)
+        sender = Author.objects.get(pk=self.author_4.pk)
+        recipients = [self.author_1, author_5, author_6, frozen, sender]
+
+        with self.assertNumQueries(14):  # Independent of the number of recipients (3 of them are for relations).
+            messages = Message.objects.compose_many(sender, recipients, "Duyuru")
+
+        # Blocked, frozen and self are excluded.
+        self.assertEqual([message.recipient for message in messages], [self.author_1, author_5])
+        self.assertEqual(messages[0].body, "duyuru")
+
+        conversation = Conversation.objects.get(holder=self.author_1, target=self.author_4)
+        self.assertEqual(list(conversation.messages.all()), [messages[0]])
+        self.assertEqual((conversation.last_message, conversation.unread_count), (messages[0], 1))
+        self.assertEqual(Conversation.objects.get(pk=self.conversation_4_5.pk).last_message, messages[1])
+        self.assertEqual(Conversation.objects.get(pk=self.conversation_5_4.pk).unread_count, 2)
+        self.assertEqual(Author.objects.get(pk=author_5.pk).unread_message_count, 2)
+
     def test_with_user(self):
         # Self-conversation is not allowed
         self_convo = Conversation.objects.with_user(self.author_1, self.author_1)
@@ -211,3 +240,150 @@ class TopicModelManagersTest(TransactionTestCase):
         topics = Topic.objects_published.all()
         self.assertEqual(1, topics.count())
         self.assertIn(self.topic_2, topics)
+
+
+class TopicFollowingManagerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.topic = Topic.objects.create_topic("takip")
+        cls.follower = Author.objects.create(username="follower", email="0", is_novice=False)
+        cls.author = Author.objects.create(username="author", email="1", is_novice=False)
+        cls.blocked = Author.objects.create(username="blocked", email="2", is_novice=False)
+        cls.novice = Author.objects.create(username="novice", email="3")
+
+        cls.follower.blocked.add(cls.blocked)
+        cls.follower.following_topics.add(cls.topic)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_unread_topic_count(self):
+        self.follower.invalidate_unread_topic_count()
+        return self.follower.unread_topic_count["topics"]
+
+    def test_notify_followers(self):
+        following = TopicFollowing.objects.get(author=self.follower, topic=self.topic)
+
+        entry = Entry.objects.create(topic=self.topic, author=self.author)
+        Entry.objects.create(topic=self.topic, author=self.blocked)
+        Entry.objects.create(topic=self.topic, author=self.novice)
+        Entry.objects.create(topic=self.topic, author=self.follower)
+        Entry.objects.create(topic=self.topic, author=self.author, is_draft=True)
+
+        following.refresh_from_db()
+        self.assertEqual(1, following.unread_count)
+        self.assertEqual(1, self.get_unread_topic_count())
+
+        entry.delete()
+        following.refresh_from_db()
+        self.assertEqual(0, following.unread_count)
+
+        Entry.objects.create(topic=self.topic, author=self.author)
+        TopicFollowing.objects.mark_read(self.follower, topic=self.topic)
+        self.assertEqual(0, self.get_unread_topic_count())
+
+    def test_notify_followers_pull_fallback(self):
+        with patch.object(settings, "TOPIC_FOLLOWING_FANOUT_LIMIT", 0):
+            Entry.objects.create(topic=self.topic, author=self.author)
+            Entry.objects.create(topic=self.topic, author=self.author)
+
+        following = TopicFollowing.objects.get(author=self.follower, topic=self.topic)
+        self.assertIsNone(following.unread_count)
+        self.assertEqual(2, self.get_unread_topic_count())
+
+        # Crowded topics stay NULL after reading, publishing doesn't rewrite the rows.
+        TopicFollowing.objects.mark_read(self.follower, topic=self.topic)
+        self.assertEqual(0, self.get_unread_topic_count())
+
+        with patch.object(settings, "TOPIC_FOLLOWING_FANOUT_LIMIT", 0), self.assertNumQueries(1):
+            TopicFollowing.objects.notify_followers(Entry(topic=self.topic, author=self.author))
+
+        following.refresh_from_db()
+        self.assertIsNone(following.unread_count)
+
+
+class InNoviceListManagerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now, yesterday = timezone.now(), time_threshold(hours=25)
+        novice = {"is_novice": True, "is_active": True, "application_status": Author.Status.PENDING}
+
+        self.idle = Author.objects.create(
+            username="idle", email="0", last_activity=yesterday, application_date=now, **novice
+        )
+        self.late = Author.objects.create(
+            username="late", email="1", last_activity=now, application_date=now, **novice
+        )
+        self.early = Author.objects.create(
+            username="early", email="2", last_activity=now, application_date=yesterday, **novice
+        )
+        self.priority = Author.objects.create(
+            username="priority", email="3", last_activity=yesterday, application_date=now, queue_priority=1, **novice
+        )
+
+    def test_get_ranking(self):
+        ranking = Author.in_novice_list.get_ranking()
+        self.assertEqual([self.priority.pk, self.early.pk, self.late.pk, self.idle.pk], list(ranking))
+        self.assertEqual(3, Author.in_novice_list.get_position(self.late))
+
+        with self.assertNumQueries(0):
+            Author.in_novice_list.get_position(self.early)
+
+        self.late.application_status = Author.Status.ON_HOLD
+        self.late.save()
+        self.assertIsNone(Author.in_novice_list.get_position(self.late))
+        self.assertEqual(3, Author.in_novice_list.get_position(self.idle))
+
+
+class AccountTerminationQueueManagerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.private = Author.objects.create(username=settings.GENERIC_PRIVATEUSER_USERNAME, email="0", is_private=True)
+        cls.holder = Author.objects.create(username="holder", email="1", is_active=True, is_novice=False)
+        cls.user = Author.objects.create(username="user", email="2", is_active=True, is_novice=False)
+        topic = Topic.objects.create_topic("topic")
+
+        cls.entries = [Entry.objects.create(topic=topic, author=cls.user, content=str(i)) for i in range(3)]
+        Message.objects.compose(cls.holder, cls.user, "hello")
+
+        termination = AccountTerminationQueue.objects.create(author=cls.user, state="LE")
+        AccountTerminationQueue.objects.filter(pk=termination.pk).update(termination_date=time_threshold(hours=1))
+
+    @patch.object(settings, "TERMINATION_CHUNK_SIZE", 2)
+    def test_commit_terminations(self):
+        original_checkpoint = AccountTerminationQueue._checkpoint
+
+        def interrupt(termination, **progress):
+            if progress.get("entry") == self.entries[1].pk:
+                raise OSError
+            return original_checkpoint(termination, **progress)
+
+        with patch.object(AccountTerminationQueue, "_checkpoint", interrupt), self.assertRaises(OSError):
+            AccountTerminationQueue.objects.commit_terminations()
+
+        # Leased to the interrupted run, skipped until the lease expires.
+        AccountTerminationQueue.objects.commit_terminations()
+        self.assertTrue(Author.objects.filter(pk=self.user.pk).exists())
+
+        AccountTerminationQueue.objects.update(locked_until=time_threshold(hours=1))
+        AccountTerminationQueue.objects.commit_terminations()
+
+        self.assertFalse(Author.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(Entry.objects_all.filter(author=self.private).count(), 3)
+        self.assertEqual(self.holder.conversationarchive_set.get().message_count, 1)
+
+    def test_login(self):
+        self.user.set_password("password")
+        self.user.save()
+        credentials = {"username": self.user.email, "password": "password"}
+
+        # Leased terminations can't be cancelled, the login is refused.
+        AccountTerminationQueue.objects.update(locked_until=time_threshold(hours=1))
+        response = self.client.post(reverse("login"), credentials)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(SESSION_KEY, self.client.session)
+
+        AccountTerminationQueue.objects.update(locked_until=None)
+        self.assertEqual(self.client.post(reverse("login"), credentials).status_code, 302)
+        self.assertFalse(AccountTerminationQueue.objects.exists())
+        self.assertFalse(Author.objects.get(pk=self.user.pk).is_frozen)
@@ -1,28 +1,48 @@
 import datetime
+import gzip
+import json
 import time
 
 from decimal import Decimal
+from io import BytesIO, StringIO
 from unittest import mock
 
+from django.contrib import admin
+from django.contrib.auth import SESSION_KEY
 from django.core.cache import cache
-from django.db import IntegrityError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import IntegrityError, connection
 from django.shortcuts import reverse
 from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
+from PIL import Image as PIL_Image
+
+from dictionary.admin.images import ImageAdmin
+from dictionary.admin.topic import TopicAdmin
 from dictionary.conf import settings
 from dictionary.models import (
     Author,
+    BackUp,
     Category,
     Conversation,
+    ConversationArchive,
     Entry,
     GeneralReport,
+    Image,
     Memento,
     Message,
+    PairedSession,
     Topic,
     TopicFollowing,
     UserVerification,
 )
+from dictionary.models.images import resolve_image
+from dictionary.tasks import grant_perm_suggestion, purge_images
+from dictionary.tests.mixins import TemporaryMediaMixin
 
 
 class AuthorModelTests(TestCase):
@@ -35,6 +55,39 @@ class AuthorModelTests(TestCase):
         cls.topic = Topic.objects.create_topic("test_topic")
         cls.entry_base = {"topic": cls.topic, "author": cls.author}
 
+    def setUp(self):
+        # Entry statistics are cached per author, don't let them leak between tests.
+        cache.clear()
+
+    def test_grant_perm_suggestion(self):
+        entries = [Entry.objects.create(**self.entry_base) for _ in range(2)]
+        Entry.objects.create(**self.entry_base, is_draft=True)
+        novice = Author.objects.create(username="novice", email="1", is_active=True)
+        Entry.objects.create(topic=self.topic, author=novice)
+        Entry.objects.create(topic=self.topic, author=novice)
+
+        entries[0].delete()
+        self.assertEqual(Author.objects.get(pk=self.author.pk).published_entry_count, 1)
+
+        with mock.patch.object(settings, "SUGGESTIONS_ENTRY_REQUIREMENT", 1), self.assertNumQueries(3):
+            grant_perm_suggestion()
+
+        self.assertTrue(Author.objects.get(pk=self.author.pk).has_perm("dictionary.can_suggest_categories"))
+        self.assertFalse(Author.objects.get(pk=novice.pk).has_perm("dictionary.can_suggest_categories"))
+
+    def test_published_entry_count_recount(self):
+        other_topic = Topic.objects.create_topic("other_topic")
+        Entry.objects.create(**self.entry_base)
+        Entry.objects.create(topic=other_topic, author=self.author)
+
+        # Cascade of the topic deletion skips Entry.delete.
+        TopicAdmin(Topic, admin.site).delete_queryset(None, Topic.objects.filter(pk=self.topic.pk))
+        self.assertEqual(Author.objects.get(pk=self.author.pk).published_entry_count, 1)
+
+        Author.objects.filter(pk=self.author.pk).update(published_entry_count=0)
+        call_command("refresh_counters", "published_entries", stdout=StringIO())
+        self.assertEqual(Author.objects.get(pk=self.author.pk).published_entry_count, 1)
+
     def test_profile_entry_counts(self):
         Entry.objects.create(**self.entry_base)  # created now (today)
         # dates to be mocked for auto now add field 'date_created'
@@ -67,6 +120,35 @@ class AuthorModelTests(TestCase):
         entry = Entry.objects.create(**self.entry_base)
         self.assertEqual(self.author.last_entry_date, entry.date_created)
 
+    def test_entry_stats_incremental(self):
+        self.assertEqual(self.author.entry_count, 0)
+
+        # Publishing updates the cached record, without any aggregation.
+        entry = Entry.objects.create(**self.entry_base)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.author.entry_count, 1)
+            self.assertEqual(self.author.entry_count_day, 1)
+            self.assertEqual(self.author.last_entry_date, entry.date_created)
+
+        draft = Entry.objects.create(**self.entry_base, is_draft=True)
+        self.assertEqual(self.author.entry_count, 1)
+
+        # Publishing a draft counts as well.
+        draft = Entry.objects_all.get(pk=draft.pk)
+        draft.is_draft = False
+        draft.save()
+        author = Author.objects.get(pk=self.author.pk)
+        self.assertEqual(author.entry_count, 2)
+        self.assertEqual(author.entry_count_week, 2)
+
+        draft.save()  # Saving a published entry again shouldn't change anything.
+        del author.entry_count
+        self.assertEqual(author.entry_count, 2)
+
+        entry.delete()
+        self.assertEqual(self.author.entry_count, 1)
+        self.assertEqual(self.author.last_entry_date, draft.date_created)
+
     def test_followers(self):
         self.assertEqual(self.author.followers.count(), 0)  # no follower supplied yet
         follower = Author.objects.create(username="1", email="1")
@@ -76,6 +158,30 @@ class AuthorModelTests(TestCase):
         self.assertIn(follower, self.author.followers)
         self.assertEqual(self.author.followers.count(), 2)
 
+    def test_relations(self):
+        some_author = Author.objects.create(username="1", email="1")
+        self.assertEqual(self.author.following_ids, frozenset())
+
+        self.author.following.add(some_author)
+        self.author.blocked.add(some_author)
+        self.assertEqual(self.author.following_ids, {some_author.pk})
+        self.assertEqual(self.author.blocked_ids, {some_author.pk})
+        self.assertEqual(some_author.blocked_by_ids, {self.author.pk})
+
+        # Served from cache, until the relationships change.
+        author = Author.objects.get(pk=self.author.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(author.blocked_ids, {some_author.pk})
+
+        self.author.blocked.remove(some_author)
+        self.assertEqual(Author.objects.get(pk=some_author.pk).blocked_by_ids, frozenset())
+
+        # Clearing invalidates the counterparts too.
+        self.author.blocked.add(some_author)
+        self.assertEqual(Author.objects.get(pk=some_author.pk).blocked_by_ids, {self.author.pk})
+        self.author.blocked.clear()
+        self.assertEqual(Author.objects.get(pk=some_author.pk).blocked_by_ids, frozenset())
+
     def test_novice_list_join_retreat(self):
         """
         10 published entries needed in order an user to be in the novice list,
@@ -350,6 +456,23 @@ class UserVerificationModelTests(TestCase):
         self.assertEqual(self.author.email_confirmed, True)
 
 
+class PairedSessionModelTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(username="user", email="0")
+
+    def test_user_paired_without_lookup(self):
+        store = PairedSession.get_session_store_class()()
+
+        with CaptureQueriesContext(connection) as context:
+            session = store.create_model_instance({SESSION_KEY: str(self.author.pk)})
+            guest_session = store.create_model_instance({})
+
+        self.assertFalse(any(Author._meta.db_table in query["sql"] for query in context.captured_queries))
+        self.assertEqual(session.user_id, self.author.pk)
+        self.assertIsNone(guest_session.user_id)
+
+
 class MessageModelTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -420,8 +543,88 @@ class ConversationModelTests(TestCase):
 
         time.sleep(0.01)  # apparently auto_now_add fields will be exactly the same in the same block.
         some_other_msg = Message.objects.compose(self.author_1, self.author_2, "ya bi sktr git allah allah")
+        current_conversation_1_2.refresh_from_db()
+        current_conversation_2_1.refresh_from_db()
         self.assertEqual(some_other_msg, current_conversation_1_2.last_message)
         self.assertEqual(some_other_msg, current_conversation_2_1.last_message)
+        self.assertEqual(some_other_msg.sent_at, current_conversation_1_2.last_message_at)
+
+        # Removing the last message falls back to the previous one.
+        current_conversation_1_2.messages.remove(some_other_msg)
+        current_conversation_1_2.refresh_from_db()
+        self.assertEqual(some_msg, current_conversation_1_2.last_message)
+
+    def test_unread_count(self):
+        Message.objects.compose(self.author_1, self.author_2, "naber")
+        Message.objects.compose(self.author_1, self.author_2, "naber?")
+        Message.objects.compose(self.author_2, self.author_1, "iyi")
+
+        conversation_2_1 = Conversation.objects.get(holder=self.author_2, target=self.author_1)
+        self.assertEqual(conversation_2_1.unread_count, 2)
+        self.assertEqual(Conversation.objects.get(holder=self.author_1, target=self.author_2).unread_count, 1)
+        self.assertEqual(Author.objects.get(pk=self.author_2.pk).unread_message_count, 2)
+
+        # Stale instances don't overwrite the count.
+        self.author_2.save()
+        self.assertEqual(Author.objects.get(pk=self.author_2.pk).unread_message_count, 2)
+
+        # Deferred fields are not loaded to be saved.
+        deferred = Author.objects.only("username", "is_novice").get(pk=self.author_2.pk)
+
+        with self.assertNumQueries(1):
+            deferred.save()
+
+        # Counters can be recalculated, e.g. for the rows that existed before they were added.
+        Conversation.objects.update(last_message=None, unread_count=0)
+        Author.objects.update(unread_message_count=0)
+        call_command("refresh_counters", "conversations", "unread_messages", batch_size=1, stdout=StringIO())
+        self.assertEqual(Author.objects.get(pk=self.author_2.pk).unread_message_count, 2)
+        self.assertEqual(Conversation.objects.get(pk=conversation_2_1.pk).last_message.body, "iyi")
+
+        conversation_2_1.mark_read()
+        self.assertEqual(Conversation.objects.get(pk=conversation_2_1.pk).unread_count, 0)
+        self.assertEqual(Author.objects.get(pk=self.author_2.pk).unread_message_count, 0)
+
+        # Deleting a conversation with unread messages.
+        Message.objects.compose(self.author_2, self.author_1, "?")
+        Conversation.objects.filter(holder=self.author_1).delete()
+        self.assertEqual(Author.objects.get(pk=self.author_1.pk).unread_message_count, 0)
+
+    def test_archive(self):
+        for body in ("bir", "iki", "üç"):
+            Message.objects.compose(self.author_1, self.author_2, body)
+
+        with mock.patch("dictionary.models.messaging.ARCHIVE_CHUNK_SIZE", 2):
+            Conversation.objects.get(holder=self.author_1, target=self.author_2).archive()
+            Message.objects.compose(self.author_1, self.author_2, "dört")
+            Conversation.objects.get(holder=self.author_1, target=self.author_2).archive()
+
+        archive = ConversationArchive.objects.get(holder=self.author_1, target="user2")
+        self.assertEqual((archive.message_count, archive.chunks.count()), (4, 3))
+        self.assertEqual(archive.preview["body"], "dört")
+
+        # Only the chunks containing the sliced messages are read.
+        with self.assertNumQueries(1):
+            self.assertEqual([message["body"] for message in archive.archived_messages[1:3]], ["iki", "üç"])
+
+        self.assertEqual([message["body"] for message in archive.archived_messages], ["bir", "iki", "üç", "dört"])
+
+    def test_archive_legacy(self):
+        legacy = [{"body": "eski", "sender__username": "user1"}]
+        archive = ConversationArchive.objects.create(holder=self.author_1, target="user2", messages=json.dumps(legacy))
+        self.assertEqual(archive.preview["body"], "eski")
+
+        # Legacy messages come before the appended ones.
+        Message.objects.compose(self.author_1, self.author_2, "yeni")
+        Conversation.objects.get(holder=self.author_1, target=self.author_2).archive()
+        archive = ConversationArchive.objects.get(pk=archive.pk)
+        self.assertEqual([message["body"] for message in archive.archived_messages], ["eski", "yeni"])
+        self.assertEqual((archive.messages, archive.preview["body"]), ("", "yeni"))
+
+        other = ConversationArchive.objects.create(holder=self.author_2, target="user1", messages=json.dumps(legacy))
+        call_command("convert_archives", stdout=StringIO())
+        other.refresh_from_db()
+        self.assertEqual((other.message_count, other.messages, other.preview), (1, "", legacy[0]))
 
     def test_str(self):
         Message.objects.compose(self.author_1, self.author_2, "baapoçun çen?!!")
@@ -429,6 +632,148 @@ class ConversationModelTests(TestCase):
         self.assertEqual(str(current_conversation), "<Conversation> holder-> user1, target-> user2")
 
 
+class BackUpModelTests(TemporaryMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Author.objects.create(username=settings.GENERIC_SUPERUSER_USERNAME, email="gsu", is_active=True)
+        cls.author = Author.objects.create(username="user", email="0", is_active=True)
+        other = Author.objects.create(username="other", email="1", is_active=True)
+        topic = Topic.objects.create_topic("topic")
+
+        for i in range(5):
+            Entry.objects.create(topic=topic, author=cls.author, content=f"entry {i}")
+            Message.objects.compose(cls.author, other, f"message {i}")
+
+        Conversation.objects.get(holder=cls.author, target=other).archive()
+
+    def test_process_resumable(self):
+        backup = BackUp.objects.create(author=self.author)
+        original_write = BackUp._write
+
+        def interrupt(instance, stream, text, **progress):
+            if progress.get("entries") == 4:
+                raise OSError
+            original_write(instance, stream, text, **progress)
+
+        with mock.patch.object(settings, "BACKUP_COMPRESS", True), mock.patch(
+            "dictionary.models.author.BACKUP_CHUNK_SIZE", 2
+        ), mock.patch.object(BackUp, "_write", interrupt):
+            with self.assertRaises(OSError):
+                backup.process()
+
+        backup = BackUp.objects.get(pk=backup.pk)
+        self.assertFalse(backup.is_ready)
+
+        with mock.patch("dictionary.models.author.BACKUP_CHUNK_SIZE", 2):
+            backup.process()
+
+        self.assertTrue(backup.file.name.endswith(".json.gz"))
+
+        with backup.file.open("rb") as file:
+            content = json.loads(gzip.decompress(file.read()))
+
+        self.assertEqual([entry["content"] for entry in content["entries"]], [f"entry {i}" for i in range(5)])
+        self.assertEqual(content["conversations"][0]["target"], "other")
+        self.assertEqual(len(content["conversations"][0]["messages"]), 5)
+
+
+class ImageModelTests(TemporaryMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(username="user", email="0", is_active=True)
+
+    def create_image(self, **kwargs):
+        buffer = BytesIO()
+        PIL_Image.new("RGB", (800, 400)).save(buffer, "JPEG")
+        return Image.objects.create(author=self.author, file=ContentFile(buffer.getvalue(), name="a.jpg"), **kwargs)
+
+    def test_process(self):
+        image = self.create_image()
+
+        with mock.patch.object(settings, "COMPRESS_IMAGES", True), mock.patch.object(
+            settings, "IMAGE_DISPLAY_SIZE", 500
+        ):
+            image.process()
+
+        image = Image.objects.get(pk=image.pk)
+        self.assertEqual((image.width, image.height, image.format), (800, 400, "JPEG"))
+        self.assertEqual(PIL_Image.open(image.thumbnail).size, (320, 160))
+        self.assertEqual(PIL_Image.open(image.display).size, (500, 250))
+        self.assertEqual(image.get_variant(), image.display)
+        self.assertEqual(image.get_variant(variant="thumbnail"), image.thumbnail)
+        self.assertEqual(Image.get_content_type(image.display), "image/jpeg")
+
+    def test_process_command(self):
+        processed, pending = self.create_image(), self.create_image()
+        processed.process()
+
+        with mock.patch("dictionary.tasks.process_image.delay") as delay, self.captureOnCommitCallbacks(execute=True):
+            call_command("process_images", stdout=StringIO())
+
+        delay.assert_called_once_with(pending.pk)
+
+        call_command("process_images", "--sync", stdout=StringIO())
+        self.assertTrue(Image.objects.get(pk=pending.pk).thumbnail)
+
+    def test_slug_collision(self):
+        taken = self.create_image()
+
+        with mock.patch("dictionary.models.images.image_slug", side_effect=["retried"]):
+            image = self.create_image(slug=taken.slug)
+
+        self.assertEqual(image.slug, "retried")
+
+    def test_conditional_get(self):
+        image = self.create_image()
+        url = image.get_absolute_url()
+
+        response = self.client.get(url)
+        self.assertEqual(response[settings.XSENDFILE_HEADER_NAME], image.file.url)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertNotIn("immutable", response["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(not_modified.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.process()
+
+        self.assertIn("immutable", self.client.get(url)["Cache-Control"])
+
+        # Invalidated once the change is committed, so that the old row can't be cached again.
+        with self.captureOnCommitCallbacks(execute=True):
+            image.is_deleted = True
+            image.save(update_fields=["is_deleted"])
+            self.assertIsNotNone(cache.get(resolve_image.make_key(image.slug)))
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        # Bulk deletion in admin invalidates the cached details, unknown slugs are not cached.
+        other = self.create_image()
+        self.assertEqual(self.client.get(other.get_absolute_url()).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ImageAdmin(Image, admin.site).delete_queryset(None, Image.objects.filter(pk=other.pk))
+
+        self.assertEqual(self.client.get(other.get_absolute_url()).status_code, 404)
+        self.assertIsNone(cache.get(resolve_image.make_key(other.slug)))
+
+    def test_purge(self):
+        expired, recent = self.create_image(is_deleted=True), self.create_image(is_deleted=True)
+        expired.process()
+        Image.objects.filter(pk=expired.pk).update(date_created=timezone.now() - datetime.timedelta(days=6))
+        files = [expired.file.name, expired.thumbnail.name]
+
+        with mock.patch.object(settings, "RETENTION_BATCH_SIZE", 1):
+            summary = purge_images()
+
+        self.assertEqual((summary["deleted"], summary["files"], summary["batches"]), (1, 2, 1))
+        self.assertFalse(any(default_storage.exists(name) for name in files))
+        self.assertQuerysetEqual(Image.objects.all(), [recent], transform=lambda image: image)
+
+
 class GeneralReportModelTest(TestCase):
     def test_str(self):
         report = GeneralReport.objects.create(subject="subject")
@@ -484,3 +829,22 @@ class TopicModelTest(TransactionTestCase):
 
     def test_str(self):
         self.assertEqual(str(self.some_topic), "zeki müren")
+
+    def test_mirrors(self):
+        first, second, third, fourth = (Topic.objects.create_topic(title) for title in ("a", "b", "c", "d"))
+        self.some_topic.mirrors.add(first)
+        second.mirrors.add(third)
+
+        # Groups get merged, each topic becomes a mirror of all others.
+        with self.assertNumQueries(10):
+            self.some_topic.mirrors.add(second, fourth)
+
+        group = {self.some_topic, first, second, third, fourth}
+
+        for topic in group:
+            self.assertEqual(set(topic.mirrors.all()), group - {topic})
+
+        # Removing a mirror dissolves the group.
+        first.mirrors.remove(third)
+        self.assertFalse(Topic.mirrors.through.objects.exists())
+
@@ -0,0 +1,100 @@
+from unittest import mock
+
+from django.conf import settings as django_settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from dictionary.backends.sessions import redis
+from dictionary.backends.sessions.utils import flush_all_sessions
+from dictionary.conf import settings
+from dictionary.models import Author, PairedSession
+from dictionary.tasks import write_paired_session
+
+
+class FakeRedis:
+    """Implements the set commands used by the session engine, in memory."""
+
+    def __init__(self):
+        self.sets, self.expiries = {}, {}
+
+    def __call__(self):
+        return self  # Replaces get_redis_connection
+
+    def pipeline(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self):
+        pass
+
+    def sadd(self, key, value):
+        self.sets.setdefault(key, set()).add(value)
+
+    def smembers(self, key):
+        return {value.encode() for value in self.sets.get(key, ())}
+
+    def expire(self, key, seconds):
+        self.expiries[key] = seconds
+
+    def delete(self, key):
+        self.sets.pop(key, None)
+
+
+@override_settings(SESSION_ENGINE="dictionary.backends.sessions.redis")
+class RedisSessionStoreTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(username="user", email="0")
+
+    def setUp(self):
+        cache.clear()
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(redis, "get_redis_connection", self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_session(self, **data):
+        session = redis.SessionStore()
+        session.update(data)
+        session.save()
+        return session
+
+    def test_index(self):
+        first = self.create_session(**{SESSION_KEY: str(self.author.pk)})
+        second = self.create_session(**{SESSION_KEY: str(self.author.pk)})
+        guest = self.create_session(votes=[1])
+
+        index_key = redis.get_index_key(self.author.pk)
+        self.assertEqual(set(redis.get_indexed_sessions(self.author.pk)), {first.session_key, second.session_key})
+        self.assertEqual(self.redis.expiries, {index_key: django_settings.SESSION_COOKIE_AGE})
+        self.assertEqual(redis.SessionStore(first.session_key)[SESSION_KEY], str(self.author.pk))
+
+        flush_all_sessions(self.author)
+        self.assertFalse(redis.SessionStore().exists(first.session_key))
+        self.assertFalse(redis.SessionStore().exists(second.session_key))
+        self.assertTrue(redis.SessionStore().exists(guest.session_key))
+        self.assertNotIn(index_key, self.redis.sets)
+
+    def test_write_through(self):
+        with mock.patch.object(write_paired_session, "delay") as delay:
+            self.create_session(**{SESSION_KEY: str(self.author.pk)})
+            delay.assert_not_called()
+
+            with mock.patch.object(settings, "SESSION_WRITE_THROUGH", True):
+                session = self.create_session(**{SESSION_KEY: str(self.author.pk)})
+                self.create_session(votes=[1])  # Guest sessions are not copied.
+
+        delay.assert_called_once()
+        self.assertEqual(delay.call_args.args[0], session.session_key)
+        self.assertEqual(delay.call_args.args[2:], (django_settings.SESSION_COOKIE_AGE, self.author.pk))
+
+        write_paired_session(*delay.call_args.args)
+        paired = PairedSession.objects.get(session_key=session.session_key)
+        self.assertEqual(paired.user_id, self.author.pk)
+        self.assertEqual(paired.get_decoded()[SESSION_KEY], str(self.author.pk))
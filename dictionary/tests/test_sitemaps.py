@@ -0,0 +1,60 @@
+import gzip
+
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.test import TestCase
+from django.utils import timezone
+
+from dictionary.models import Author, Entry, Topic
+from dictionary.sitemaps import EntrySitemap, StaticSitemapWriter
+from dictionary.tests.mixins import TemporaryMediaMixin
+
+
+class StaticSitemapWriterTests(TemporaryMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(username="user", email="0", is_active=True, is_novice=False)
+        cls.topic = Topic.objects.create_topic("topic")
+        cls.entries = [Entry.objects.create(topic=cls.topic, author=cls.author, content=str(i)) for i in range(5)]
+
+    def read(self, name):
+        with default_storage.open(f"sitemaps/{name}") as file:
+            return gzip.decompress(file.read()).decode()
+
+    def test_write(self):
+        with mock.patch.object(EntrySitemap, "limit", 2):
+            StaticSitemapWriter().write()
+
+            index = default_storage.open("sitemaps/sitemap.xml").read().decode()
+            self.assertIn("/sitemap-entry-3.xml.gz", index)
+            self.assertNotIn("/sitemap-entry-4.xml.gz", index)
+            self.assertIn(self.entries[2].get_absolute_url(), self.read("sitemap-entry-2.xml.gz"))
+            self.assertIn(self.topic.get_absolute_url(), self.read("sitemap-topic-1.xml.gz"))
+
+            # Only the file with the edited entry and the last file get rewritten, new entries get appended.
+            manifest = StaticSitemapWriter().manifest
+            Entry.objects.filter(pk=self.entries[3].pk).update(date_edited=timezone.now())
+            new = [Entry.objects.create(topic=self.topic, author=self.author, content=f"new {i}") for i in range(2)]
+
+            with mock.patch.object(StaticSitemapWriter, "_write_page", autospec=True) as write_page:
+                StaticSitemapWriter().write()
+
+            written = [call.args[1] for call in write_page.call_args_list if call.args[1].startswith("sitemap-entry")]
+            self.assertEqual(written, ["sitemap-entry-2.xml.gz", "sitemap-entry-3.xml.gz", "sitemap-entry-4.xml.gz"])
+
+            pages = StaticSitemapWriter().manifest["sections"]["entry"]
+            self.assertEqual(pages[0], manifest["sections"]["entry"][0])
+            self.assertEqual(pages[-1]["end"], new[-1].pk)
+
+    def test_views(self):
+        # Only the sections that are cheap to render are served on request, until the files are written.
+        self.assertNotIn(b"sitemap-entry", self.client.get("/sitemap.xml").content)
+        self.assertEqual(self.client.get("/sitemap-category.xml").status_code, 200)
+        self.assertEqual(self.client.get("/sitemap-entry.xml", {"p": 2}).status_code, 404)
+        self.assertEqual(self.client.get("/sitemap-entry-1.xml.gz").status_code, 404)
+
+        StaticSitemapWriter().write()
+        self.assertIn(b"/sitemap-entry-1.xml.gz", b"".join(self.client.get("/sitemap.xml").streaming_content))
+        content = gzip.decompress(b"".join(self.client.get("/sitemap-entry-1.xml.gz").streaming_content))
+        self.assertIn(self.entries[0].get_absolute_url().encode(), content)
@@ -0,0 +1,31 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from dictionary.tasks import purge_verifications
+from dictionary.utils.tasks import get_lock, get_task_stats
+
+
+class ExclusiveTaskTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_exclusive(self):
+        name = "dictionary.tasks.purge_verifications"
+        lock = get_lock(f"task_lock:{name}", 60)
+        self.assertTrue(lock.acquire(blocking=False))
+
+        self.assertIsNone(purge_verifications())  # Skipped, the lock is held by another run.
+        lock.release()
+        self.assertEqual(purge_verifications()["name"], "verifications")
+
+        stats = next(row for row in get_task_stats() if row["name"] == name)
+        self.assertEqual((stats["runs"], stats["skipped"], stats["last_status"]), (1, 1, "succeeded"))
+        self.assertEqual(stats["p95"], 1)
+
+        output = StringIO()
+        call_command("task_stats", stdout=output)
+        row = next(line for line in output.getvalue().splitlines() if line.startswith("purge_verifications"))
+        self.assertEqual(row.split()[1:4], ["1", "0", "1"])
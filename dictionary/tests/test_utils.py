@@ -0,0 +1,182 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache as backend
+from django.test import RequestFactory, SimpleTestCase
+from django.utils import translation
+
+from dictionary.middleware.cache import RequestCacheMiddleware
+from dictionary.models import Author
+from dictionary.utils.cache import RequestCache, cache
+from dictionary.utils.context_processors import LeftFrameProcessor
+from dictionary.utils.decorators import LocalCache, memoize, memoize_stats
+
+
+class RequestCacheTests(SimpleTestCase):
+    def setUp(self):
+        backend.clear()
+        self.cache = RequestCache(backend)
+
+    def test_memoization(self):
+        backend.set("key", "value")
+
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.get_many(["key", "missing", "other"]), {"key": "value"})
+        self.assertEqual(self.cache.round_trips, 3)
+
+        # Served from the memo, misses too.
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertEqual(self.cache.get("missing", "default"), "default")
+        self.assertEqual(self.cache.round_trips, 3)
+
+    def test_deferred_writes(self):
+        backend.set_many({"deleted": 1, "replaced": 1})
+
+        self.cache.set("new", 2)
+        self.cache.delete("deleted")
+        self.cache.delete("replaced")
+        self.cache.set("replaced", 2)
+
+        # Reads see the writes, the backend doesn't until the flush.
+        self.assertEqual((self.cache.get("new"), self.cache.get("deleted"), self.cache.get("replaced")), (2, None, 2))
+        self.assertEqual(backend.get_many(["new", "deleted", "replaced"]), {"deleted": 1, "replaced": 1})
+        self.assertEqual(self.cache.round_trips, 0)
+
+        self.cache.flush()
+        self.assertEqual(backend.get_many(["new", "deleted", "replaced"]), {"new": 2, "replaced": 2})
+        self.assertEqual(self.cache.round_trips, 2)  # delete_many, set_many
+
+    def test_atomic_methods(self):
+        self.cache.set("counter", 1)
+        self.assertEqual(self.cache.incr("counter"), 2)
+
+        # Pending write of the key is sent first.
+        self.cache.set("lock", "owner")
+        self.assertFalse(self.cache.add("lock", "other"))
+        self.assertEqual(self.cache.get("lock"), "owner")
+
+        # Other methods of the backend see all pending writes.
+        self.cache.set("other", 1)
+
+        with mock.patch.object(backend, "lock", create=True) as lock:
+            lock.side_effect = backend.get
+            self.assertEqual(self.cache.lock("other"), 1)
+
+    def test_middleware(self):
+        request = RequestFactory().get("/")
+
+        def view(_request):
+            cache.set("key", "value")
+            self.assertIsNone(backend.get("key"))
+            raise ValueError
+
+        middleware = RequestCacheMiddleware(view)
+
+        # The flush error is logged, the error of the view is raised.
+        with mock.patch.object(RequestCache, "flush", side_effect=ConnectionError), self.assertRaises(ValueError):
+            with self.assertLogs("dictionary.middleware.cache", "ERROR"):
+                middleware(request)
+
+        with self.assertRaises(ValueError):
+            middleware(request)
+
+        self.assertEqual(backend.get("key"), "value")
+
+
+class MemoizeTests(SimpleTestCase):
+    def setUp(self):
+        backend.clear()
+        self.calls = []
+
+        @memoize(timeout=60, ignore=("verbose",), name="test_memoize")
+        def function(author, items=(), verbose=False):
+            self.calls.append((author, items, verbose))
+            return None if items is None else len(items)
+
+        self.function = function
+
+    def test_make_key(self):
+        make_key = self.function.make_key
+
+        # Model instances are represented by their primary keys, ignored arguments don't vary the key.
+        self.assertEqual(make_key(Author(pk=1)), make_key(author=Author(pk=1), verbose=True))
+        self.assertEqual(make_key(Author(pk=1), {1, 2}), make_key(Author(pk=1), {2, 1}))
+        self.assertNotEqual(make_key(Author(pk=1)), make_key(Author(pk=2)))
+        self.assertNotEqual(make_key(Author(pk=1), (1,)), make_key(Author(pk=1), ("1",)))
+        self.assertTrue(make_key(1).startswith("memo:test_memoize:"))
+
+        with self.assertRaises(TypeError):
+            make_key(object())
+
+    def test_memoize(self):
+        author = Author(pk=1)
+
+        self.assertIsNone(self.function(author, None))
+        self.assertIsNone(self.function(author, None))  # Cached None is a hit.
+        self.assertEqual(self.function(author, [1, 2]), 2)
+        self.assertEqual(len(self.calls), 2)
+
+        self.function.invalidate(author, None)
+        self.function(author, None)
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(memoize_stats()["test_memoize"], {"hits": 1, "local_hits": 0, "misses": 3})
+
+    def test_local_cache(self):
+        local = LocalCache(maxsize=2)
+        local.set("first", 1, 60)
+        local.set("second", 2, 60)
+        local.get("first")
+        local.set("third", 3, 60)  # Evicts the least recently used one.
+        self.assertEqual((local.get("first"), local.get("second"), local.get("third")), (1, None, 3))
+
+        local.set("expired", 4, -1)
+        self.assertIsNone(local.get("expired"))
+
+
+@mock.patch("dictionary.utils.context_processors.render_to_string", return_value="<ul></ul>")
+class LeftFrameFragmentTests(SimpleTestCase):
+    def setUp(self):
+        backend.clear()
+
+    @staticmethod
+    def processor(user=None, fell_back=False, **cookies):
+        request = RequestFactory().get("/")
+        request.user, request.COOKIES = user or AnonymousUser(), cookies
+        processor = LeftFrameProcessor(request)
+
+        def get_context():
+            processor.fell_back = fell_back
+            return {}
+
+        processor.context = get_context
+        return processor
+
+    def test_shared_among_guests(self, render):
+        self.assertEqual(self.processor(lfac="today").fragment(), "<ul></ul>")
+        self.assertEqual(self.processor(lfac="today").fragment(), "<ul></ul>")
+        self.assertEqual(render.call_count, 1)
+
+        # Varies on cookies and language.
+        self.processor(lfac="today", lfnp="2").fragment()
+        self.assertEqual(render.call_count, 2)
+
+        with translation.override("en"):
+            english = self.processor(lfac="today")._fragment_key
+
+        with translation.override("tr"):
+            self.assertNotEqual(self.processor(lfac="today")._fragment_key, english)
+
+    def test_not_shared(self, render):
+        authenticated = Author(pk=1)
+
+        for processor in (
+            self.processor(authenticated, lfac="today"),
+            self.processor(lfac="followups"),
+            self.processor(fell_back=True, lfac="nonexistent"),
+        ):
+            processor.fragment()
+            processor.fragment()
+
+        self.assertEqual(render.call_count, 6)
+        self.assertIsNone(self.processor(authenticated)._fragment_key)
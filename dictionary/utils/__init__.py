@@ -11,7 +11,7 @@ from django.utils.translation import get_language
 from dateutil.parser import parse
 
 from dictionary.conf import settings
-from dictionary.utils.decorators import cached_context
+from dictionary.utils.decorators import memoize
 
 # General utilities module. DO NOT IMPORT FROM models. Use: apps.get_model("app_name", "model_name")
 
@@ -105,7 +105,7 @@ def time_threshold(**timedelta_kwargs):
     return timezone.now() - datetime.timedelta(**timedelta_kwargs)
 
 
-@cached_context
+@memoize
 def get_generic_superuser():
     return get_user_model().objects.get(username=settings.GENERIC_SUPERUSER_USERNAME)
 
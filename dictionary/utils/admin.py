@@ -4,6 +4,8 @@ from django.contrib.admin.models import CHANGE, LogEntry
 from django.contrib.contenttypes.models import ContentType
 from django.shortcuts import redirect, reverse
 
+from dictionary.models import Author, Entry
+
 
 # Admin site specific utilities
 
@@ -60,3 +62,27 @@ def intermediate(action):
         return handler.redirect_url
 
     return decorator
+
+
+class RecountEntriesMixin:
+    """
+    Recalculates published_entry_count of the authors whose entries get deleted
+    in bulk (queryset deletions, cascades) by the admin, since these skip
+    Entry.delete and thus Author.shift_entry_stats.
+    """
+
+    entry_lookup = None  # Lookup from Entry to the model of the admin, e.g. "topic".
+
+    def _entry_authors(self, objects):
+        entries = Entry.objects_published.filter(**{f"{self.entry_lookup}__in": objects})
+        return set(entries.values_list("author", flat=True))
+
+    def delete_model(self, request, obj):
+        authors = self._entry_authors([obj])
+        super().delete_model(request, obj)
+        Author.recount_published_entries(Author.objects.filter(pk__in=authors))
+
+    def delete_queryset(self, request, queryset):
+        authors = self._entry_authors(queryset)
+        super().delete_queryset(request, queryset)
+        Author.recount_published_entries(Author.objects.filter(pk__in=authors))
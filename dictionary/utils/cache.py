@@ -0,0 +1,200 @@
+from collections import defaultdict
+from functools import wraps
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from asgiref.local import Local
+
+
+__all__ = ["cache", "RequestCache"]
+
+_local = Local()
+_missing = object()
+
+
+class RequestCache:
+    """
+    Cache facade that lives through a single request (see RequestCacheMiddleware).
+    Values fetched from the cache backend are memoized, so the same key is never
+    fetched twice in a request. Writes are deferred and sent with set_many (and
+    delete_many) when the response is ready. Known keys can be fetched in one go
+    with prefetch. Every call to the backend is counted in round_trips.
+
+    Values are shared within the request, don't mutate them in place. Other
+    methods of the backend (e.g. lock) are called after sending the deferred
+    writes and clearing the memo, so that they see (and leave) a consistent state.
+    """
+
+    local_methods = {"make_key", "validate_key", "get_backend_timeout"}
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.round_trips = 0
+        self._memo = {}
+        self._writes = {}
+        self._deletes = set()
+
+    def _backend_call(self, method, *args, **kwargs):
+        self.round_trips += 1
+        return getattr(self.backend, method)(*args, **kwargs)
+
+    def prefetch(self, keys, version=None):
+        keys = [key for key in keys if (key, version) not in self._memo]
+
+        if not keys:
+            return
+
+        found = self._backend_call("get_many", keys, version=version)
+
+        for key in keys:
+            self._memo[(key, version)] = found.get(key, _missing)
+
+    def get(self, key, default=None, version=None):
+        if (key, version) not in self._memo:
+            self._memo[(key, version)] = self._backend_call("get", key, _missing, version=version)
+
+        value = self._memo[(key, version)]
+        return default if value is _missing else value
+
+    def has_key(self, key, version=None):
+        return self.get(key, _missing, version=version) is not _missing
+
+    def __contains__(self, key):
+        return self.has_key(key)
+
+    def get_many(self, keys, version=None):
+        self.prefetch(keys, version=version)
+        return {key: value for key in keys if (value := self._memo[(key, version)]) is not _missing}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._memo[(key, version)] = value
+        self._writes[(key, version)] = (value, timeout)
+        self._deletes.discard((key, version))
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        for key, value in data.items():
+            self.set(key, value, timeout, version=version)
+        return []
+
+    def delete(self, key, version=None):
+        self._memo[(key, version)] = _missing
+        self._writes.pop((key, version), None)
+        self._deletes.add((key, version))
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.delete(key, version=version)
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        # Not deferred, the point of this method is to set the value atomically.
+        if (value := self.get(key, _missing, version=version)) is _missing:
+            self._flush_key(key, version)
+            value = self._backend_call("get_or_set", key, default, timeout, version=version)
+            self._memo[(key, version)] = value
+        return value
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._flush_key(key, version)
+        self._memo.pop((key, version), None)
+        return self._backend_call("add", key, value, timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._flush_key(key, version)
+        return self._backend_call("touch", key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._flush_key(key, version)
+        self._memo.pop((key, version), None)
+        value = self._backend_call("incr", key, delta, version=version)
+        self._memo[(key, version)] = value
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        self._memo.clear()
+        self._writes.clear()
+        self._deletes.clear()
+        return self._backend_call("clear")
+
+    def _flush_key(self, key, version):
+        # Send pending write of given key, before calling an atomic method on it.
+        if (key, version) in self._writes:
+            value, timeout = self._writes.pop((key, version))
+            self._backend_call("set", key, value, timeout, version=version)
+        elif (key, version) in self._deletes:
+            self._deletes.discard((key, version))
+            self._backend_call("delete", key, version=version)
+
+    def flush(self):
+        """Send deferred writes to the backend."""
+        deletes = defaultdict(list)
+        writes = defaultdict(dict)
+
+        for key, version in self._deletes:
+            deletes[version].append(key)
+
+        for (key, version), (value, timeout) in self._writes.items():
+            writes[(timeout, version)][key] = value
+
+        for version, keys in deletes.items():
+            self._backend_call("delete_many", keys, version=version)
+
+        for (timeout, version), data in writes.items():
+            self._backend_call("set_many", data, timeout, version=version)
+
+        self._writes.clear()
+        self._deletes.clear()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.backend, name)
+
+        if name in self.local_methods or not callable(attribute):
+            return attribute
+
+        @wraps(attribute)
+        def call(*args, **kwargs):
+            # Unknown methods might read or write any key.
+            self.flush()
+            self._memo.clear()
+            self.round_trips += 1
+            return attribute(*args, **kwargs)
+
+        return call
+
+
+def activate():
+    _local.request_cache = RequestCache(caches[DEFAULT_CACHE_ALIAS])
+    return _local.request_cache
+
+
+def deactivate():
+    request_cache = getattr(_local, "request_cache", None)
+
+    if request_cache is not None:
+        del _local.request_cache
+        request_cache.flush()
+
+    return request_cache
+
+
+class CacheProxy:
+    """
+    Works like django.core.cache.cache, but uses the request scoped cache
+    while a request is being handled by RequestCacheMiddleware.
+    """
+
+    @staticmethod
+    def _get_cache():
+        return getattr(_local, "request_cache", None) or caches[DEFAULT_CACHE_ALIAS]
+
+    def __getattr__(self, name):
+        return getattr(self._get_cache(), name)
+
+    def __contains__(self, key):
+        return key in self._get_cache()
+
+
+cache = CacheProxy()
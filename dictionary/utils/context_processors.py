@@ -1,3 +1,4 @@
+import hashlib
 import json
 
 from contextlib import suppress
@@ -6,12 +7,15 @@ from urllib.parse import parse_qsl, quote, unquote
 
 from django.core.exceptions import PermissionDenied
 from django.http import Http404
+from django.template.loader import render_to_string
 from django.utils.functional import LazyObject, cached_property
-from django.utils.translation import gettext as _
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language, gettext as _
 
 from dictionary.conf import settings
 from dictionary.models import Category
-from dictionary.utils.decorators import cached_context
+from dictionary.utils.cache import cache
+from dictionary.utils.decorators import memoize
 from dictionary.utils.managers import TopicListManager
 from dictionary.utils.serializers import LeftFrame
 
@@ -35,6 +39,7 @@ class LeftFrameProcessor:
         self.cookies = request.COOKIES
         self.response = response
         self.context = self._get_context
+        self.fell_back = False
 
     def get_cookie(self, key):
         value = self.cookies.get(key)
@@ -110,11 +115,55 @@ class LeftFrameProcessor:
             )
             context = LeftFrame(handler, page=self._page).as_context()
         except (Http404, PermissionDenied):
+            self.fell_back = True
             self.set_cookie("lfac", settings.DEFAULT_CATEGORY)
             return self._get_context(manager=TopicListManager(settings.DEFAULT_CATEGORY), attempt=attempt + 1)
 
         return context
 
+    @cached_property
+    def _fragment_key(self):
+        """
+        Cache key for rendered left frame, None if it shouldn't be shared. Left
+        frames of authenticated users vary on their preferences, so only the
+        ones rendered for guests are shared.
+        """
+        if (
+            self.user.is_authenticated
+            or not settings.LEFT_FRAME_FRAGMENT_TIMEOUT
+            or settings.DISABLE_CATEGORY_CACHING
+            or self.slug in settings.UNCACHED_CATEGORIES
+            or f"{self.slug}_{self._tab}" in settings.UNCACHED_CATEGORIES
+        ):
+            return None
+
+        parts = (
+            self.slug,
+            self._tab,
+            self._page,
+            self._year,
+            self._exclusions,
+            self._search_keys,
+            self._extra,
+            get_language(),
+        )
+        digest = hashlib.blake2b(json.dumps(parts, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+        return f"lf_fragment_public_{digest}"
+
+    def fragment(self):
+        """Rendered left frame. Rendered once and reused for guests requesting the same list."""
+        key = self._fragment_key
+
+        if key is not None and (html := cache.get(key)) is not None:
+            return mark_safe(html)
+
+        html = render_to_string("dictionary/includes/left_frame_content.html", {"lf": self.context()})
+
+        if key is not None and not self.fell_back:
+            cache.set(key, html, settings.LEFT_FRAME_FRAGMENT_TIMEOUT)
+
+        return mark_safe(html)
+
 
 def left_frame_fallback(request):
     """
@@ -124,7 +173,7 @@ def left_frame_fallback(request):
     return {"left_frame_fallback": lf_proxy(request) if not request.is_mobile else {}}
 
 
-@cached_context
+@memoize(local_timeout=60, ignore=["_request"])
 def header_categories(_request=None):
     """
     Required for header category navigation.
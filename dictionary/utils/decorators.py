@@ -1,58 +1,160 @@
+import datetime
+import hashlib
+import inspect
+import threading
+import time
+
+from collections import OrderedDict
+from decimal import Decimal
 from functools import wraps
 
-from django.core.cache import cache
+from dictionary.utils.cache import cache
 
 
 # General decorators
 
 
-def cached_context(initial_func=None, *, timeout=None, vary_on_user=False, prefix="default"):
+class LocalCache:
+    """Small in-process LRU cache with expiring items, used as the first tier of memoize."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+
+            if item is None:
+                return None
+
+            expires_at, value = item
+
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalCache()
+
+_memoized = {}
+
+
+def _key_part(value):
+    """Stable string representation of an argument, to be used in cache keys."""
+
+    if hasattr(value, "_meta") and hasattr(value, "pk"):  # Model instances
+        return f"{value._meta.label_lower}:{value.pk}"
+
+    if getattr(value, "is_anonymous", False) is True:
+        return "anonymous"
+
+    if isinstance(value, (list, tuple)):
+        return "(" + ",".join(_key_part(item) for item in value) + ")"
+
+    if isinstance(value, (set, frozenset)):
+        return "{" + ",".join(sorted(_key_part(item) for item in value)) + "}"
+
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{key}:{_key_part(item)}" for key, item in sorted(value.items())) + "}"
+
+    if value is None or isinstance(value, (str, int, float, Decimal, datetime.date)):
+        return repr(value)
+
+    raise TypeError(f"Can't build a cache key using an argument of type {type(value).__name__}.")
+
+
+def memoize(initial_func=None, *, timeout=None, local_timeout=None, ignore=(), name=None, cache_none=True):
     """
-    Decorator to cache functions using django's low-level cache api. Arguments
-    are not taken into consideration while caching, so values of func(a, b) and
-    func(b, d) will be the same (the value of first called).
+    Decorator to cache results of functions using django's low-level cache api.
+    Arguments are hashed into cache keys; model instances are represented by
+    their primary keys. None results are cached as well, unless cache_none is
+    False (e.g. when None means "not found" and arguments come from clients).
+
+    The decorated function has these attributes:
+    make_key(*args, **kwargs): Cache key for given arguments.
+    invalidate(*args, **kwargs): Delete cached result for given arguments.
+    stats: Dict of hit and miss counts (of this process).
 
     :param initial_func: (decorator thingy, passed when used with parameters)
     :param timeout: Set the cache timeout, None to cache indefinitely.
-    :param prefix: Cache keys are set using the name of the function. Set a
-    unique prefix to avoid clashes between functions/methods that with same name.
-    :param vary_on_user: Set True to cache per user (anonymous users will have
-    the same value). The wrapped function needs to have either "request" as
-    argument or "user" as keyword argument.
+    :param local_timeout: Set to keep results in process memory for this many
+    seconds, in front of the cache server. Invalidation only reaches the memory
+    of the current process, so keep this short.
+    :param ignore: Names of the arguments that should not vary the result,
+    e.g. "self" for methods that return the same value for all instances.
+    :param name: Used in cache keys, defaults to dotted path of the function.
     """
 
     def decorator(func):
+        signature = inspect.signature(func)
+        prefix = name or f"{func.__module__}.{func.__qualname__}"
+        stats = {"hits": 0, "local_hits": 0, "misses": 0}
+
+        def make_key(*args, **kwargs):
+            bound = signature.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = ";".join(
+                f"{arg}={_key_part(value)}" for arg, value in bound.arguments.items() if arg not in ignore
+            )
+            return f"memo:{prefix}:{hashlib.blake2b(arguments.encode('utf-8'), digest_size=16).hexdigest()}"
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            user_prefix = ""
+            key = make_key(*args, **kwargs)
 
-            if vary_on_user:
-                request = kwargs.get("request")
+            if local_timeout is not None and (item := local_cache.get(key)) is not None:
+                stats["local_hits"] += 1
+                return item[0]
 
-                if request is not None:
-                    user = request.user
-                else:
-                    user = kwargs.get("user")
+            # Results are wrapped in a tuple, so that cached None can be told apart from a miss.
+            item = cache.get(key)
 
-                user_prefix = "_anonymous" if not user.is_authenticated else f"_usr{user.pk}"
+            if item is None:
+                stats["misses"] += 1
+                item = (func(*args, **kwargs),)
 
-            func_name = ""
+                if item[0] is None and not cache_none:
+                    return None
 
-            if hasattr(func, "__name__"):
-                func_name = func.__name__
-            elif prefix == "default":
-                raise ValueError("Usage with non-wrapped decorators require an unique prefix.")
+                cache.set(key, item, timeout)
+            else:
+                stats["hits"] += 1
 
-            key = f"{prefix}_context__{func_name}{user_prefix}"
-            cached_value = cache.get(key)
+            if local_timeout is not None:
+                local_cache.set(key, item, local_timeout)
 
-            if cached_value is not None:
-                return cached_value
+            return item[0]
 
-            calculated_value = func(*args, **kwargs)
-            cache.set(key, calculated_value, timeout)
-            return calculated_value
+        def invalidate(*args, **kwargs):
+            key = make_key(*args, **kwargs)
+            local_cache.delete(key)
+            cache.delete(key)
 
+        wrapper.make_key = make_key
+        wrapper.invalidate = invalidate
+        wrapper.stats = stats
+        _memoized[prefix] = wrapper
         return wrapper
 
     if initial_func:
@@ -60,6 +162,11 @@ def cached_context(initial_func=None, *, timeout=None, vary_on_user=False, prefi
     return decorator
 
 
+def memoize_stats():
+    """Hit and miss counts of all memoized functions, in this process."""
+    return {prefix: dict(func.stats) for prefix, func in _memoized.items()}
+
+
 def for_public_methods(decorator):
     """Decorate each 'public' method of this class with given decorator."""
 
@@ -5,7 +5,6 @@ from functools import wraps
 from typing import List, Union
 
 from django.contrib.auth.models import AnonymousUser
-from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.db import connection
 from django.db.models import CharField, Count, Exists, F, Max, OuterRef, Prefetch, Q, Subquery, Value
@@ -20,6 +19,7 @@ from dateutil.relativedelta import relativedelta
 from dictionary.conf import settings
 from dictionary.models import Author, Category, Comment, DownvotedEntries, Entry, EntryFavorites, Topic, UpvotedEntries
 from dictionary.utils import parse_date_or_none, time_threshold
+from dictionary.utils.cache import cache
 from dictionary.utils.decorators import for_public_methods
 
 
@@ -52,7 +52,7 @@ class TopicQueryHandler:
             Topic.objects.values(*self.values)
             .filter(**self.base_filter, **self.day_filter)
             .filter(categories)
-            .exclude(created_by__in=user.blocked.all())
+            .exclude(created_by__in=user.blocked_ids)
             .annotate(**self.latest, count=Count("entries", distinct=True))
             .order_by("-latest")
         )
@@ -113,7 +113,7 @@ class TopicQueryHandler:
             .filter(
                 entries__is_draft=False,
                 entries__date_created__gte=time_threshold(hours=120),
-                entries__author__in=user.following.all(),
+                entries__author__in=user.following_ids,
             )
             .annotate(latest=Max("entries__date_created"), count=Count("entries"))
             .order_by("-latest")
@@ -122,7 +122,7 @@ class TopicQueryHandler:
     def acquaintances_favorites(self, user):
         return (
             Entry.objects_published.values("topic")
-            .filter(favorited_by__in=user.following.all(), entryfavorites__date_created__gte=time_threshold(hours=24))
+            .filter(favorited_by__in=user.following_ids, entryfavorites__date_created__gte=time_threshold(hours=24))
             .annotate(
                 title=Concat(F("topic__title"), Value(" (#"), F("pk"), Value(")"), output_field=CharField()),
                 slug=F("pk"),
@@ -138,7 +138,7 @@ class TopicQueryHandler:
     def wishes_all(self, user):
         return (
             Topic.objects.values(*self.values)
-            .exclude(wishes__author__in=user.blocked.all())
+            .exclude(wishes__author__in=user.blocked_ids)
             .annotate(count=Count("wishes"), latest=Max("wishes__date_created"))
             .filter(is_censored=False, count__gte=1)
             .order_by("-count", "-latest")
@@ -693,7 +693,7 @@ class UserStatsQueryHandler:
         base = self.user.favorite_entries.filter(author__is_novice=False)
 
         if self.requester.is_authenticated:
-            return base.exclude(author__in=self.requester.blocked.all())
+            return base.exclude(author__in=self.requester.blocked_ids)
 
         return base
 
@@ -741,7 +741,7 @@ class UserStatsQueryHandler:
             Author.objects_accessible.filter(entry__in=self.user.favorite_entries.all())
             .alias(frequency=Count("entry"))
             .filter(frequency__gt=1)
-            .exclude(Q(pk=self.user.pk) | Q(blocked__in=[self.user.pk]) | Q(pk__in=self.user.blocked.all()))
+            .exclude(Q(pk=self.user.pk) | Q(pk__in=self.user.blocked_by_ids) | Q(pk__in=self.user.blocked_ids))
             .only("username", "slug")
             .order_by("-frequency")[:10]
         )
@@ -0,0 +1,90 @@
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from dictionary.conf import settings
+from dictionary.utils.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionPolicy:
+    """
+    Deletes the rows of get_queryset() in batches of primary key ranges, so
+    that no transaction holds locks on the whole set. Files of file_fields are
+    removed from the storage in a thread pool before their rows get deleted,
+    outside of the delete transaction. (If the run dies in between, the rows are
+    picked up again in the next run; deleting missing files is a no-op.)
+
+    The last processed primary key is recorded in the cache after each batch,
+    so a run that crashed resumes where it left off. Each run logs a summary
+    and returns it.
+    """
+
+    name = None
+    file_fields = ()
+    fields = ()  # Other fields to be passed to on_delete()
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def on_delete(self, rows):
+        """Called with the values of deleted rows, after each batch."""
+
+    @property
+    def cursor_key(self):
+        return f"retention_cursor_{self.name}"
+
+    def run(self):
+        start, cursor = time.perf_counter(), cache.get(self.cursor_key, 0)
+        summary = {"name": self.name, "resumed_from": cursor, "batches": 0, "deleted": 0, "files": 0, "failed": 0}
+        queryset = self.get_queryset().order_by("pk")
+        values = queryset.values("pk", *self.file_fields, *self.fields)
+
+        while rows := list(values.filter(pk__gt=cursor)[: settings.RETENTION_BATCH_SIZE]):
+            first, last = cursor, rows[-1]["pk"]
+
+            if self.file_fields:
+                deleted, failed = self.delete_files(rows)
+                summary["files"] += deleted
+                summary["failed"] += failed
+
+            batch = queryset.filter(pk__gt=first, pk__lte=last)
+
+            if self.file_fields:
+                # Rows that expired in the meantime still have their files.
+                batch = batch.filter(pk__in=[row["pk"] for row in rows])
+
+            summary["deleted"] += batch.delete()[0]
+
+            self.on_delete(rows)
+            summary["batches"] += 1
+            cursor = last
+            cache.set(self.cursor_key, cursor, 86400)
+
+        cache.delete(self.cursor_key)
+        summary["duration"] = round(time.perf_counter() - start, 3)
+        logger.info("Retention run finished: %s", summary, extra={"retention": summary})
+        return summary
+
+    def delete_files(self, rows):
+        model = self.get_queryset().model
+        storages = {field: model._meta.get_field(field).storage for field in self.file_fields}
+        files = [(storages[field], row[field]) for row in rows for field in self.file_fields if row[field]]
+
+        def delete(file):
+            storage, name = file
+
+            try:
+                storage.delete(name)
+                return True
+            except OSError:
+                logger.exception("Could not delete file: %s", name)
+                return False
+
+        with ThreadPoolExecutor(max_workers=settings.RETENTION_FILE_WORKERS) as executor:
+            results = list(executor.map(delete, files))
+
+        return results.count(True), results.count(False)
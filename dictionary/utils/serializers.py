@@ -5,7 +5,7 @@ from django.core.serializers.json import Serializer
 from django.utils.functional import cached_property
 
 from dictionary.conf import settings
-from dictionary.utils.decorators import cached_context
+from dictionary.utils.decorators import memoize
 
 # Do not directly import models here
 
@@ -188,7 +188,7 @@ class LeftFrame(PlainSerializer):
             return {"current": tab, "available": available}
         return None
 
-    @cached_context
+    @memoize(local_timeout=60, ignore=["self"])
     def _get_available_exclusions(self):
         return list(settings.get_model("Category").objects_all.filter(slug__in=settings.EXCLUDABLE_CATEGORIES))
 
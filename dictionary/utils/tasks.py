@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+import uuid
+
+from bisect import bisect_left
+from contextlib import suppress
+from functools import wraps
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.utils import timezone
+
+from celery import current_task
+
+from dictionary.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+_exclusive_tasks = []
+
+
+def _backend():
+    # Not the request scoped cache (see dictionary.utils.cache), locks can't be deferred.
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+class CacheLock:
+    """
+    Lock that works with any cache backend, for development. Provides the methods
+    of redis-py locks used below, but checking the owner is not atomic here.
+    """
+
+    def __init__(self, backend, name, timeout):
+        self.backend = backend
+        self.name = name
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+
+    def acquire(self, blocking=False):
+        return self.backend.add(self.name, self.token, self.timeout)
+
+    def reacquire(self):
+        return self.backend.get(self.name) == self.token and self.backend.touch(self.name, self.timeout)
+
+    def release(self):
+        if self.backend.get(self.name) == self.token:
+            self.backend.delete(self.name)
+
+
+def get_lock(name, timeout):
+    backend = _backend()
+
+    if hasattr(backend, "lock"):
+        # django-redis, the token is not thread local so that the heartbeat can extend the lock.
+        return backend.lock(name, timeout=timeout, thread_local=False)
+
+    return CacheLock(backend, name, timeout)
+
+
+class Heartbeat(threading.Thread):
+    """Extends the lock periodically while the task runs, so that it expires only if the worker dies."""
+
+    def __init__(self, lock, interval, name):
+        super().__init__(daemon=True)
+        self.lock = lock
+        self.interval = interval
+        self.task_name = name
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                extended = self.lock.reacquire()
+            except Exception:  # noqa, e.g. redis.exceptions.LockNotOwnedError
+                extended = False
+
+            if not extended:
+                logger.warning("Lost the lock of task %s, another run might start.", self.task_name)
+                return
+
+
+def exclusive(initial_func=None, *, timeout=None, retry=False):
+    """
+    Decorator for celery tasks that must not run concurrently, e.g. periodic
+    tasks that might overlap with a slow previous run. Runs hold a lock on the
+    cache server which expires in 'timeout' seconds (TASK_LOCK_TIMEOUT by
+    default) unless extended by a heartbeat, every third of the timeout.
+
+    If the lock is held by another run, this run is skipped; or retried later
+    if 'retry' is True. Durations and outcomes of runs are recorded, see
+    get_task_stats and the 'task_stats' management command.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__name__}"
+        _exclusive_tasks.append(name)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            lock_timeout = timeout or settings.TASK_LOCK_TIMEOUT
+            lock = get_lock(f"task_lock:{name}", lock_timeout)
+
+            if not lock.acquire(blocking=False):
+                _record(name, "skipped")
+
+                if retry and current_task:
+                    raise current_task.retry(countdown=lock_timeout // 3)
+
+                logger.info("Skipped task %s, another run holds the lock.", name)
+                return None
+
+            heartbeat = Heartbeat(lock, lock_timeout / 3, name)
+            heartbeat.start()
+            start, status = time.monotonic(), "failed"
+
+            try:
+                result = func(*args, **kwargs)
+                status = "succeeded"
+                return result
+            finally:
+                heartbeat.stopped.set()
+                heartbeat.join()
+                _record(name, status, time.monotonic() - start)
+
+                with suppress(Exception):  # Lock might have expired already.
+                    lock.release()
+
+        return wrapper
+
+    if initial_func:
+        return decorator(initial_func)
+    return decorator
+
+
+def _record(name, status, duration=None):
+    # Only the run holding the lock writes durations, skip counts might be lost on contention.
+    backend, key = _backend(), f"task_stats:{name}"
+    stats = backend.get(key) or {
+        "runs": 0,
+        "failed": 0,
+        "skipped": 0,
+        "buckets": [0] * (len(DURATION_BUCKETS) + 1),  # Last one is +Inf
+        "sum": 0,
+    }
+
+    if duration is None:
+        stats["skipped"] += 1
+        stats["last_skipped"] = timezone.now()
+    else:
+        stats["runs"] += 1
+        stats["failed"] += int(status == "failed")
+        stats["buckets"][bisect_left(DURATION_BUCKETS, duration)] += 1
+        stats["sum"] += duration
+        stats.update(last_run=timezone.now(), last_status=status, last_duration=duration)
+
+    backend.set(key, stats, None)
+
+
+def _quantile(stats, q):
+    """Upper bound of the bucket that contains given quantile (approximate)."""
+    total = 0
+
+    for bound, count in zip((*DURATION_BUCKETS, float("inf")), stats["buckets"]):
+        total += count
+
+        if total >= q * stats["runs"]:
+            return bound
+
+    return None
+
+
+def get_task_stats():
+    """Statistics of the runs of exclusive tasks, as recorded in the cache."""
+    found = _backend().get_many([f"task_stats:{name}" for name in _exclusive_tasks])
+    rows = []
+
+    for name in _exclusive_tasks:
+        stats = found.get(f"task_stats:{name}")
+
+        if stats is None:
+            rows.append({"name": name, "runs": 0})
+            continue
+
+        runs = stats["runs"]
+        rows.append(
+            {
+                **stats,
+                "name": name,
+                "mean": stats["sum"] / runs if runs else None,
+                "p50": _quantile(stats, 0.5) if runs else None,
+                "p95": _quantile(stats, 0.95) if runs else None,
+            }
+        )
+
+    return rows
@@ -23,8 +23,7 @@ class AnnouncementIndex(AnnouncementMixin, ArchiveIndexView):
         if request.user.is_authenticated and request.user.unread_topic_count["announcements"] > 0:
             request.user.announcement_read = timezone.now()
             request.user.save()
-            self.request.user.invalidate_unread_topic_count()
-            del request.user.unread_topic_count  # reset cached_property
+            request.user.invalidate_unread_topic_count()
 
         return super().dispatch(request, *args, **kwargs)
 
@@ -37,11 +37,16 @@ class Login(LoginView):
 
         # Check if the user cancels account termination.
         with suppress(AccountTerminationQueue.DoesNotExist):
-            AccountTerminationQueue.objects.get(author=form.get_user()).delete()
+            AccountTerminationQueue.objects.get(author=form.get_user(), locked_until__isnull=True).delete()
             notifications.info(
                 self.request, _("welcome back. your account has been reactivated."), extra_tags="persistent"
             )
 
+        # Terminations that are being processed (or got interrupted, they will be resumed) can't be cancelled.
+        if AccountTerminationQueue.objects.filter(author=form.get_user()).exists():
+            form.add_error(None, _("your account is being deleted, so it can't be reactivated anymore."))
+            return self.form_invalid(form)
+
         notifications.info(self.request, _("successfully logged in, dear"))
         return super().form_valid(form)
 
@@ -239,7 +244,7 @@ class DownloadBackup(LoginRequiredMixin, View):
             backup = BackUp.objects.get(author=self.request.user, is_ready=True)
             filename = os.path.basename(backup.file.name)
 
-            response = HttpResponse(content_type="application/json")
+            response = HttpResponse(content_type="application/gzip" if backup.is_compressed else "application/json")
 
             if django_settings.DEBUG:
                 response.content = backup.file
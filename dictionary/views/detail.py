@@ -6,7 +6,6 @@ from django.core.paginator import Paginator
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
-from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.translation import gettext, gettext_lazy as _
 from django.views.generic import DetailView, ListView
@@ -14,7 +13,6 @@ from django.views.generic import DetailView, ListView
 from dictionary.conf import settings
 from dictionary.forms.edit import MementoForm, SendMessageForm
 from dictionary.models import Author, Conversation, ConversationArchive, Entry, Memento, Message
-from dictionary.utils.decorators import cached_context
 from dictionary.utils.managers import UserStatsQueryHandler, entry_prefetch
 from dictionary.utils.mixins import IntegratedFormMixin
 
@@ -49,8 +47,8 @@ class Chat(LoginRequiredMixin, IntegratedFormMixin, DetailView):
         chat = self.model.objects.with_user(self.request.user, recipient)
 
         if chat is not None:
-            # Mark read
-            chat.messages.filter(sender=recipient, read_at__isnull=True).update(read_at=timezone.now())
+            if chat.unread_count:
+                chat.mark_read()
             return chat
 
         raise Http404  # users haven't messaged each other yet
@@ -58,7 +56,7 @@ class Chat(LoginRequiredMixin, IntegratedFormMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         recipient = self.object.target
-        is_blocked = self.request.user.blocked.filter(pk=recipient.pk).exists()  # causes 1 duplicate query
+        is_blocked = recipient.pk in self.request.user.blocked_ids
         can_send_message = False if is_blocked else self.request.user.can_send_message(recipient)
 
         context["recipient"] = recipient
@@ -69,9 +67,23 @@ class Chat(LoginRequiredMixin, IntegratedFormMixin, DetailView):
 
 class ChatArchive(LoginRequiredMixin, DetailView):
     template_name = "dictionary/conversation/conversation_archive.html"
+    paginate_by = 50
 
     def get_object(self, queryset=None):
-        return get_object_or_404(ConversationArchive, holder=self.request.user, slug=self.kwargs["slug"])
+        archive = get_object_or_404(ConversationArchive, holder=self.request.user, slug=self.kwargs["slug"])
+
+        if archive.messages:
+            archive.convert_legacy()
+
+        return archive
+
+    def get_context_data(self, **kwargs):
+        # Messages are read lazily, only the chunks of the requested page are fetched. Opens on the last page,
+        # so that the latest messages are shown (in chronological order, like in conversations).
+        context = super().get_context_data(**kwargs)
+        paginator = Paginator(self.object.archived_messages, self.paginate_by)
+        context["page_obj"] = paginator.get_page(self.request.GET.get("page") or paginator.num_pages)
+        return context
 
 
 class LatestEntriesPaginator(Paginator):
@@ -177,8 +189,8 @@ class UserProfile(IntegratedFormMixin, ListView):
                 self.profile.is_private,
                 self.request.user.is_authenticated
                 and (
-                    self.profile.blocked.filter(pk=self.request.user.pk).exists()
-                    or self.request.user.blocked.filter(pk=self.profile.pk).exists()
+                    self.profile.pk in self.request.user.blocked_by_ids
+                    or self.profile.pk in self.request.user.blocked_ids
                 ),
             )
         ):
@@ -200,8 +212,7 @@ class UserProfile(IntegratedFormMixin, ListView):
             and sender.is_novice
             and sender.application_status == "PN"
         ):
-            queue = cached_context(prefix="nqu", vary_on_user=True, timeout=86400)(lambda user: user.novice_queue)
-            return queue(user=sender)
+            return sender.novice_queue
         return None
 
     def get_memento(self):
@@ -1,26 +1,17 @@
-from io import BytesIO
-
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.core.files import File
-from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
 from django.utils.translation import gettext
 from django.views.generic import CreateView, ListView, View
-from django.views.generic.detail import SingleObjectMixin
-
-from PIL import Image as PIL_Image, ImageOps
 
 from dictionary.conf import settings
 from dictionary.models import Image
+from dictionary.models.images import resolve_image
 from dictionary.utils import time_threshold
 
 
-def compress(file):
-    img, img_io = PIL_Image.open(file), BytesIO()
-    transposed = ImageOps.exif_transpose(img)
-    transposed.save(img_io, img.format, quality=settings.COMPRESS_QUALITY)
-    return File(img_io, name=file.name)
-
-
 class ImageUpload(LoginRequiredMixin, CreateView):
     http_method_names = ["post"]
     model = Image
@@ -45,11 +36,9 @@ class ImageUpload(LoginRequiredMixin, CreateView):
                 gettext("this file is too large. (%.1f> MB)") % settings.MAX_UPLOAD_SIZE / 1048576
             )
 
-        if settings.COMPRESS_IMAGES and image.file.size > settings.COMPRESS_THRESHOLD:
-            image.file = compress(image.file)
-
         image.author = self.request.user
         image.save()
+        image.process_async()  # Variants are generated in the background, the original is served until then.
         return JsonResponse({"slug": image.slug})
 
     def form_invalid(self, form):
@@ -66,23 +55,49 @@ class ImageList(LoginRequiredMixin, UserPassesTestMixin, ListView):
         return not self.request.user.is_novice
 
 
-class ImageDetailBase(SingleObjectMixin, View):
-    model = Image
+class ImageDetailBase(View):
+    """
+    Images are resolved via cache (see resolve_image) and served with validators
+    (ETag, Last-Modified) so that conditional requests are answered with 304.
+    Files are never modified once written, so published images are cached for
+    good once their variants are generated.
+    """
+
+    def get(self, request, *args, **kwargs):
+        image = resolve_image(self.kwargs["slug"])
 
-    def get_queryset(self):
         # Notice: AnonymousUser has "has_perm" property.
-        if self.request.user.has_perm("dictionary.view_image"):
-            return super().get_queryset()
+        if image is None or (image["is_deleted"] and not request.user.has_perm("dictionary.view_image")):
+            raise Http404
+
+        variant = Image.select_variant(image["files"], request.META.get("HTTP_ACCEPT", ""), request.GET.get("variant"))
+        file = image["files"][variant]
+        response = get_conditional_response(
+            request, etag=file["etag"], last_modified=file["last_modified"]
+        ) or self.serve(file)
+
+        response["ETag"] = file["etag"]
+        response["Last-Modified"] = http_date(file["last_modified"])
+        patch_vary_headers(response, ["Accept"])
+
+        if image["is_deleted"]:
+            patch_cache_control(response, private=True, no_cache=True)
+        elif image["is_processed"]:
+            patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+        else:
+            # Variants will be available soon.
+            patch_cache_control(response, public=True, max_age=60)
+
+        return response
 
-        return self.model.objects.filter(is_deleted=False)
+    def serve(self, file):
+        raise NotImplementedError
 
 
 class ImageDetailDevelopment(ImageDetailBase):
-    def get(self, request, *args, **kwargs):
-        image = self.get_object()
-
+    def serve(self, file):
         try:
-            return HttpResponse(image.file, content_type="image/png")
+            return HttpResponse(default_storage.open(file["name"]), content_type=file["content_type"])
         except FileNotFoundError:
             return HttpResponse("File not found.")
 
@@ -93,8 +108,7 @@ class ImageDetailProduction(ImageDetailBase):
     according to your server. You may need some extra set-up.
     """
 
-    def get(self, request, *args, **kwargs):
-        image = self.get_object()
-        response = HttpResponse(content_type="image/png")
-        response[settings.XSENDFILE_HEADER_NAME] = image.file.url
+    def serve(self, file):
+        response = HttpResponse(content_type=file["content_type"])
+        response[settings.XSENDFILE_HEADER_NAME] = file["url"]
         return response
@@ -12,7 +12,7 @@ from django.contrib import messages as notifications
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.db import connection
-from django.db.models import Exists, Max, Min, OuterRef, Prefetch, Q
+from django.db.models import Exists, Max, Min, OuterRef, Q
 from django.http import Http404, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
@@ -39,7 +39,7 @@ from dictionary.models import (
 )
 from dictionary.templatetags.filters import IMAGE_REGEX, RE_TOPIC_CHARSET, SEE_EXPR
 from dictionary.utils import RE_WEBURL, i18n_lower, proceed_or_404, time_threshold
-from dictionary.utils.decorators import cached_context
+from dictionary.utils.decorators import memoize
 from dictionary.utils.managers import TopicListManager, entry_prefetch
 from dictionary.utils.mixins import IntegratedFormMixin
 from dictionary.utils.serializers import LeftFrame
@@ -80,7 +80,7 @@ class Index(ListView):
         queryset = Entry.objects.filter(pk__in=self.get_pk_set()).order_by()
         return entry_prefetch(queryset, self.request.user)
 
-    @method_decorator(cached_context(timeout=page_timeout, prefix="index_view"))
+    @memoize(timeout=page_timeout, ignore=["self"])
     def get_pk_set(self):
         records = getattr(self, settings.INDEX_TYPE)()
         return list(records)
@@ -107,10 +107,12 @@ class Index(ListView):
                 ids.add(next_pk)
                 yield next_pk
 
+    @memoize(timeout=nice_cache_timeout, ignore=["self"])
+    def get_nice_pk_set(self):
+        return tuple(Entry.objects.filter(vote_rate__gte=self.nice_bound).values_list("pk", flat=True).order_by())
+
     def nice_records(self):
-        nice_pk_set = cached_context(prefix="index_nice_pk_set", timeout=self.nice_cache_timeout)(
-            lambda: tuple(Entry.objects.filter(vote_rate__gte=self.nice_bound).values_list("pk", flat=True).order_by())
-        )()  # Generated cache key: index_nice_pk_set_context__<lambda>
+        nice_pk_set = self.get_nice_pk_set()
         return random.sample(nice_pk_set, self.size) if len(nice_pk_set) > self.size else nice_pk_set
 
 
@@ -185,8 +187,7 @@ class ConversationList(LoginRequiredMixin, IntegratedFormMixin, ListView):
         query_term = i18n_lower(self.request.GET.get("search_term", "")).strip() or None
         return (
             Conversation.objects.list_for_user(self.request.user, query_term)
-            .select_related("target")
-            .prefetch_related(Prefetch("messages", queryset=Message.objects.select_related("recipient")))
+            .select_related("target", "last_message")
         )
 
 
@@ -212,20 +213,13 @@ class ActivityList(LoginRequiredMixin, ListView):
 
     def post(self, *args, **kwargs):
         """Bulk read unread topics."""
-        TopicFollowing.objects.filter(
-            author=self.request.user,
-            topic__in=self.request.user.get_following_topics_with_receipt().filter(is_read=False),
-        ).update(read_at=timezone.now())
+        TopicFollowing.objects.mark_read(
+            self.request.user, topic__in=self.request.user.get_following_topics_with_receipt().filter(is_read=False)
+        )
 
         notifications.info(self.request, _("the topics were mark read"))
         return redirect(self.request.path)
 
-    def dispatch(self, request, *args, **kwargs):
-        # Make sure that unread item data is always fresh for this page.
-        if request.user.is_authenticated:
-            self.request.user.invalidate_unread_topic_count()
-        return super().dispatch(request, *args, **kwargs)
-
 
 class CategoryList(ListView):
     model = Category
@@ -415,7 +409,7 @@ class TopicEntryList(EntryCreateMixin, IntegratedFormMixin, ListView):
 
     def acquaintances(self):
         """Shows the entries of followed users."""
-        filters = {"author__in": self.request.user.following.all()}
+        filters = {"author__in": self.request.user.following_ids}
 
         # 120 hours defined in TopicQueryHandler's acquaintances_entries
         if self.request.GET.get("recent") is not None:
@@ -444,10 +438,17 @@ class TopicEntryList(EntryCreateMixin, IntegratedFormMixin, ListView):
 
         if queryset is not None and queryset.exists():
             following.read_at = timezone.now()
-            following.save()
+
+            if following.unread_count is not None:  # NULL for crowded topics, see notify_followers
+                following.unread_count = 0
+
+            following.save(update_fields=["read_at", "unread_count"])
             self.request.user.invalidate_unread_topic_count()
             return queryset
 
+        if following and following.unread_count:  # Nothing to reset if 0, or NULL for crowded topics.
+            TopicFollowing.objects.mark_read(self.request.user, topic=self.topic)
+
         notifications.info(self.request, _("honestly, there was nothing new. so i listed them all."))
         self.redirect = True
         return None
@@ -652,7 +653,7 @@ class TopicEntryList(EntryCreateMixin, IntegratedFormMixin, ListView):
                 klass = (
                     Entry.objects_published
                     if not self.request.user.is_authenticated
-                    else Entry.objects_published.exclude(author__in=self.request.user.blocked.all())
+                    else Entry.objects_published.exclude(author__in=self.request.user.blocked_ids)
                 )
                 self.entry = get_object_or_404(klass.select_related("topic"), pk=int(self.kwargs.get("entry_id")))
                 self.topic = self.entry.topic
@@ -721,7 +722,7 @@ class TopicEntryList(EntryCreateMixin, IntegratedFormMixin, ListView):
             qs = qs.exclude(author__is_novice=True)
 
         if self.request.user.is_authenticated:
-            qs = qs.exclude(author__in=self.request.user.blocked.all())
+            qs = qs.exclude(author__in=self.request.user.blocked_ids)
 
         if prefetch:
             return entry_prefetch(qs, self.request.user, comments=self.topic.is_ama)
@@ -0,0 +1,39 @@
+from django.contrib.sitemaps import views as sitemap_views
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.views.decorators.gzip import gzip_page
+
+from dictionary.sitemaps import StaticSitemapWriter, dynamic_sitemaps
+
+
+# Sitemaps are written to static files by StaticSitemapWriter and served by the web server
+# (see nginx.conf), these views are the fallbacks (e.g. before the files are written).
+
+
+def _open(name, content_type):
+    path = f"{StaticSitemapWriter.directory}/{name}"
+
+    if not default_storage.exists(path):
+        return None
+
+    return FileResponse(default_storage.open(path), content_type=content_type)
+
+
+def index(request):
+    if response := _open("sitemap.xml", "application/xml"):
+        return response
+
+    # Not written yet, list the sections that can be rendered on request.
+    return gzip_page(sitemap_views.index)(request, sitemaps=dynamic_sitemaps)
+
+
+def section(request, section):
+    # Large sections (e.g. entries) are not paginated on request, crawlers get them from the static index.
+    return gzip_page(sitemap_views.sitemap)(request, sitemaps=dynamic_sitemaps, section=section)
+
+
+def static_file(request, name):
+    if response := _open(f"sitemap-{name}.xml.gz", "application/gzip"):
+        return response
+
+    raise Http404
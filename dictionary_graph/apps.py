@@ -5,3 +5,6 @@ from django.utils.translation import gettext_lazy as _
 class DictionaryApiConfig(AppConfig):
     name = "dictionary_graph"
     verbose_name = _("Dictionary API")
+
+    def ready(self):
+        import dictionary_graph.signals  # noqa
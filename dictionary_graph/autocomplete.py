@@ -28,9 +28,8 @@ class AuthorAutoCompleteQuery(ObjectType):
         queryset = Author.objects_accessible.filter(username__istartswith=lookup).only("username", "slug", "is_novice")
 
         if info.context.user.is_authenticated:
-            blocked = info.context.user.blocked.all()
-            blocked_by = info.context.user.blocked_by.all()
-            return queryset.exclude(Q(pk__in=blocked) | Q(pk__in=blocked_by))[:limit]
+            user = info.context.user
+            return queryset.exclude(pk__in=user.blocked_ids | user.blocked_by_ids)[:limit]
 
         return queryset[:limit]
 
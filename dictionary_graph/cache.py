@@ -0,0 +1,139 @@
+import hashlib
+import json
+import time
+
+from django.utils.translation import get_language
+
+from graphql.language import ast
+
+from dictionary.conf import settings
+from dictionary.utils.cache import cache
+
+
+RESPONSE_KEY_PREFIX = "graph_response_"
+TAG_KEY_PREFIX = "graph_tag_"
+
+
+def _argument_values(field, variables):
+    values = {}
+
+    for argument in field.arguments or ():
+        if isinstance(argument.value, ast.Variable):
+            values[argument.name.value] = (variables or {}).get(argument.value.name.value)
+        elif isinstance(argument.value, (ast.IntValue, ast.StringValue, ast.BooleanValue)):
+            values[argument.name.value] = argument.value.value
+
+    return values
+
+
+def _get_operation(document, operation_name):
+    operations = [
+        definition
+        for definition in document.document_ast.definitions
+        if isinstance(definition, ast.OperationDefinition)
+    ]
+
+    if operation_name is None:
+        return operations[0] if len(operations) == 1 else None
+
+    return next(
+        (operation for operation in operations if operation.name and operation.name.value == operation_name), None
+    )
+
+
+def _cacheable_fields(field, variables):
+    """List of (name, tags) of the fields selected by given root field, None if any of them is not cacheable."""
+    name, arguments = field.name.value, _argument_values(field, variables)
+
+    if name == "topics":
+        slug = arguments.get("slug")
+
+        if (
+            arguments.get("refresh")
+            or settings.DISABLE_CATEGORY_CACHING
+            or slug in settings.UNCACHED_CATEGORIES
+            or f"{slug}_{arguments.get('tab')}" in settings.UNCACHED_CATEGORIES
+        ):
+            return None
+
+        return [("topics", ("topics",))]
+
+    if name == "autocomplete":
+        return [("autocomplete", ("autocomplete",))]
+
+    if name == "entry":
+        fields = []
+
+        for selection in field.selection_set.selections:
+            if not isinstance(selection, ast.Field) or selection.name.value != "favoriters":
+                return None
+
+            pk = _argument_values(selection, variables).get("pk")
+            fields.append(("favoriters", (f"favoriters_{pk}",)))
+
+        return fields
+
+    return None
+
+
+def get_policy(document, operation_name, variables):
+    """
+    Returns (timeout, tags) if the result of the operation can be cached, else
+    None. Only queries that consist of the fields in GRAPH_RESPONSE_TIMEOUTS
+    are cached, the smallest timeout of the fields is used.
+    """
+    operation = _get_operation(document, operation_name)
+
+    if operation is None or operation.operation != "query":
+        return None
+
+    timeouts, tags = [], set()
+
+    for selection in operation.selection_set.selections:
+        if not isinstance(selection, ast.Field):
+            return None
+
+        fields = _cacheable_fields(selection, variables)
+
+        if not fields:
+            return None
+
+        for name, field_tags in fields:
+            timeouts.append(settings.GRAPH_RESPONSE_TIMEOUTS.get(name, 0))
+            tags.update(field_tags)
+
+    timeout = min(timeouts)
+    return (timeout, tuple(sorted(tags))) if timeout > 0 else None
+
+
+def get_scope(user):
+    """
+    Responses of guests are shared. Responses of authenticated users are kept
+    per user, and they also vary on the relations of the user (see Author.relations).
+    """
+    if not user.is_authenticated:
+        return "public"
+
+    return f"usr{user.pk}_{cache.get_or_set(user._relations_version_key, time.time_ns, None)}"
+
+
+def make_key(query_hash, operation_name, variables, scope, tags):
+    versions = cache.get_many([TAG_KEY_PREFIX + tag for tag in tags])
+    parts = (
+        query_hash,
+        operation_name,
+        variables,
+        scope,
+        get_language(),
+        [versions.get(TAG_KEY_PREFIX + tag) for tag in tags],
+    )
+    digest = hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode("utf-8"), digest_size=16)
+    return RESPONSE_KEY_PREFIX + digest.hexdigest()
+
+
+def purge_responses(*tags):
+    """
+    Purge cached responses that have any of the given tags. Tags are "topics",
+    "autocomplete" and "favoriters_<entry pk>".
+    """
+    cache.set_many({TAG_KEY_PREFIX + tag: time.time_ns() for tag in tags}, None)
@@ -1,10 +1,10 @@
-from django.shortcuts import get_object_or_404
+from django.http import Http404
 from django.utils.translation import gettext as _, ngettext
 
 from graphene import ID, Int, Mutation, String
 
 from dictionary.conf import settings
-from dictionary.models import Category, Suggestion, Topic
+from dictionary.models import Suggestion
 from dictionary.utils import time_threshold
 
 from dictionary_graph.utils import login_required
@@ -19,7 +19,10 @@ class FollowCategory(Mutation):
     @staticmethod
     @login_required
     def mutate(_root, info, pk):
-        category = get_object_or_404(Category.objects, id=pk)
+        category = info.context.loaders.category.load_or_404(pk)
+
+        if category.is_pseudo:
+            raise Http404
         following = info.context.user.following_categories
 
         if following.filter(pk=pk).exists():
@@ -41,7 +44,7 @@ class SuggestCategory(Mutation):
     @staticmethod
     @login_required
     def mutate(_root, info, topic, category, direction):
-        topic = get_object_or_404(Topic, slug=topic)
+        topic = info.context.loaders.topic_by_slug.load_or_404(topic)
 
         if not all(
             (
@@ -61,7 +64,7 @@ class SuggestCategory(Mutation):
         if suggestion_count_today >= settings.SUGGESTIONS_PER_DAY:
             raise ValueError(_("you have used up all the suggestion claims you have today. try again later."))
 
-        category = get_object_or_404(Category.objects_all, slug=category)
+        category = info.context.loaders.category_by_slug.load_or_404(category)
         kwargs = {"author": info.context.user, "topic": topic, "category": category}
 
         try:
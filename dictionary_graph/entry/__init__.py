@@ -1,6 +1,7 @@
 from graphene import ObjectType
 
 from .action import DeleteEntry, DownvoteEntry, FavoriteEntry, PinEntry, UpvoteEntry, VoteComment
+from .batch import BatchEntryAction
 from .edit import DraftEdit
 from .list import EntryFavoritesQuery
 
@@ -13,6 +14,7 @@ class EntryMutations(ObjectType):
     downvote = DownvoteEntry.Field()
     votecomment = VoteComment.Field()
     edit = DraftEdit.Field()
+    batch = BatchEntryAction.Field()
 
 
 class EntryQueries(EntryFavoritesQuery):
@@ -10,11 +10,22 @@ from graphene import ID, Int, Mutation, String
 from dictionary.conf import settings
 from dictionary.models import Entry, Comment
 
+from dictionary_graph.cache import purge_responses
 from dictionary_graph.utils import AnonymousUserStorage, login_required
 
 # pylint: disable=too-many-arguments
 
 
+def get_published(info, pk):
+    """Loads the entry with given pk, drafts are treated as non-existent."""
+    entry = info.context.loaders.entry.load(pk)
+
+    if entry.is_draft:
+        raise Entry.DoesNotExist("Entry matching query does not exist.")
+
+    return entry
+
+
 def owneraction(mutator):
     """
     Checks if sender is actually the owner of the object & gets the Entry object.
@@ -23,7 +34,7 @@ def owneraction(mutator):
     @wraps(mutator)
     @login_required
     def decorator(_root, info, pk):
-        entry, sender = Entry.objects_all.get(pk=pk), info.context.user
+        entry, sender = info.context.loaders.entry.load(pk), info.context.user
         if entry.author != sender:
             raise PermissionDenied(_("we couldn't handle your request. try again later."))
         return mutator(_root, info, entry)
@@ -83,11 +94,13 @@ class FavoriteEntry(Action, Mutation):
     @staticmethod
     @login_required
     def mutate(_root, info, pk):
-        entry = Entry.objects_published.get(pk=pk)
+        entry = get_published(info, pk)
 
-        if entry.author.blocked.filter(pk=info.context.user.pk).exists():
+        if entry.author_id in info.context.user.blocked_by_ids:
             raise PermissionDenied(_("we couldn't handle your request. try again later."))
 
+        purge_responses(f"favoriters_{entry.pk}")
+
         if info.context.user.favorite_entries.filter(pk=pk).exists():
             info.context.user.favorite_entries.remove(entry)
             return FavoriteEntry(
@@ -106,10 +119,7 @@ def voteaction(mutator):
 
     @wraps(mutator)
     def decorator(_root, info, pk):
-        entry, sender = (
-            Entry.objects_published.select_related("author").only("id", "author_id", "author__karma").get(pk=pk),
-            info.context.user,
-        )
+        entry, sender = get_published(info, pk), info.context.user
 
         if entry.author == sender:
             raise PermissionDenied(_("we couldn't handle your request. try again later."))
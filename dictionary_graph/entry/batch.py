@@ -0,0 +1,223 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Value, When
+from django.utils.translation import gettext as _
+
+from graphene import ID, Boolean, InputObjectType, Int, List, Mutation, NonNull, ObjectType, String
+
+from dictionary.conf import settings
+from dictionary.models import Author, DownvotedEntries, Entry, EntryFavorites, UpvotedEntries
+
+from dictionary_graph.cache import purge_responses
+from dictionary_graph.utils import login_required
+
+
+MAX_BATCH_SIZE = 50
+ACTIONS = ("upvote", "downvote", "favorite")
+
+
+class EntryActionInput(InputObjectType):
+    pk = ID(required=True)
+    action = String(required=True)  # "upvote", "downvote" or "favorite"
+
+
+class EntryActionResult(ObjectType):
+    pk = ID()
+    action = String()
+    ok = Boolean()
+    feedback = String()
+    count = Int()  # Favorite count, for favorite actions.
+
+
+def _delta_case(deltas):
+    return Case(
+        *(When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()),
+        output_field=DecimalField(max_digits=7, decimal_places=2),
+    )
+
+
+class EntryActionBatch:
+    """
+    Applies a list of vote and favorite actions of a user. Actions are evaluated
+    in order, against the state of the user's votes and favorites which is
+    fetched once, with the same rules as UpvoteEntry, DownvoteEntry and
+    FavoriteEntry mutations. Vote limits are also checked once and then
+    tracked in memory.
+
+    Net changes are then written in a single transaction: bulk inserts and
+    deletes for the m2m tables, and single UPDATE statements for vote rates
+    and karma points. Since m2m signals are not sent, vote rates are updated
+    here (see dictionary.signals.m2m).
+    """
+
+    def __init__(self, sender, entries):
+        self.sender = sender
+        self.entries = entries  # pk -> Entry
+        pks = list(entries)
+
+        self.initial = {
+            "upvoted": set(sender.upvoted_entries.filter(pk__in=pks).values_list("pk", flat=True)),
+            "downvoted": set(sender.downvoted_entries.filter(pk__in=pks).values_list("pk", flat=True)),
+            "favorited": set(sender.favorite_entries.filter(pk__in=pks).values_list("pk", flat=True)),
+        }
+        self.state = {key: set(value) for key, value in self.initial.items()}
+
+        author_ids = {entry.author_id for entry in entries.values()} - {sender.pk}
+        self.daily_vote_count, self.counts_against = sender.get_vote_counts(author_ids)
+
+        self.is_karma_eligible = sender.is_karma_eligible
+        self.karma_deltas = defaultdict(Decimal)
+
+    def apply(self, entry, action):
+        """Returns the feedback of given action, None if it was carried out silently."""
+        if action == "favorite":
+            return self.favorite(entry)
+
+        return self.vote(entry, upvote=action == "upvote")
+
+    def favorite(self, entry):
+        if entry.author_id in self.sender.blocked_by_ids:
+            raise ValueError(_("we couldn't handle your request. try again later."))
+
+        favorited = self.state["favorited"]
+
+        if entry.pk in favorited:
+            favorited.remove(entry.pk)
+            return _("the entry has been removed from favorites")
+
+        favorited.add(entry.pk)
+        return _("the entry has been favorited")
+
+    def vote(self, entry, upvote):
+        if entry.author_id == self.sender.pk:
+            raise ValueError(_("we couldn't handle your request. try again later."))
+
+        # Same vote again removes it, the opposite vote changes it.
+        same, opposite = ("upvoted", "downvoted") if upvote else ("downvoted", "upvoted")
+        sign = 1 if upvote else -1
+        cost, rate, opposite_rate = (
+            settings.KARMA_RATES["cost"],
+            settings.KARMA_RATES["upvote" if upvote else "downvote"],
+            settings.KARMA_RATES["downvote" if upvote else "upvote"],
+        )
+
+        if entry.pk in self.state[same]:
+            self.state[same].remove(entry.pk)
+            self.shift_karma(cost, entry.author_id, -sign * rate)
+            return None
+
+        if entry.pk in self.state[opposite]:
+            self.state[opposite].remove(entry.pk)
+            self.state[same].add(entry.pk)
+            self.shift_karma(0, entry.author_id, sign * (opposite_rate + rate))
+            return None
+
+        total_against, daily_against = self.counts_against[entry.author_id]
+        exceeded, reason = self.sender.check_vote_limit(self.daily_vote_count, total_against, daily_against)
+
+        if exceeded:
+            return reason
+
+        self.state[same].add(entry.pk)
+        self.daily_vote_count += 1
+        self.counts_against[entry.author_id] = [total_against + 1, daily_against + 1]
+        self.shift_karma(-cost, entry.author_id, sign * rate)
+        return None
+
+    def shift_karma(self, sender_delta, author_id, author_delta):
+        if self.is_karma_eligible:
+            self.karma_deltas[self.sender.pk] += sender_delta
+            self.karma_deltas[author_id] += author_delta
+
+    def get_changes(self, key):
+        return self.state[key] - self.initial[key], self.initial[key] - self.state[key]
+
+    @transaction.atomic
+    def commit(self):
+        vote_rate_deltas = defaultdict(Decimal)
+        changes = (
+            ("upvoted", UpvotedEntries, settings.VOTE_RATES["vote"]),
+            ("downvoted", DownvotedEntries, -settings.VOTE_RATES["vote"]),
+            ("favorited", EntryFavorites, settings.VOTE_RATES["favorite"]),
+        )
+
+        for key, model, rate in changes:
+            added, removed = self.get_changes(key)
+
+            if removed:
+                model.objects.filter(author=self.sender, entry__in=removed).delete()
+
+            model.objects.bulk_create([model(author=self.sender, entry_id=pk) for pk in added])
+
+            for pk in added:
+                vote_rate_deltas[pk] += rate
+
+            for pk in removed:
+                vote_rate_deltas[pk] -= rate
+
+        if vote_rate_deltas := {pk: delta for pk, delta in vote_rate_deltas.items() if delta}:
+            Entry.objects_published.filter(pk__in=vote_rate_deltas).update(
+                vote_rate=F("vote_rate") + _delta_case(vote_rate_deltas)
+            )
+
+        if karma_deltas := {pk: delta for pk, delta in self.karma_deltas.items() if delta}:
+            Author.objects.filter(pk__in=karma_deltas).update(karma=F("karma") + _delta_case(karma_deltas))
+
+        if favorites := set.union(*self.get_changes("favorited")):
+            purge_responses(*(f"favoriters_{pk}" for pk in favorites))
+
+    def get_favorite_counts(self):
+        return dict(
+            EntryFavorites.objects.filter(entry__in=list(self.entries))
+            .values_list("entry")
+            .annotate(count=Count("pk"))
+            .order_by()
+        )
+
+
+class BatchEntryAction(Mutation):
+    """
+    Apply multiple vote and favorite actions at once. Each action gets its own
+    result, in the given order.
+    """
+
+    class Arguments:
+        actions = List(NonNull(EntryActionInput), required=True)
+
+    results = List(EntryActionResult)
+
+    @staticmethod
+    @login_required
+    def mutate(_root, info, actions):
+        if len(actions) > MAX_BATCH_SIZE or any(item.action not in ACTIONS for item in actions):
+            raise ValueError(_("we couldn't handle your request. try again later."))
+
+        loaded = info.context.loaders.entry.load_many([item.pk for item in actions])
+        entries = {entry.pk: entry for entry in loaded if entry is not None and not entry.is_draft}
+        batch = EntryActionBatch(info.context.user, entries)
+        results = []
+
+        for item, entry in zip(actions, loaded):
+            result = EntryActionResult(pk=item.pk, action=item.action, ok=False)
+
+            if entry is None or entry.pk not in entries:
+                result.feedback = _("we couldn't handle your request. try again later.")
+            else:
+                try:
+                    result.feedback = batch.apply(entry, item.action)
+                    result.ok = True
+                except ValueError as exc:
+                    result.feedback = str(exc)
+
+            results.append(result)
+
+        batch.commit()
+        counts = batch.get_favorite_counts()
+
+        for result, entry in zip(results, loaded):
+            if result.action == "favorite" and result.ok:
+                result.count = counts.get(entry.pk, 0)
+
+        return BatchEntryAction(results=results)
@@ -1,5 +1,3 @@
-from django.db.models import Q
-
 from graphene import Int, List, ObjectType
 
 from dictionary.models import Entry
@@ -17,7 +15,7 @@ class EntryFavoritesQuery(ObjectType):
         return (
             Entry.objects_published.get(pk=pk)
             .favorited_by(manager="objects_accessible")
-            .exclude(Q(pk__in=info.context.user.blocked.all()) | Q(pk__in=info.context.user.blocked_by.all()))
+            .exclude(pk__in=info.context.user.blocked_ids | info.context.user.blocked_by_ids)
             .order_by("entryfavorites__date_created")
             .only("username", "slug", "is_novice")
         )
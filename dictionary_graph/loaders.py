@@ -0,0 +1,90 @@
+from django.core.exceptions import ValidationError
+from django.http import Http404
+
+from dictionary.models import Author, Category, Entry, Topic
+
+
+class ModelLoader:
+    """
+    Loads model instances by given (unique) field. Loaded instances are kept
+    for the rest of the request and the keys that are requested together are
+    fetched with a single IN query. Keys that don't match any instance are
+    remembered too, so they are not queried again.
+    """
+
+    def __init__(self, queryset, field="pk"):
+        self.queryset = queryset
+        self.field = field
+        self.siblings = []  # Other loaders of the same queryset, primed with the instances loaded by this one.
+        self._cache = {}
+
+    def _to_python(self, key):
+        # Keys mostly come from GraphQL arguments, e.g. ID arguments are strings.
+        model = self.queryset.model
+        field = model._meta.pk if self.field == "pk" else model._meta.get_field(self.field)
+
+        try:
+            return field.to_python(key)
+        except ValidationError:
+            return None
+
+    def prime(self, *instances):
+        for instance in instances:
+            self._cache[getattr(instance, self.field)] = instance
+
+    def load_many(self, keys):
+        keys = [self._to_python(key) for key in keys]
+
+        if missing := {key for key in keys if key is not None and key not in self._cache}:
+            found = list(self.queryset.filter(**{f"{self.field}__in": missing}))
+
+            for key in missing:
+                self._cache[key] = None
+
+            for loader in (self, *self.siblings):
+                loader.prime(*found)
+
+        return [self._cache.get(key) for key in keys]
+
+    def load(self, key):
+        (instance,) = self.load_many([key])
+
+        if instance is None:
+            raise self.queryset.model.DoesNotExist(
+                f"{self.queryset.model._meta.object_name} matching query does not exist."
+            )
+
+        return instance
+
+    def load_or_404(self, key):
+        try:
+            return self.load(key)
+        except self.queryset.model.DoesNotExist as exc:
+            raise Http404(str(exc)) from exc
+
+
+class Loaders:
+    """
+    Loaders of a single request, available as info.context.loaders (see
+    dictionary_graph.views.GraphQLView). Entries and categories are loaded
+    regardless of their state (drafts, pseudo categories etc.), so callers
+    should check the state themselves.
+    """
+
+    def __init__(self):
+        self.author = ModelLoader(Author.objects)
+        self.author_by_username = ModelLoader(Author.objects, "username")
+        self.author_by_slug = ModelLoader(Author.objects, "slug")
+        self.topic = ModelLoader(Topic.objects)
+        self.topic_by_slug = ModelLoader(Topic.objects, "slug")
+        self.entry = ModelLoader(Entry.objects_all.select_related("author"))
+        self.category = ModelLoader(Category.objects_all)
+        self.category_by_slug = ModelLoader(Category.objects_all, "slug")
+
+        for group in (
+            (self.author, self.author_by_username, self.author_by_slug),
+            (self.topic, self.topic_by_slug),
+            (self.category, self.category_by_slug),
+        ):
+            for loader in group:
+                loader.siblings = [sibling for sibling in group if sibling is not loader]
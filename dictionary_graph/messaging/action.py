@@ -53,9 +53,7 @@ class ArchiveConversation(Mutation):
         )
 
         for conversation in conversations:
-            conversation.messages.filter(recipient=info.context.user, read_at__isnull=True).update(
-                read_at=timezone.now()
-            )
+            conversation.mark_read()
             conversation.archive()
 
         return ArchiveConversation(redirect=reverse("messages-archive"))
@@ -76,7 +74,7 @@ class ComposeMessage(Mutation):
             return ComposeMessage(feedback=_("can't you write down something more?"))
 
         try:
-            recipient_ = Author.objects.get(username=recipient)
+            recipient_ = info.context.loaders.author_by_username.load(recipient)
             validate_user_text(body)
         except Author.DoesNotExist:
             return ComposeMessage(feedback=_("no such person though"))
@@ -0,0 +1,246 @@
+import logging
+import threading
+import time
+
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import connection
+
+from graphql import GraphQLObjectType, get_named_type
+from graphql.language import ast
+
+from dictionary.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last one is +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q):
+        """Upper bound of the bucket that contains given quantile (approximate)."""
+        for bound, total in self.cumulative():
+            if total >= q * self.count:
+                return bound
+        return None
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0
+
+
+class Registry:
+    """
+    In-process histograms of GraphQL operations and resolvers. Each process
+    (e.g. each gunicorn worker) keeps its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = defaultdict(self._create)
+
+    @staticmethod
+    def _create():
+        return {
+            "duration": Histogram(TIME_BUCKETS),
+            "db_duration": Histogram(TIME_BUCKETS),
+            "db_queries": Histogram(QUERY_BUCKETS),
+        }
+
+    def observe(self, kind, name, measurement):
+        with self._lock:
+            histograms = self._data[(kind, name)]
+            histograms["duration"].observe(measurement.duration)
+            histograms["db_duration"].observe(measurement.db_duration)
+            histograms["db_queries"].observe(measurement.db_queries)
+
+    def summary(self):
+        """Rows of mean and 95th percentile values, the slowest first."""
+        with self._lock:
+            rows = [
+                {
+                    "kind": kind,
+                    "name": name,
+                    "count": histograms["duration"].count,
+                    "total": histograms["duration"].sum,
+                    "mean": histograms["duration"].mean,
+                    "p95": histograms["duration"].quantile(0.95),
+                    "db_mean": histograms["db_duration"].mean,
+                    "queries_mean": histograms["db_queries"].mean,
+                    "queries_p95": histograms["db_queries"].quantile(0.95),
+                }
+                for (kind, name), histograms in self._data.items()
+            ]
+
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def render_text(self):
+        """Histograms in Prometheus text exposition format."""
+        metrics = (
+            ("duration", "graph_duration_seconds", "Wall time of GraphQL operations and resolvers."),
+            ("db_duration", "graph_db_duration_seconds", "Time spent in database queries."),
+            ("db_queries", "graph_db_queries", "Number of database queries."),
+        )
+        lines = []
+
+        with self._lock:
+            for key, metric, description in metrics:
+                lines += [f"# HELP {metric} {description}", f"# TYPE {metric} histogram"]
+
+                for (kind, name), histograms in sorted(self._data.items()):
+                    histogram, labels = histograms[key], f'kind="{kind}",name="{_escape(name)}"'
+                    lines += [f'{metric}_bucket{{{labels},le="{le}"}} {total}' for le, total in histogram.cumulative()]
+                    lines += [
+                        f"{metric}_sum{{{labels}}} {histogram.sum}",
+                        f"{metric}_count{{{labels}}} {histogram.count}",
+                    ]
+
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+registry = Registry()
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Measurement:
+    def __init__(self):
+        self.duration = 0
+        self.db_duration = 0
+        self.db_queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Database execute wrapper, see django.db.backends.base.base.BaseDatabaseWrapper.execute_wrapper
+        start = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_duration += time.perf_counter() - start
+            self.db_queries += 1
+
+
+@contextmanager
+def measure():
+    measurement, start = Measurement(), time.perf_counter()
+
+    try:
+        with connection.execute_wrapper(measurement):
+            yield measurement
+    finally:
+        measurement.duration = time.perf_counter() - start
+
+
+def describe_operation(document, operation_name):
+    """
+    Name of the operation to be used in metrics, e.g. "mutation entry.favorite".
+    Operations are described by their (validated, so known) fields rather than
+    client supplied names, so as to keep the number of series bounded. Operations
+    that select more than one field are described as "other".
+    """
+    for definition in document.document_ast.definitions:
+        if not isinstance(definition, ast.OperationDefinition):
+            continue
+
+        if operation_name and (definition.name is None or definition.name.value != operation_name):
+            continue
+
+        fields = set()
+
+        for field in definition.selection_set.selections:
+            if not isinstance(field, ast.Field):
+                return "other"
+
+            if field.arguments or not field.selection_set:
+                fields.add(field.name.value)
+                continue
+
+            # Fields without arguments are namespaces such as "entry" or "user", name their fields too.
+            for child in field.selection_set.selections:
+                if not isinstance(child, ast.Field):
+                    return "other"
+
+                fields.add(f"{field.name.value}.{child.name.value}")
+
+        return f"{definition.operation} {fields.pop()}" if len(fields) == 1 else "other"
+
+    return "other"
+
+
+def redact(variables):
+    """Replace the values of sensitive variables (e.g. message bodies) for logging."""
+    if isinstance(variables, dict):
+        return {
+            key: "[redacted]" if key in settings.GRAPH_REDACTED_VARIABLES else redact(value)
+            for key, value in variables.items()
+        }
+
+    if isinstance(variables, list):
+        return [redact(value) for value in variables]
+
+    return variables
+
+
+@contextmanager
+def record_operation(name, variables):
+    with measure() as measurement:
+        yield
+
+    registry.observe("operation", name, measurement)
+    threshold = settings.GRAPH_SLOW_OPERATION_THRESHOLD
+
+    if threshold is not None and measurement.duration >= threshold:
+        logger.warning(
+            "Slow GraphQL operation '%s' took %.3fs (%d queries, %.3fs in database). Variables: %s",
+            name,
+            measurement.duration,
+            measurement.db_queries,
+            measurement.db_duration,
+            redact(variables),
+        )
+
+
+class ResolverMetricsMiddleware:
+    """
+    Graphene middleware that records wall time and database usage of resolvers
+    (by parent type and field name). Fields that resolve to scalars are skipped,
+    as they are mostly plain attribute lookups.
+    """
+
+    def resolve(self, next_, root, info, **kwargs):
+        if not isinstance(get_named_type(info.return_type), GraphQLObjectType):
+            return next_(root, info, **kwargs)
+
+        with measure() as measurement:
+            result = next_(root, info, **kwargs)
+
+        registry.observe("resolver", f"{info.parent_type.name}.{info.field_name}", measurement)
+        return result
@@ -0,0 +1,66 @@
+import hashlib
+
+from functools import partial
+
+from graphql import parse, validate
+from graphql.backend.base import GraphQLBackend, GraphQLDocument
+from graphql.execution import ExecutionResult, execute
+
+from dictionary.utils.cache import cache
+from dictionary.utils.decorators import LocalCache
+
+
+PERSISTED_KEY_PREFIX = "graph_persisted_"
+PERSISTED_TIMEOUT = 604800  # 1 week, renewed as the query gets registered again.
+
+_documents = LocalCache(maxsize=256)
+
+
+def get_hash(document_string):
+    return hashlib.sha256(document_string.encode("utf-8")).hexdigest()
+
+
+def register(document_string):
+    """Register a document as persisted query, return its hash."""
+    query_hash = get_hash(document_string)
+    cache.set(PERSISTED_KEY_PREFIX + query_hash, document_string, PERSISTED_TIMEOUT)
+    return query_hash
+
+
+def lookup(query_hash):
+    """Get the document of a persisted query, None if it is not registered (or expired)."""
+    return cache.get(PERSISTED_KEY_PREFIX + query_hash)
+
+
+class CachedBackend(GraphQLBackend):
+    """
+    Parses and validates each document only once per process. Documents are
+    kept in memory by their hashes, so repeated operations (especially the
+    persisted ones) go straight to execution.
+    """
+
+    def __init__(self, executor=None):
+        self.execute_params = {"executor": executor} if executor else {}
+
+    def document_from_string(self, schema, document_string):
+        query_hash = get_hash(document_string)
+        document = _documents.get(query_hash)
+
+        if document is None:
+            document = self.build_document(schema, document_string)
+            _documents.set(query_hash, document, PERSISTED_TIMEOUT)
+
+        return document
+
+    def build_document(self, schema, document_string):
+        document_ast = parse(document_string)  # Syntax errors are raised, the view handles them.
+
+        if errors := validate(schema, document_ast):
+            result = ExecutionResult(errors=errors, invalid=True)
+            document = GraphQLDocument(schema, document_string, document_ast, lambda **_options: result)
+        else:
+            execute_document = partial(execute, schema, document_ast, **self.execute_params)
+            document = GraphQLDocument(schema, document_string, document_ast, execute_document)
+
+        document.is_valid = not errors  # Only valid documents are recorded in metrics.
+        return document
@@ -0,0 +1,36 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from dictionary.models import Author, Entry, Topic
+
+from dictionary_graph.cache import purge_responses
+
+
+# Purges cached responses (see dictionary_graph.cache) of the fields that list topics and authors.
+
+
+def purge_on_commit(*tags):
+    transaction.on_commit(lambda: purge_responses(*tags))
+
+
+@receiver(post_save, sender=Entry, dispatch_uid="graph_purge_entry_saved")
+def purge_entry_saved(instance, created, **kwargs):
+    # Only publishing changes topic lists (and the topics that can be autocompleted), see Entry.save
+    if not instance.is_draft and (created or getattr(instance, "_loaded_is_draft", None) is True):
+        purge_on_commit("topics", "autocomplete")
+
+
+@receiver(post_delete, sender=Entry, dispatch_uid="graph_purge_entry_deleted")
+def purge_entry_deleted(instance, **kwargs):
+    if not instance.is_draft:
+        purge_on_commit("topics", "autocomplete")
+
+
+@receiver(post_save, sender=Topic, dispatch_uid="graph_purge_topic_saved")
+@receiver(post_delete, sender=Topic, dispatch_uid="graph_purge_topic_deleted")
+@receiver(post_save, sender=Author, dispatch_uid="graph_purge_author_saved")
+@receiver(post_delete, sender=Author, dispatch_uid="graph_purge_author_deleted")
+def purge_autocomplete(**kwargs):
+    # Titles, usernames and accessibility (e.g. censorship, suspension) may change on any save.
+    purge_on_commit("autocomplete")
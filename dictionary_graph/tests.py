@@ -0,0 +1,221 @@
+import json
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from dictionary.conf import settings
+from dictionary.models import Author, Entry, Topic
+
+from dictionary_graph.loaders import Loaders
+from dictionary_graph.metrics import registry
+from dictionary_graph.persisted import get_hash
+from dictionary_graph.schema import schema
+from dictionary_graph.views import GraphQLView
+
+
+class ModelLoaderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [Author.objects.create(username=f"author{i}", email=str(i), is_novice=False) for i in range(3)]
+
+    def test_load_many(self):
+        loaders = Loaders()
+        pks = [author.pk for author in self.authors]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(loaders.author.load_many([*pks, 0]), [*self.authors, None])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(loaders.author.load(str(pks[0])), self.authors[0])
+            self.assertEqual(loaders.author_by_username.load("author1"), self.authors[1])
+            self.assertEqual(loaders.author.load_many([0, "invalid"]), [None, None])
+
+            with self.assertRaises(Author.DoesNotExist):
+                loaders.author.load(0)
+
+
+class QueryCountTests(TestCase):
+    """Number of queries executed per GraphQL operation (excluding the ones of session & authentication)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Author.objects.create(username="user", email="0", is_novice=False, is_active=True)
+        cls.other = Author.objects.create(username="other", email="1", is_novice=False, is_active=True)
+        cls.topic = Topic.objects.create_topic("topic")
+        cls.entry = Entry.objects.create(topic=cls.topic, author=cls.other, content="entry")
+
+    def setUp(self):
+        cache.clear()
+
+    def execute(self, query, variables=None):
+        request = RequestFactory().post("/graphql/")
+        request.user = self.user
+        result = schema.execute(query, context_value=GraphQLView().get_context(request), variables=variables)
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def test_favoriters(self):
+        self.user.favorite_entries.add(self.entry)
+
+        with self.assertNumQueries(5):
+            data = self.execute("{ entry { favoriters(pk: %d) { username } } }" % self.entry.pk)
+
+        self.assertEqual(data["entry"]["favoriters"], [{"username": "user"}])
+
+    def test_autocomplete(self):
+        with self.assertNumQueries(5):
+            self.execute('{ autocomplete { authors(lookup: "oth") { username } topics(lookup: "top") { title } } }')
+
+    def test_user_follow(self):
+        with self.assertNumQueries(6):
+            self.execute('mutation { user { a: follow(username: "other") { feedback } } }')
+
+        # The second lookup of the same user is not queried again.
+        with self.assertNumQueries(10):
+            self.execute(
+                "mutation { user {"
+                ' a: follow(username: "other") { feedback }'
+                ' b: follow(username: "other") { feedback }'
+                " } }"
+            )
+
+    def test_entry_favorite(self):
+        query = "mutation { entry { a: favorite(pk: %(pk)d) { count } b: favorite(pk: %(pk)d) { count } } }"
+
+        with self.assertNumQueries(13):
+            data = self.execute(query % {"pk": self.entry.pk})
+
+        self.assertEqual(data["entry"], {"a": {"count": 1}, "b": {"count": 0}})
+
+    def test_entry_batch(self):
+        entries = [Entry.objects.create(topic=self.topic, author=self.other, content=f"{i}") for i in range(3)]
+        actions = [{"pk": entry.pk, "action": action} for entry in entries for action in ("upvote", "favorite")]
+        actions += [{"pk": entries[0].pk, "action": "downvote"}, {"pk": 0, "action": "upvote"}]
+        query = (
+            "mutation($actions: [EntryActionInput!]!)"
+            " { entry { batch(actions: $actions) { results { ok count } } } }"
+        )
+
+        # Independent of the number of actions.
+        with self.assertNumQueries(19):
+            data = self.execute(query, {"actions": actions})
+
+        results = data["entry"]["batch"]["results"]
+
+        self.assertEqual([result["ok"] for result in results], [True] * 7 + [False])
+        self.assertEqual([result["count"] for result in results[1:6:2]], [1, 1, 1])
+        self.assertCountEqual(self.user.upvoted_entries.all(), entries[1:])
+        self.assertCountEqual(self.user.downvoted_entries.all(), entries[:1])
+        self.assertCountEqual(self.user.favorite_entries.all(), entries)
+
+        rates = settings.VOTE_RATES
+        entries[0].refresh_from_db()
+        self.assertEqual(entries[0].vote_rate, rates["favorite"] - rates["vote"])
+
+    def test_topic_follow(self):
+        with self.assertNumQueries(4):
+            self.execute("mutation { topic { follow(pk: %d) { feedback } } }" % self.topic.pk)
+
+
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Author.objects.create(username="user", email="0", is_novice=False, is_active=True)
+        cls.other = Author.objects.create(username="other", email="1", is_novice=False, is_active=True)
+        cls.entry = Entry.objects.create(topic=Topic.objects.create_topic("topic"), author=cls.other, content="entry")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_persisted_query(self):
+        query = '{ autocomplete { authors(lookup: "oth") { username } } }'
+        extensions = json.dumps({"persistedQuery": {"sha256Hash": get_hash(query)}})
+
+        response = self.client.get("/graphql/", {"extensions": extensions})
+        self.assertEqual(response.json()["errors"][0]["message"], "PersistedQueryNotFound")
+
+        self.client.get("/graphql/", {"query": query, "extensions": extensions})
+        response = self.client.get("/graphql/", {"extensions": extensions})
+
+        self.assertEqual(response.json()["data"]["autocomplete"]["authors"], [{"username": "other"}])
+        self.assertIn("public", response["Cache-Control"])
+
+    def test_favoriters_purged(self):
+        self.client.force_login(self.user)
+        query = "{ entry { favoriters(pk: %d) { username } } }" % self.entry.pk
+        favorite = "mutation { entry { favorite(pk: %d) { count } } }" % self.entry.pk
+
+        def get_favoriters():
+            return self.client.get("/graphql/", {"query": query}).json()["data"]["entry"]["favoriters"]
+
+        self.assertEqual(get_favoriters(), [])
+
+        with self.assertNumQueries(2):  # Session and user
+            get_favoriters()
+
+        self.client.post("/graphql/", json.dumps({"query": favorite}), content_type="application/json")
+        self.assertEqual(get_favoriters(), [{"username": "user"}])
+
+    def test_autocomplete_purged(self):
+        query = '{ autocomplete { authors(lookup: "new") { username } } }'
+
+        def get_authors():
+            return self.client.get("/graphql/", {"query": query}).json()["data"]["autocomplete"]["authors"]
+
+        self.assertEqual(get_authors(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Author.objects.create(username="newcomer", email="2", is_novice=False, is_active=True)
+
+        self.assertEqual(get_authors(), [{"username": "newcomer"}])
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Author.objects.create(username="user", email="0", is_active=True, is_superuser=True, is_staff=True)
+
+    def setUp(self):
+        registry.clear()
+        self.client.force_login(self.user)
+
+    def test_operation_recorded(self):
+        with self.assertLogs("dictionary_graph.metrics", "WARNING") as logs:
+            with patch.object(settings, "GRAPH_SLOW_OPERATION_THRESHOLD", 0):
+                self.client.post(
+                    "/graphql/",
+                    json.dumps(
+                        {
+                            "query": "mutation($body: String)"
+                            " { message { compose(body: $body, recipient: $body) { feedback } } }",
+                            "variables": {"body": "secret"},
+                        }
+                    ),
+                    content_type="application/json",
+                )
+
+        self.assertIn("mutation message.compose", logs.output[0])
+        self.assertNotIn("secret", logs.output[0])
+
+        names = {(row["kind"], row["name"]) for row in registry.summary()}
+        self.assertIn(("operation", "mutation message.compose"), names)
+        self.assertIn(("resolver", "MessageMutations.compose"), names)
+
+        response = self.client.get("/graphql/metrics/")
+        self.assertIn(
+            'graph_db_queries_count{kind="resolver",name="MessageMutations.compose"} 1', response.content.decode()
+        )
+        self.assertEqual(self.client.get("/admin/sites/site/graph-metrics/").status_code, 200)
+
+    def test_operation_labels(self):
+        def post(query, **data):
+            self.client.post("/graphql/", json.dumps({"query": query, **data}), content_type="application/json")
+
+        post("mutation anything { user { toggleTheme { theme } } }", operationName="anything")
+        post("query { user { nonexistent { theme } } }")  # Invalid documents are not recorded.
+        post("mutation { __typename user { toggleTheme { theme } } }")
+
+        operations = {row["name"] for row in registry.summary() if row["kind"] == "operation"}
+        self.assertEqual(operations, {"mutation user.toggleTheme", "other"})
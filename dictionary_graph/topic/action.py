@@ -1,4 +1,3 @@
-from django.shortcuts import get_object_or_404
 from django.template.defaultfilters import linebreaksbr
 from django.utils.translation import gettext as _
 
@@ -21,7 +20,7 @@ class FollowTopic(Mutation):
     @staticmethod
     @login_required
     def mutate(_root, info, pk):
-        topic = get_object_or_404(Topic, id=pk)
+        topic = info.context.loaders.topic.load_or_404(pk)
         following = info.context.user.following_topics
 
         if following.filter(pk=pk).exists():
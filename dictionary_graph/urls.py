@@ -1,8 +1,11 @@
 from django.urls import path
 
-from graphene_django.views import GraphQLView
+from dictionary_graph.views import GraphQLView, metrics
 
 
 app_name = "graph"
 
-urlpatterns = [path("", GraphQLView.as_view(graphiql=True), name="endpoint")]
+urlpatterns = [
+    path("", GraphQLView.as_view(graphiql=True), name="endpoint"),
+    path("metrics/", metrics, name="metrics"),
+]
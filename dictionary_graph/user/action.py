@@ -1,12 +1,13 @@
 from functools import wraps
 
-from django.shortcuts import get_object_or_404, reverse
+from django.shortcuts import reverse
 from django.utils.translation import gettext as _
 
 from graphene import Mutation, String
 
 from dictionary.models import Author
 
+from dictionary_graph.cache import purge_responses
 from dictionary_graph.utils import login_required
 
 
@@ -19,7 +20,7 @@ def useraction(mutator):
     @wraps(mutator)
     @login_required
     def decorator(_root, info, username):
-        subject, sender = get_object_or_404(Author, username=username), info.context.user
+        subject, sender = info.context.loaders.author_by_username.load_or_404(username), info.context.user
         if sender == subject or subject.is_private:
             raise ValueError(_("we couldn't handle your request. try again later."))
         return mutator(_root, info, sender, subject)
@@ -41,14 +42,17 @@ class Block(Action, Mutation):
     @staticmethod
     @useraction
     def mutate(_root, info, sender, subject):
-        if sender.blocked.filter(pk=subject.pk).exists():
+        if subject.pk in sender.blocked_ids:
             sender.blocked.remove(subject)
             return Block(feedback=_("removed blockages"))
 
         sender.following.remove(subject)
         subject.following.remove(sender)
         sender.blocked.add(subject)
-        sender.favorite_entries.remove(*sender.favorite_entries.filter(author__in=[subject]))
+
+        favorites = list(sender.favorite_entries.filter(author__in=[subject]))
+        sender.favorite_entries.remove(*favorites)
+        purge_responses(*(f"favoriters_{entry.pk}" for entry in favorites))
         return Block(feedback=_("the person is now blocked"), redirect=info.context.build_absolute_uri(reverse("home")))
 
 
@@ -58,12 +62,12 @@ class Follow(Action, Mutation):
     def mutate(_root, _info, sender, subject):
         if (
             subject.is_hidden
-            or subject.blocked.filter(pk=sender.pk).exists()
-            or sender.blocked.filter(pk=subject.pk).exists()
+            or subject.pk in sender.blocked_by_ids
+            or subject.pk in sender.blocked_ids
         ):
             return Follow(feedback=_("we couldn't handle your request. try again later."))
 
-        if sender.following.filter(pk=subject.pk).exists():
+        if subject.pk in sender.following_ids:
             sender.following.remove(subject)
             return Follow(feedback=_("you no longer follow this person"))
 
@@ -0,0 +1,123 @@
+import json
+
+from django.conf import settings as django_settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from graphene_django.views import GraphQLView as BaseGraphQLView, HttpError
+
+from dictionary.utils.cache import cache
+
+from dictionary_graph import persisted
+from dictionary_graph.cache import get_policy, get_scope, make_key
+from dictionary_graph.loaders import Loaders
+from dictionary_graph.metrics import describe_operation, record_operation, registry
+
+
+class GraphQLView(BaseGraphQLView):
+    """
+    Supports persisted queries: clients may send the sha256 hash of a document
+    (in extensions.persistedQuery.sha256Hash) instead of the document itself,
+    once the document is registered by sending it along with its hash.
+
+    Results of some read-only operations are cached (see dictionary_graph.cache),
+    GET requests of such operations also get Cache-Control headers.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("backend", persisted.CachedBackend())
+        super().__init__(*args, **kwargs)
+
+    def get_context(self, request):
+        if not hasattr(request, "loaders"):
+            request.loaders = Loaders()
+        return request
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        timeout = getattr(request, "graph_cache_timeout", None)
+
+        if request.method == "GET" and timeout and response.status_code == 200:
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, max_age=timeout)
+            else:
+                # Shared caches won't store responses that set cookies.
+                request.META["CSRF_COOKIE_USED"] = False
+                patch_cache_control(response, public=True, max_age=timeout)
+
+            patch_vary_headers(response, ("Cookie",))
+
+        return response
+
+    def get_graphql_params(self, request, data):
+        query, variables, operation_name, id_ = super().get_graphql_params(request, data)
+        extensions = request.GET.get("extensions") or data.get("extensions")
+
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError as exc:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON.")) from exc
+
+        query_hash = ((extensions or {}).get("persistedQuery") or {}).get("sha256Hash")
+
+        if query_hash is None:
+            return query, variables, operation_name, id_
+
+        if query:
+            if persisted.get_hash(query) != query_hash:
+                raise HttpError(HttpResponseBadRequest("Provided sha256Hash does not match the query."))
+
+            persisted.register(query)
+        elif (query := persisted.lookup(query_hash)) is None:
+            raise HttpError(HttpResponse(), "PersistedQueryNotFound")  # Client should send the query along with hash.
+
+        return query, variables, operation_name, id_
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, _id = self.get_graphql_params(request, data)
+
+        try:
+            document = self.get_backend(request).document_from_string(self.schema, query) if query else None
+        except Exception:  # pylint: disable=broad-except
+            document = None  # Syntax errors are reported by execution.
+
+        if document is None or show_graphiql:
+            return super().get_response(request, data, show_graphiql)
+
+        if not getattr(document, "is_valid", False):
+            return self.get_cached_response(request, data, document, query, variables, operation_name)
+
+        with record_operation(describe_operation(document, operation_name), variables):
+            return self.get_cached_response(request, data, document, query, variables, operation_name)
+
+    def get_cached_response(self, request, data, document, query, variables, operation_name):
+        # pylint: disable=too-many-arguments
+        policy = get_policy(document, operation_name, variables)
+
+        if not policy or self.batch:
+            return super().get_response(request, data)
+
+        timeout, tags = policy
+        key = make_key(persisted.get_hash(query), operation_name, variables, get_scope(request.user), tags)
+
+        if (cached := cache.get(key)) is not None:
+            request.graph_cache_timeout = timeout
+            return cached, 200
+
+        result, status_code = super().get_response(request, data)
+
+        if status_code == 200 and "errors" not in json.loads(result):
+            request.graph_cache_timeout = timeout
+            cache.set(key, result, timeout)
+
+        return result, status_code
+
+
+def metrics(request):
+    """Metrics of GraphQL operations in Prometheus text format, for superusers and INTERNAL_IPS."""
+    if not (request.user.is_superuser or request.META.get("REMOTE_ADDR") in django_settings.INTERNAL_IPS):
+        raise PermissionDenied
+
+    return HttpResponse(registry.render_text(), content_type="text/plain; version=0.0.4")
@@ -30,7 +30,10 @@ DEBUG = True
 # SECURITY WARNING: don't allow any other hosts except your real host in production!
 ALLOWED_HOSTS = ["*"]
 
-GRAPHENE = {"SCHEMA": "dictionary_graph.schema.schema"}
+GRAPHENE = {
+    "SCHEMA": "dictionary_graph.schema.schema",
+    "MIDDLEWARE": ["dictionary_graph.metrics.ResolverMetricsMiddleware"],
+}
 
 SITE_ID = 1
 
@@ -60,6 +63,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "dictionary.middleware.cache.RequestCacheMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     # Using custom csrf middleware here. Check the module to see the rationale.
@@ -134,6 +138,8 @@ SESSION_COOKIE_AGE = 1209600
 
 # WARNING: Use "dictionary.backends.sessions.cached_db" engine for improved
 # performance if you have the cache server (memcached etc.) set up and running.
+# If that cache server is Redis, "dictionary.backends.sessions.redis" engine
+# keeps the sessions in Redis only (see SESSION_WRITE_THROUGH setting).
 SESSION_ENGINE = "dictionary.backends.sessions.db"
 
 
@@ -8,7 +8,10 @@ SECRET_KEY = os.environ.get("SECRET_KEY")
 DEBUG = int(os.environ.get("DEBUG", default=0))
 ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(" ")
 
-GRAPHENE = {"SCHEMA": "dictionary_graph.schema.schema"}
+GRAPHENE = {
+    "SCHEMA": "dictionary_graph.schema.schema",
+    "MIDDLEWARE": ["dictionary_graph.metrics.ResolverMetricsMiddleware"],
+}
 
 SITE_ID = 1
 
@@ -33,6 +36,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "dictionary.middleware.cache.RequestCacheMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "dictionary.middleware.csrf.CsrfViewMiddleware",
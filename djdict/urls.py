@@ -15,12 +15,10 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.contrib.sitemaps import views as sitemap_views
 from django.urls import include, path
-from django.views.decorators.gzip import gzip_page
 from django.views.i18n import JavaScriptCatalog
 
-from dictionary.sitemaps import sitemaps
+from dictionary.views import sitemaps
 
 
 urlpatterns = [
@@ -31,13 +29,9 @@ urlpatterns = [
     path("jsi18n/", JavaScriptCatalog.as_view(packages=["dictionary"]), name="javascript-catalog"),
     path("i18n/", include("django.conf.urls.i18n")),
     # Sitemap
-    path("sitemap.xml", gzip_page(sitemap_views.index), {"sitemaps": sitemaps}),
-    path(
-        "sitemap-<section>.xml",
-        gzip_page(sitemap_views.sitemap),
-        {"sitemaps": sitemaps},
-        name="django.contrib.sitemaps.views.sitemap",
-    ),
+    path("sitemap.xml", sitemaps.index),
+    path("sitemap-<str:name>.xml.gz", sitemaps.static_file),
+    path("sitemap-<section>.xml", sitemaps.section, name="django.contrib.sitemaps.views.sitemap"),
 ]
 
 # Will consider this near release: